@@ -1,26 +1,58 @@
 # -*- coding: utf-8 -*-
 # backend/ai.py
+import asyncio
 import json
 import random
 import requests
-from typing import List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple, Optional
 from math import exp
 import os
 import time
+from bitboard import BitBoard, PATTERN_KINDS, as_bitboard, dir_index
+from book import BOOK_PATH, load_book
+from llm_client import post_json_fanout
+import ai_np
+from ai_batch import MicroBatcher
+from config import (OMOK_AI_BATCH_MAX, OMOK_AI_BATCH_WAIT_MS, OMOK_AI_NUMPY, OMOK_AI_SLO_MARGIN_SEC,
+                    OMOK_AI_SLO_SEC, OMOK_AI_WORKERS)
+from move_cache import MOVE_CACHE
 print("OMOK_LLM_URL =", os.getenv("OMOK_LLM_URL"))
 
 class LLMError(RuntimeError):
     pass
 
-def _maybe_sleep_delay():
-    """강제 수 선택 후 휴리스틱이 너무 즉답하지 않도록 1초 정도 지연"""
+def _force_delay_sec() -> float:
+    """강제 수 선택 후 휴리스틱이 너무 즉답하지 않도록 두는 지연(초)"""
     try:
-        delay = float(os.getenv("OMOK_FORCE_DELAY_SEC", "1.0"))  # 기본 1초, .env로 조정 가능
+        return float(os.getenv("OMOK_FORCE_DELAY_SEC", "1.0"))  # 기본 1초, .env로 조정 가능
     except Exception:
-        delay = 1.0
+        return 1.0
+
+def _maybe_sleep_delay(delay: float):
+    """동기 경로용 지연 (비동기 경로는 asyncio.sleep 으로 기다린다)"""
     if delay > 0:
         time.sleep(delay)
 
+def ai_deadline(start: Optional[float] = None) -> Optional[float]:
+    """요청 시작 시각(time.time(), 생략 시 지금) + OMOK_AI_SLO_SEC. SLO 가 0 이면 None(마감 없음)
+    벽시계 기준이라 워커 프로세스로 넘겨도 같은 마감"""
+    if OMOK_AI_SLO_SEC <= 0:
+        return None
+    return (time.time() if start is None else start) + OMOK_AI_SLO_SEC
+
+def _remaining(deadline: Optional[float]) -> float:
+    """마감까지 남은 초 (응답 여유 OMOK_AI_SLO_MARGIN_SEC 제외, 마감이 없으면 inf)"""
+    if deadline is None:
+        return float("inf")
+    return deadline - OMOK_AI_SLO_MARGIN_SEC - time.time()
+
+def _delay_left(delay: float, deadline: Optional[float]) -> float:
+    """생각하는 척 지연 중 아직 남은 초 — 요청 시작부터 재므로 계산에 쓴 시간은 이미 기다린 것으로 치고, 마감은 넘지 않는다
+    마감이 없으면 지연 전체 (계산 뒤에 덧붙는 이전 동작)"""
+    if deadline is None:
+        return delay
+    return max(0.0, min(delay - (time.time() - (deadline - OMOK_AI_SLO_SEC)), _remaining(deadline)))
+
 def _get_llm_url() -> str:
     return os.getenv("OMOK_LLM_URL") or ""
 
@@ -41,10 +73,24 @@ NEAR_RADIUS        = int  (os.getenv("OMOK_NEAR_RADIUS", "2"))           # 근
 BLOCK_OPEN4_BONUS  = float(os.getenv("OMOK_BLOCK_OPEN4_BONUS",  "7000000000"))  # 7e9
 BLOCK_SEMI4_BONUS  = float(os.getenv("OMOK_BLOCK_SEMI4_BONUS",  "6000000000"))  # 6e9
 BLOCK_OPEN3_BONUS  = float(os.getenv("OMOK_BLOCK_OPEN3_BONUS",  "5000000000"))  # 5e9
+BLOCK_SPLIT3_BONUS = float(os.getenv("OMOK_BLOCK_SPLIT3_BONUS", "4000000000"))  # 4e9
+
+# _score_move 의 형태별 가중치 (bitboard.PATTERN_KINDS 이름). 띈 4 는 민4 와 같은 4, 띈 3 은 열린3 보다 조금 낮게
+SHAPE_WEIGHTS: Tuple[Tuple[str, float], ...] = (
+    ("open4", 2.5e9), ("semi4", 1.2e9), ("split4", 1.2e9), ("open3", 3.0e8), ("split3", 2.5e8), ("two", 1.0e6),
+)
+
+def _block_weights() -> Tuple[Tuple[str, float], ...]:
+    """상대 형태별 차단 가중치 — BLOCK_*_BONUS 전역을 부를 때마다 읽는다 (bench/arena.py 가 덮어써 튜닝)"""
+    return (
+        ("open4", BLOCK_OPEN4_BONUS), ("semi4", BLOCK_SEMI4_BONUS), ("split4", BLOCK_SEMI4_BONUS),
+        ("open3", BLOCK_OPEN3_BONUS), ("split3", BLOCK_SPLIT3_BONUS),
+    )
 
 # 강제수 모드: strict(기본)=즉승/즉패만, plus4=+상대4 차단, all=+열린3까지
 FORCE_MODE = os.getenv("OMOK_FORCE_MODE", "all").lower()
 AI_DEBUG   = os.getenv("OMOK_AI_DEBUG", "0") == "1"
+USE_NUMPY  = OMOK_AI_NUMPY and ai_np.AVAILABLE  # 후보 점수를 ai_np.score_matrix 로 한 번에
 
 DIRS: Tuple[Tuple[int,int], ...] = ((1,0),(0,1),(1,1),(1,-1))
 DIFF_PROFILES = {
@@ -57,6 +103,7 @@ DIFF_PROFILES = {
         "exploration_k": int(os.getenv("OMOK_BEGINNER_EXPLORATION_K", "45")),
         "center_scale": float(os.getenv("OMOK_BEGINNER_CENTER_SCALE", "260000")),
         "near_radius": int(os.getenv("OMOK_BEGINNER_NEAR_RADIUS", "2")),
+        "use_book": os.getenv("OMOK_BEGINNER_USE_BOOK", "1") == "1",
         # 반드시 강제: 내 5, 상대 5, 상대 열린4/민4. (열린3은 확률적)
         "force_block_open4": True,
         "force_block_semi4": True,
@@ -72,117 +119,116 @@ DIFF_PROFILES = {
         "near_radius": int(os.getenv("OMOK_ADV_NEAR_RADIUS", "2")),
         "force_block_open4": True,
         "force_block_semi4": True,
+        "use_book": True,
+        # 탐색 엔진(search.py): 수당 시간 예산, 최대 깊이, 노드당 후보 수. 0초면 1-ply 휴리스틱
+        "time_budget": float(os.getenv("OMOK_ADV_TIME_BUDGET_SEC", "0.8")),
+        "search_depth": int(os.getenv("OMOK_ADV_SEARCH_DEPTH", "6")),
+        "search_width": int(os.getenv("OMOK_ADV_SEARCH_WIDTH", "10")),
     },
 }
 
+# 오프닝북 (build_book.py 로 생성, 시작할 때 mmap). 파일이 없으면 None
+OPENING_BOOK = load_book(BOOK_PATH) if BOOK_PATH else None
+
 def _get_profile(difficulty: str) -> dict:
     return DIFF_PROFILES.get(difficulty or "초급", DIFF_PROFILES["초급"])
 
 def _in_bounds(board, y, x):
     return 0 <= y < len(board) and 0 <= x < len(board[0])
 
-def _count_line(board, y, x, dy, dx, who):
-    cnt = 0
-    ny, nx = y + dy, x + dx
-    while _in_bounds(board, ny, nx) and board[ny][nx] == who:
-        cnt += 1
-        ny += dy; nx += dx
-    return cnt
+def _count_line(board: BitBoard, y, x, dy, dx, who):
+    return board.run(x, y, dx, dy, who)
 
-def _find_must_block_move_for_beginner(board: List[List[int]], me: int, p_open3: float,
+def _find_must_block_move_for_beginner(board: BitBoard, me: int, p_open3: float,
                                        force_open4: bool, force_semi4: bool):
     """승/패, 열린4/민4는 항상 막고, 열린3은 확률 p로만 막기. 막을 좌표 하나 반환 or None"""
     import random
-    opp = 1 if me == 2 else 2
+    th = _scan_threats(board, me)
 
-    # ① 내 즉승
-    n = len(board)
-    for y in range(n):
-        for x in range(n):
-            if board[y][x] == 0 and _makes_n(board, x, y, me, 5):
-                return (x, y)
-
-    # ② 상대 즉승 차단
-    for y in range(n):
-        for x in range(n):
-            if board[y][x] == 0 and _makes_n(board, x, y, opp, 5):
-                return (x, y)
-
-    # ③ 상대 열린4/민4 차단 (항상)
-    if force_open4 or force_semi4:
-        for y in range(n):
-            for x in range(n):
-                if board[y][x] != 0: continue
-                pf = _pattern_flags(board, x, y, opp)
-                if force_open4 and pf["open4"]:
-                    return (x, y)
-                if force_semi4 and pf["semi4"]:
-                    return (x, y)
+    # ① 내 즉승  ② 상대 즉승 차단
+    if th["my_win"]:
+        return th["my_win"][0]
+    if th["opp_win"]:
+        return th["opp_win"][0]
+
+    # ③ 상대 열린4/민4 차단 (항상) — opp_four 는 민4(열린4 포함) 전체
+    if force_semi4 and th["opp_four"]:
+        return th["opp_four"][0]
+    if force_open4 and th["opp_open4"]:
+        return th["opp_open4"][0]
 
     # ④ 상대 열린3 차단 (확률)
-    if p_open3 > 0.0 and random.random() < p_open3:
-        best = None
-        for y in range(n):
-            for x in range(n):
-                if board[y][x] != 0: continue
-                pf = _pattern_flags(board, x, y, opp)
-                if pf["open3"]:
-                    # 열린3이 여러 곳이면 아무거나(첫번째) 선택
-                    best = (x, y); break
-            if best: break
-        if best: return best
+    if p_open3 > 0.0 and th["opp_open3"] and random.random() < p_open3:
+        # 열린3이 여러 곳이면 아무거나(첫번째) 선택
+        return th["opp_open3"][0]
 
     return None
 
-def _line_info(board, y, x, dy, dx, who):
-    c1 = _count_line(board, y, x,  dy, dx,  who)
-    c2 = _count_line(board, y, x, -dy,-dx, who)
-    length = 1 + c1 + c2
-    ny1, nx1 = y + dy*(c1+1), x + dx*(c1+1)
-    ny2, nx2 = y - dy*(c2+1), x - dx*(c2+1)
-    open1 = _in_bounds(board, ny1, nx1) and board[ny1][nx1] == 0
-    open2 = _in_bounds(board, ny2, nx2) and board[ny2][nx2] == 0
-    opens = (1 if open1 else 0) + (1 if open2 else 0)
-    return length, opens
-
-def _makes_n(board, x, y, who, n):
+def _scan_threats(board: BitBoard, me: int) -> Dict[str, List[Tuple[int,int]]]:
+    """
+    강제 수 스캐너: 돌에 붙은 빈칸만 한 번 훑어 모든 분류를 동시에 반환 (행우선 순서)
+      - my_win   : 내가 두면 5
+      - opp_win  : 상대가 두면 5 (내 즉승 칸 제외)
+      - opp_four : 상대가 두면 4(열린4/민4/띈4) (위 칸 제외), opp_open4 는 그중 열린4
+      - opp_open3: 상대가 두면 열린3/띈3 (위 칸 제외)
+    돌에 붙은(반경 1) 칸을 먼저, 그다음 띈4 c.XXX / 띈3 c.XX 처럼 가장 가까운 돌이 두 칸 떨어진 칸
+    (각각 행우선 — 목록 첫 칸을 고르는 쪽이 붙은 자리부터 막도록)
+    """
+    opp = 1 if me == 2 else 2
+    mine, theirs = board.threat_masks(me), board.threat_masks(opp)
+    m_win, o_win = mine["five"], theirs["five"]
+    o_open4 = theirs["open4"]
+    o_four = theirs["semi4"] | theirs["split4"]
+    o_open3 = theirs["open3"] | theirs["split3"]
+
+    out: Dict[str, List[Tuple[int,int]]] = {
+        "my_win": [], "opp_win": [], "opp_four": [], "opp_open4": [], "opp_open3": [],
+    }
+    cells = m_win | o_win | o_four | o_open3
+    near = board.near_mask(1)
+    stride = board.geo.stride
+    for todo in (cells & near, cells & ~near):
+        while todo:
+            b = todo & -todo
+            todo ^= b
+            i = b.bit_length() - 1
+            p = (i % stride, i // stride)
+            if m_win & b:
+                out["my_win"].append(p)
+            elif o_win & b:
+                out["opp_win"].append(p)
+            elif o_four & b:
+                out["opp_four"].append(p)
+                if o_open4 & b:
+                    out["opp_open4"].append(p)
+            else:
+                out["opp_open3"].append(p)
+    return out
+
+def _line_info(board: BitBoard, y, x, dy, dx, who):
+    """(x,y)를 who 돌로 간주한 (연속 길이, 열린 끝 수) — 비트 연산, 보드 변경 없음"""
+    return board.line_info(x, y, dir_index(dx, dy), who)
+
+def _makes_n(board: BitBoard, x, y, who, n):
     if board[y][x] != 0: return False
-    board[y][x] = who
-    ok = False
-    for dy,dx in DIRS:
-        l, _ = _line_info(board, y, x, dy, dx, who)
-        if l >= n:
-            ok = True; break
-    board[y][x] = 0
-    return ok
-
-def _pattern_flags(board, x, y, who):
+    if n == 5:
+        return bool(board.threat_masks(who)["five"] & board.cell_bit(x, y))
+    return board.max_run(x, y, who) >= n
+
+def _pattern_flags(board: BitBoard, x, y, who):
+    """(x,y)에 who가 두면 생기는 형태 {이름: bool} — 형태표(patterns.TABLE 로 매긴 칸 마스크)의 비트만 확인"""
     if board[y][x] != 0:
-        return {"open4": False, "semi4": False, "open3": False}
-    board[y][x] = who
-    open4 = semi4 = open3 = False
-    for dy,dx in DIRS:
-        l, op = _line_info(board, y, x, dy, dx, who)
-        if l == 4 and op == 2: open4 = True
-        if l == 4 and op >= 1: semi4 = True
-        if l == 3 and op == 2: open3 = True
-    board[y][x] = 0
-    return {"open4": open4, "semi4": semi4, "open3": open3}
-
-def _has_neighbor(board, x, y, r=NEAR_RADIUS):
-    n = len(board)
-    for dy in range(-r, r+1):
-        for dx in range(-r, r+1):
-            if dx==0 and dy==0: continue
-            yy, xx = y+dy, x+dx
-            if 0<=yy<n and 0<=xx<n and board[yy][xx]!=0:
-                return True
-    return False
-
-def _stones_count(board: List[List[int]]) -> int:
-    return sum(1 for row in board for v in row if v != 0)
-
-def _phase_center_factor(board: List[List[int]]) -> float:
+        return dict.fromkeys(PATTERN_KINDS, False)
+    tm, b = board.threat_masks(who), board.cell_bit(x, y)
+    return {k: bool(m & b) for k, m in tm.items()}
+
+def _has_neighbor(board: BitBoard, x, y, r=NEAR_RADIUS):
+    return board.has_neighbor(x, y, r)
+
+def _stones_count(board: BitBoard) -> int:
+    return board.stones
+
+def _phase_center_factor(board: BitBoard) -> float:
     s = _stones_count(board)
     return max(0.0, 1.0 - (s / 40.0))  # 0..1
 
@@ -193,8 +239,10 @@ def _center_bonus(board, x, y) -> float:
     maxd = ((n-1)/2.0)**2 * 2
     return 1.0 - (dist2 / maxd)
 
-def _score_move(board: List[List[int]], x: int, y: int, me: int,
-                center_scale: float, center_phase: float) -> float:
+def _score_move(board: BitBoard, x: int, y: int, me: int,
+                center_scale: float, center_phase: float,
+                near_radius: Optional[int] = None, jitter: Optional[float] = None) -> float:
+    """near_radius / jitter 를 안 주면 모듈 기본값 (프로파일 값은 인자로 — 여러 스레드가 함께 부르므로 전역을 바꾸지 않는다)"""
     if board[y][x] != 0: return -1e15
     opp = 1 if me == 2 else 2
 
@@ -202,30 +250,30 @@ def _score_move(board: List[List[int]], x: int, y: int, me: int,
     if _makes_n(board, x, y, me, 5):  return 1e12
     if _makes_n(board, x, y, opp, 5): return 1e11
 
-    # 2) 패턴 (내 강점 + 상대 위협 차단 가중)
-    myp  = _pattern_flags(board, x, y, me)
-    oppp = _pattern_flags(board, x, y, opp)
+    # 2) 패턴 (내 강점 + 상대 위협 차단 가중) — 형태표 마스크에서 이 칸의 비트만 본다
+    mine, theirs, b = board.threat_masks(me), board.threat_masks(opp), board.cell_bit(x, y)
     score = 0.0
-    if myp["open4"]:  score += 2.5e9
-    if myp["semi4"]:  score += 1.2e9
-    if myp["open3"]:  score += 3.0e8
-    if oppp["open4"]: score += BLOCK_OPEN4_BONUS
-    if oppp["semi4"]: score += BLOCK_SEMI4_BONUS
-    if oppp["open3"]: score += BLOCK_OPEN3_BONUS
+    for k, w in SHAPE_WEIGHTS:
+        if mine[k] & b:
+            score += w
+    for k, w in _block_weights():
+        if theirs[k] & b:
+            score += w
 
     # 3) 연장 선호
-    for dy,dx in DIRS:
-        l, op = _line_info(board, y, x, dy, dx, me)
+    for d in range(4):
+        l, op = board.line_info(x, y, d, me)
         score += l * 1e6 + op * 2e5
 
     # 4) 근접/중앙
-    if _has_neighbor(board, x, y, r=NEAR_RADIUS):
+    if _has_neighbor(board, x, y, r=NEAR_RADIUS if near_radius is None else near_radius):
         score += NEIGHBOR_BONUS
     score += _center_bonus(board, x, y) * center_scale * center_phase
 
     # 5) 동점 무작위성
-    if JITTER_RANGE > 0:
-        score += random.uniform(-JITTER_RANGE, JITTER_RANGE)
+    jitter = JITTER_RANGE if jitter is None else jitter
+    if jitter > 0:
+        score += random.uniform(-jitter, jitter)
 
     return score
 
@@ -250,99 +298,76 @@ def _sample_from_topk(scored: List[Tuple[Tuple[int,int], float]], k: int, T: flo
             return pos
     return top[-1][0]
 
-def _best_by_heuristic_with_profile(board: List[List[int]], me: int, profile: dict) -> Dict[str,int]:
-    # 프로파일에서 동적 파라미터 반영
-    global EXPLORATION_K, JITTER_RANGE, CENTER_SCALE, NEAR_RADIUS
-    EXPLORATION_K_OLD, JITTER_OLD, CENTER_OLD, NEAR_OLD = EXPLORATION_K, JITTER_RANGE, CENTER_SCALE, NEAR_RADIUS
-    EXPLORATION_K = profile["exploration_k"]
-    JITTER_RANGE  = profile["jitter"]
-    CENTER_SCALE  = profile["center_scale"]
-    NEAR_RADIUS   = profile["near_radius"]
+def _heuristic_scored(board: BitBoard, me: int, profile: dict,
+                      limit: Optional[int] = None) -> List[Tuple[Tuple[int,int], float]]:
+    """프로파일 파라미터로 후보를 모아 점수 매긴 [(pos, score)] (선택 전 단계). limit: numpy 경로면 상위 limit 개만"""
+    return _score_candidates(board, me, limit, profile)
 
-    try:
-        n = len(board)
-        center_phase = _phase_center_factor(board)
-        center_scale = CENTER_SCALE
+def _score_candidates(board: BitBoard, me: int, limit: Optional[int] = None,
+                      profile: Optional[dict] = None) -> List[Tuple[Tuple[int,int], float]]:
+    """
+    후보 생성 + 점수 — numpy 가 있으면 점수 행렬 한 번, 없으면 칸마다 _score_move
+    profile 이 없으면 모듈 기본값. 프로파일 값은 인자로만 넘긴다 (thread 실행기에서 여러 판이 동시에 들어옴)
+    """
+    if profile is None:
+        exploration_k, jitter, center_scale, near_radius = EXPLORATION_K, JITTER_RANGE, CENTER_SCALE, NEAR_RADIUS
+    else:
+        exploration_k, jitter = profile["exploration_k"], profile["jitter"]
+        center_scale, near_radius = profile["center_scale"], profile["near_radius"]
+    center_phase = _phase_center_factor(board)
 
-        # 후보 생성
-        candidates = _collect_candidates(board)
-        if not candidates:
-            candidates = [(x,y) for y in range(n) for x in range(n) if board[y][x]==0]
+    # 후보 생성
+    candidates = _collect_candidates(board, near_radius, exploration_k)
+    if not candidates:
+        candidates = list(board.empties())
 
-        # 점수 매기기
-        scored = []
-        for x,y in candidates:
-            s = _score_move(board, x, y, me, center_scale, center_phase)
-            scored.append(((x,y), s))
-
-        # 선택: 고급은 best 1점, 초급은 Top-K 샘플링
-        if profile["topk"] <= 1:
-            best_pos = max(scored, key=lambda t: t[1])[0]
-        else:
-            best_pos = _sample_from_topk(scored, k=profile["topk"], T=profile["temperature"])
-        return {"x": best_pos[0], "y": best_pos[1]}
-    finally:
-        # 전역 복구
-        EXPLORATION_K, JITTER_RANGE, CENTER_SCALE, NEAR_RADIUS = EXPLORATION_K_OLD, JITTER_OLD, CENTER_OLD, NEAR_OLD
-
-
-def _collect_candidates(board: List[List[int]]) -> List[Tuple[int,int]]:
-    n = len(board)
-    near = [(x,y) for y in range(n) for x in range(n)
-            if board[y][x]==0 and _has_neighbor(board,x,y,NEAR_RADIUS)]
+    if USE_NUMPY:
+        score = ai_np.score_matrix(board, me, center_scale, center_phase, near_radius, jitter,
+                                   NEIGHBOR_BONUS, SHAPE_WEIGHTS, _block_weights())
+        return ai_np.top_k(score, candidates, limit)
+
+    # 점수 매기기
+    scored = []
+    for x,y in candidates:
+        s = _score_move(board, x, y, me, center_scale, center_phase, near_radius, jitter)
+        scored.append(((x,y), s))
+    return scored
+
+def _choose_from_scored(scored: List[Tuple[Tuple[int,int], float]], profile: dict) -> Tuple[int,int]:
+    """선택: 고급은 best 1점, 초급은 Top-K 샘플링"""
+    if profile["topk"] <= 1:
+        return max(scored, key=lambda t: t[1])[0]
+    return _sample_from_topk(scored, k=profile["topk"], T=profile["temperature"])
+
+def _best_by_heuristic_with_profile(board: BitBoard, me: int, profile: dict) -> Dict[str,int]:
+    scored = _heuristic_scored(board, me, profile, limit=max(1, profile["topk"]))
+    best_pos = _choose_from_scored(scored, profile)
+    return {"x": best_pos[0], "y": best_pos[1]}
+
+
+def _collect_candidates(board: BitBoard, near_radius: Optional[int] = None,
+                        exploration_k: Optional[int] = None) -> List[Tuple[int,int]]:
+    near_radius = NEAR_RADIUS if near_radius is None else near_radius
+    exploration_k = EXPLORATION_K if exploration_k is None else exploration_k
+    near = list(board.iter_mask(board.near_mask(near_radius)))
     if near and len(near) >= 20:
         return near
-    empties = [(x,y) for y in range(n) for x in range(n) if board[y][x]==0]
+    empties = list(board.empties())
     def center_key(p): return _center_bonus(board, p[0], p[1])
-    extras = sorted(empties, key=center_key, reverse=True)[:EXPLORATION_K]
+    extras = sorted(empties, key=center_key, reverse=True)[:exploration_k]
     seen = set(near)
     return near + [p for p in extras if p not in seen]
 
 # ============ 강제 수(무조건 막기/두기) ============
 
-def _forced_move(board: List[List[int]], me: int = 2) -> Optional[Dict[str,int]]:
+def _forced_move(board: BitBoard, me: int = 2) -> Optional[Dict[str,int]]:
     """
     FORCE_MODE:
       - strict (default): 내 즉승, 상대 즉승차단만
       - plus4:           + 상대 '바로 4'를 만드는 수 차단(엔드포인트 봉쇄)
       - all:             + 상대가 두면 열린3/민4 되는 자리까지 차단
     """
-    opp = 1 if me == 2 else 2
-    n = len(board)
-
-    my_wins, opp_win_blocks = [], []
-    opp_four_blocks, opp_open3_blocks = [], []
-
-    for y in range(n):
-        for x in range(n):
-            if board[y][x] != 0:
-                continue
-
-            # 1) 내 즉승
-            if _makes_n(board, x, y, me, 5):
-                my_wins.append((x, y))
-                continue
-
-            # 2) 상대 즉승 차단
-            if _makes_n(board, x, y, opp, 5):
-                opp_win_blocks.append((x, y))
-                continue
-
-            if FORCE_MODE in ("plus4", "all"):
-                # 상대가 두면 4가 되는지(엔드포인트 차단 목적)
-                board[y][x] = opp
-                o_open4 = o_semi4 = o_open3 = False
-                for dy, dx in DIRS:
-                    l, op = _line_info(board, y, x, dy, dx, opp)
-                    if l == 4 and op == 2: o_open4 = True
-                    if l == 4 and op >= 1: o_semi4 = True
-                    if l == 3 and op == 2: o_open3 = True
-                board[y][x] = 0
-
-                if o_open4 or o_semi4:
-                    opp_four_blocks.append((x, y))
-                elif FORCE_MODE == "all" and o_open3:
-                    opp_open3_blocks.append((x, y))
+    th = _scan_threats(board, me)
 
     def _pick_best(moves: List[Tuple[int,int]]) -> Optional[Dict[str,int]]:
         if not moves:
@@ -358,10 +383,10 @@ def _forced_move(board: List[List[int]], me: int = 2) -> Optional[Dict[str,int]]
         return best
 
     for bucket, tag in (
-        (my_wins, "my_win"),
-        (opp_win_blocks, "opp_win_block"),
-        (opp_four_blocks if FORCE_MODE in ("plus4","all") else [], "opp_four_block"),
-        (opp_open3_blocks if FORCE_MODE == "all" else [], "opp_open3_block"),
+        (th["my_win"], "my_win"),
+        (th["opp_win"], "opp_win_block"),
+        (th["opp_four"] if FORCE_MODE in ("plus4","all") else [], "opp_four_block"),
+        (th["opp_open3"] if FORCE_MODE == "all" else [], "opp_open3_block"),
     ):
         pick = _pick_best(bucket)
         if pick is not None:
@@ -373,55 +398,35 @@ def _forced_move(board: List[List[int]], me: int = 2) -> Optional[Dict[str,int]]
 
 # ============ 일반 휴리스틱 / LLM 블렌딩 ============
 
-def _best_by_heuristic(board: List[List[int]], me: int = 2) -> Dict[str, int]:
-    n = len(board)
-    center_phase = _phase_center_factor(board)
-    center_scale = CENTER_SCALE
-
-    candidates = _collect_candidates(board)
-    if not candidates:
-        candidates = [(x,y) for y in range(n) for x in range(n) if board[y][x]==0]
-
-    best = {"x": 0, "y": 0}
-    best_s = -1e18
-    for x,y in candidates:
-        s = _score_move(board, x, y, me, center_scale, center_phase)
-        if s > best_s:
-            best_s = s; best = {"x": x, "y": y}
-    return best
+def _best_by_heuristic(board: BitBoard, me: int = 2) -> Dict[str, int]:
+    scored = _score_candidates(board, me, limit=1)
+    if not scored:
+        return {"x": 0, "y": 0}
+    (x, y), _ = max(scored, key=lambda t: t[1])
+    return {"x": x, "y": y}
 
-def _ask_llm(board: List[List[int]], difficulty: str, history=None) -> Dict[str, int]:
-    prof = _get_profile(difficulty)
-    llm_url = _get_llm_url()
-    if not llm_url:
-        raise LLMError("OMOK_LLM_URL이 설정되어 있지 않습니다.")
+def _llm_payload(board: BitBoard, difficulty: str, history=None) -> dict:
+    payload = {"board": board.rows, "difficulty": difficulty or "초급", "player": 2}
+    if history:
+        payload["history"] = history
+    return payload
 
-    n_samples = max(1, int(os.getenv("OMOK_LLM_N_SAMPLES", "1")))
+def _llm_candidates(board: BitBoard, prof: dict, responses: List[dict]) -> List[List[Tuple[Tuple[int,int], float]]]:
+    """
+    LLM 응답(샘플 여러 개)별 후보를 서버 점수와 alpha 블렌딩한 [(pos, score)] 목록들 (샘플링 전 단계)
+    쓸 만한 후보가 하나도 없으면 휴리스틱 후보 목록 하나. 국면 캐시에는 이 결과를 넣는다
+    """
     alpha = prof["alpha_blend"]  # ⬅ 난이도별 alpha
     center_phase = _phase_center_factor(board)
 
-    best = None
-    best_s = -1e18
-
-    for _ in range(n_samples):
-        payload = {"board": board, "difficulty": difficulty or "초급", "player": 2}
-        if history:
-            payload["history"] = history
-        try:
-            resp = requests.post(llm_url, json=payload, timeout=_get_timeout())
-        except requests.RequestException as e:
-            raise LLMError(f"LLM 서버 연결 실패: {e!r}")
-        if resp.status_code != 200:
-            raise LLMError(f"LLM 서버 오류: {resp.status_code} {resp.text}")
+    def _srv_score(x, y):
+        return _score_move(board, x, y, me=2,
+                           center_scale=CENTER_SCALE,
+                           center_phase=center_phase)
 
-        data = resp.json()
+    lists = []
+    for data in responses:
         raw_cands = data.get("candidates")
-
-        def _srv_score(x, y):
-            return _score_move(board, x, y, me=2,
-                               center_scale=CENTER_SCALE,
-                               center_phase=center_phase)
-
         scored = []
         if isinstance(raw_cands, list) and raw_cands:
             for c in raw_cands:
@@ -438,33 +443,228 @@ def _ask_llm(board: List[List[int]], difficulty: str, history=None) -> Dict[str,
                 except Exception:
                     continue
             if scored:
-                # 초급: Top-K 샘플링, 고급: 최고점
-                if prof["topk"] > 1:
-                    pos = _sample_from_topk(scored, k=prof["topk"], T=prof["temperature"])
-                else:
-                    pos = max(scored, key=lambda t: t[1])[0]
-                s = next(s for p,s in scored if p == pos)
-                if s > best_s: best_s, best = s, {"x": pos[0], "y": pos[1]}
-        if best is None and "x" in data and "y" in data:
+                lists.append(scored)
+        # 후보가 아직 하나도 없을 때만 응답의 단일 좌표(x,y)를 후보로
+        if not lists and "x" in data and "y" in data:
             try:
                 x, y = int(data["x"]), int(data["y"])
                 if 0 <= y < len(board) and 0 <= x < len(board[0]) and board[y][x] == 0:
-                    s = _srv_score(x, y)
-                    if s > best_s:
-                        best_s, best = s, {"x": x, "y": y}
+                    lists.append([((x, y), _srv_score(x, y))])
             except Exception:
                 pass
 
-    if best is None:
-        best = _best_by_heuristic_with_profile(board, me=2, profile=prof)
+    if not lists:
+        lists.append(_heuristic_scored(board, me=2, profile=prof))
+    return lists
+
+def _pick_from_candidates(lists: List[List[Tuple[Tuple[int,int], float]]], prof: dict) -> Dict[str, int]:
+    """목록마다 한 수를 고르고(초급: Top-K 샘플링, 고급: 최고점) 그중 점수가 가장 높은 수"""
+    best = None
+    best_s = -1e18
+    for scored in lists:
+        pos = _choose_from_scored(scored, prof)
+        s = next(s for p,s in scored if p == pos)
+        if best is None or s > best_s:
+            best_s, best = s, {"x": pos[0], "y": pos[1]}
     return best
 
+def _pick_from_llm(board: BitBoard, prof: dict, responses: List[dict]) -> Dict[str, int]:
+    """LLM 응답(샘플 여러 개)의 후보를 서버 점수와 alpha 블렌딩해 한 수 선택 (없으면 휴리스틱)"""
+    return _pick_from_candidates(_llm_candidates(board, prof, responses), prof)
+
+def _n_samples() -> int:
+    return max(1, int(os.getenv("OMOK_LLM_N_SAMPLES", "1")))
+
+def _sample_payloads(payload: dict) -> List[dict]:
+    """샘플마다 번호(sample)를 붙인 요청 — llm_server 가 같은 국면 요청을 하나로 병합/캐시하므로
+    번호가 없으면 N개 샘플이 모두 같은 답을 받는다 (0 번은 단일 샘플 요청과 같은 캐시 키)"""
+    return [dict(payload, sample=i) for i in range(_n_samples())]
+
+# 동기 경로용 keep-alive 세션 (비동기 경로는 llm_client 의 풀 사용)
+_SESSION = requests.Session()
+
+def _fetch_llm(board: BitBoard, difficulty: str, history=None, deadline: Optional[float] = None) -> List[dict]:
+    llm_url = _get_llm_url()
+    if not llm_url:
+        raise LLMError("OMOK_LLM_URL이 설정되어 있지 않습니다.")
+
+    responses = []
+    for payload in _sample_payloads(_llm_payload(board, difficulty, history)):
+        timeout = min(_get_timeout(), _remaining(deadline))
+        if timeout <= 0:
+            if responses:
+                break  # 마감 — 받은 샘플만으로
+            raise LLMError("LLM 응답 전에 마감 시각이 지났습니다.")
+        try:
+            resp = _SESSION.post(llm_url, json=payload, timeout=timeout)
+        except requests.RequestException as e:
+            raise LLMError(f"LLM 서버 연결 실패: {e!r}")
+        if resp.status_code != 200:
+            raise LLMError(f"LLM 서버 오류: {resp.status_code} {resp.text}")
+        responses.append(resp.json())
+    return responses
+
+async def _fetch_llm_async(board: BitBoard, difficulty: str, history=None,
+                           deadline: Optional[float] = None) -> List[dict]:
+    """
+    _fetch_llm 의 비동기 판: 풀링된 keep-alive 연결로 N개 샘플을 동시에 보내고,
+    공동 마감(OMOK_LLM_TIMEOUT_SEC 와 요청 마감 중 이른 쪽) 안에 도착한 응답만 돌려준다.
+    """
+    llm_url = _get_llm_url()
+    if not llm_url:
+        raise LLMError("OMOK_LLM_URL이 설정되어 있지 않습니다.")
+    timeout = min(_get_timeout(), _remaining(deadline))
+    if timeout <= 0:
+        raise LLMError("LLM 요청 전에 마감 시각이 지났습니다.")
+
+    responses, errors = await post_json_fanout(llm_url, _sample_payloads(_llm_payload(board, difficulty, history)),
+                                               timeout=timeout)
+    if not responses:
+        raise LLMError(f"LLM 서버 응답 없음: {'; '.join(errors) or 'unknown'}")
+    if errors and AI_DEBUG:
+        print(f"[LLM] {len(errors)} sample(s) dropped: {errors}")
+    return responses
+
+# 마감 때문에 LLM 대신 휴리스틱으로 답한 횟수 (이 프로세스)
+_SLO_STATS = {"llm_deadline_fallbacks": 0}
+
+def _past_deadline_fallback(board: BitBoard, prof: dict, deadline: Optional[float], err: LLMError) -> Dict[str, int]:
+    """LLM 이 마감 안에 답하지 못했으면 휴리스틱 수(그때까지의 최선), 마감 전의 실패(연결 거부 등)는 그대로 올림"""
+    if _remaining(deadline) > 0:
+        raise err
+    _SLO_STATS["llm_deadline_fallbacks"] += 1
+    if AI_DEBUG:
+        print(f"[LLM] deadline passed ({err}) -> heuristic")
+    return _best_by_heuristic_with_profile(board, me=2, profile=prof)
+
+def _ask_llm(board: BitBoard, difficulty: str, history=None, cache_key=None,
+             deadline: Optional[float] = None) -> Dict[str, int]:
+    """LLM 후보 → 한 수. cache_key 가 있으면 블렌딩된 후보 목록을 캐시해 두고 샘플링만 새로 한다"""
+    prof = _get_profile(difficulty)
+    lists = MOVE_CACHE.get(cache_key) if cache_key is not None else None
+    if lists is None:
+        try:
+            responses = _fetch_llm(board, difficulty, history, deadline)
+        except LLMError as e:
+            return _past_deadline_fallback(board, prof, deadline, e)
+        lists = _llm_candidates(board, prof, responses)
+        if cache_key is not None:
+            MOVE_CACHE.put(cache_key, lists)
+    return _pick_from_candidates(lists, prof)
+
+async def _ask_llm_async(board: BitBoard, difficulty: str, history=None, cache_key=None,
+                         deadline: Optional[float] = None) -> Dict[str, int]:
+    prof = _get_profile(difficulty)
+    lists = MOVE_CACHE.get(cache_key) if cache_key is not None else None
+    if lists is None:
+        try:
+            responses = await _fetch_llm_async(board, difficulty, history, deadline)
+        except LLMError as e:
+            return _past_deadline_fallback(board, prof, deadline, e)
+        lists = _llm_candidates(board, prof, responses)
+        if cache_key is not None:
+            MOVE_CACHE.put(cache_key, lists)
+    return _pick_from_candidates(lists, prof)
+
 def _rule_based_ai(board: List[List[int]]) -> Dict[str, int]:
-    return _best_by_heuristic(board, me=2)
+    return _best_by_heuristic(as_bitboard(board), me=2)
+
+def _cache_key(board: BitBoard, difficulty: str, renju_player: Optional[int]) -> tuple:
+    # AI 는 항상 이 보드의 2 → 둘 차례는 (해시, 렌주 제한 색)으로 정해진다
+    return board.hash, renju_player, difficulty or "초급"
+
+def find_best_move(board, difficulty: str, history=None, renju_player: Optional[int] = 1,
+                   deadline: Optional[float] = None) -> Dict[str, int]:
+    """
+    board: List[List[int]] 또는 BitBoard(OmokGame.bb). 내부는 비트보드로만 계산
+    renju_player: 이 보드에서 금수 제한을 받는 색 (흑/백을 뒤집은 보드면 2)
+    deadline: 응답 마감(time.time() 기준, 생략 시 지금 + OMOK_AI_SLO_SEC) — 넘기 전에 그때까지의 최선 수를 낸다
+    국면 캐시: 고급은 정해진 수를, 초급은 LLM 후보 목록을 재사용 (초급 강제 수는 확률적이라 매번 계산)
+    — 마감 때문에 탐색 예산이 깎인 고급 수는 캐시에 넣지 않는다 (얕은 수가 TTL 동안 모두에게 나가지 않게)
+    """
+    if deadline is None:
+        deadline = ai_deadline()
+    board = as_bitboard(board)
+    key = _cache_key(board, difficulty, renju_player)
+    if difficulty == "고급":
+        hit = MOVE_CACHE.get(key)
+        if hit is not None:
+            _maybe_sleep_delay(_delay_left(hit[1], deadline))
+            return dict(hit[0])
+    move, delay, full = _decide_without_llm(board, difficulty, renju_player, deadline)
+    if move is not None:
+        if difficulty == "고급" and full:
+            MOVE_CACHE.put(key, (move, delay))
+        _maybe_sleep_delay(_delay_left(delay, deadline))
+        return dict(move)
+    return _ask_llm(board, difficulty or "초급", history=history, cache_key=key, deadline=deadline)
+
+async def find_best_move_async(board, difficulty: str, history=None, renju_player: Optional[int] = 1,
+                               deadline: Optional[float] = None) -> Dict[str, int]:
+    """
+    find_best_move 의 서버용 비동기 판 (국면 캐시·마감도 동일)
+    - 북/강제 수/탐색은 ai_pool 워커에서 계산하고(몇 ms 모아 배치로), 지연은 asyncio.sleep (이벤트 루프를 막지 않음)
+    - 초급 LLM 단계는 비동기 클라이언트로 기다린다
+    """
+    if deadline is None:
+        deadline = ai_deadline()
+    board = as_bitboard(board)
+    key = _cache_key(board, difficulty, renju_player)
+    hit = MOVE_CACHE.get(key) if difficulty == "고급" else None
+    if hit is not None:
+        move, delay = hit
+    else:
+        move, delay, full = await _BATCHER.submit((board, difficulty, renju_player, deadline))
+        if move is not None and difficulty == "고급" and full:
+            MOVE_CACHE.put(key, (move, delay))
+    if move is not None:
+        delay = _delay_left(delay, deadline)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return dict(move)
+    return await _ask_llm_async(board, difficulty or "초급", history=history, cache_key=key, deadline=deadline)
+
+def ai_stats() -> dict:
+    """서버 프로세스의 국면 캐시 적중/실패 카운터, 마이크로배치 카운터, 마감(SLO) 설정과 폴백 수"""
+    return {"move_cache": MOVE_CACHE.stats(), "batch": _BATCHER.stats(),
+            "slo": dict(_SLO_STATS, slo_sec=OMOK_AI_SLO_SEC)}
+
+def _decide_batch(items: List[Tuple[BitBoard, str, Optional[int], Optional[float]]]) -> List[Any]:
+    """ai_batch 워커 쪽: [(보드, 난이도, 렌주 색, 마감)] → 같은 순서의 (수, 지연, 전체 예산 여부). 한 판의 실패는 그 자리에 예외로"""
+    out: List[Any] = []
+    for board, difficulty, renju_player, deadline in items:
+        try:
+            out.append(_decide_without_llm(board, difficulty, renju_player, deadline))
+        except Exception as e:
+            out.append(e)
+    return out
+
+def _batch_key(item) -> Optional[tuple]:
+    # 고급만 같은 국면 = 같은 수 (초급 강제 수는 확률적이라 요청마다 따로)
+    board, difficulty, renju_player, _ = item
+    return _cache_key(board, difficulty, renju_player) if difficulty == "고급" else None
 
-def find_best_move(board: List[List[int]], difficulty: str, history=None) -> Dict[str, int]:
+_BATCHER = MicroBatcher(_decide_batch, max_batch=OMOK_AI_BATCH_MAX, max_wait_ms=OMOK_AI_BATCH_WAIT_MS,
+                        shards=OMOK_AI_WORKERS, key=_batch_key)
+
+def _decide_without_llm(board: BitBoard, difficulty: str, renju_player: Optional[int],
+                        deadline: Optional[float] = None) -> Tuple[Optional[Dict[str, int]], float, bool]:
+    """
+    오프닝북/강제 수/고급 탐색으로 정해지는 (수, 응답 전 지연초, 전체 예산 여부). 초급이라 LLM 단계가 필요하면 (None, 0, True)
+    지연은 호출한 쪽이 (마감 안에서) 기다린다 — 워커 풀에서 돌 때 워커를 잠재우지 않도록
+    탐색 예산은 프로파일 값과 마감까지 남은 시간 중 작은 쪽 (남은 시간이 없으면 휴리스틱만)
+    — 그렇게 깎였으면 세 번째 값이 False (국면 캐시에 넣지 않는다)
+    """
     prof = _get_profile(difficulty)
 
+    # 0) 오프닝북: 적중하면 바로 반환 (인위적 지연도 없음). 북은 '흑=렌주 제한' 방향 국면만 담는다
+    if OPENING_BOOK is not None and renju_player == 1 and prof.get("use_book"):
+        move = OPENING_BOOK.lookup(board)
+        if move is not None:
+            if AI_DEBUG:
+                print(f"[BOOK] hit -> {move}")
+            return move, 0.0, True
+
     # 0) 초·고급 모두 공통: 즉승/상대 5/열린4/민4는 “항상” 강제
     #    열린3은 난이도에 따라 확률적으로만 강제
     forced = _find_must_block_move_for_beginner(
@@ -474,13 +674,19 @@ def find_best_move(board: List[List[int]], difficulty: str, history=None) -> Dic
         force_semi4=prof["force_block_semi4"],
     )
     if forced is not None:
-        _maybe_sleep_delay()
-        return {"x": forced[0], "y": forced[1]}
+        return {"x": forced[0], "y": forced[1]}, _force_delay_sec(), True
 
-    # 1) 난이도 분기: 고급 = 순수 휴리스틱(결정적), 초급 = LLM 블렌딩 + 샘플링
+    # 1) 난이도 분기: 고급 = 탐색 엔진(시간 예산) → 휴리스틱 폴백, 초급 = LLM 블렌딩 + 샘플링
     if difficulty == "고급":
-        move = _best_by_heuristic_with_profile(board, me=2, profile=prof)
-        _maybe_sleep_delay()   # ⬅️ 고급 난이도도 동일하게 지연
-        return move
-    else:
-        return _ask_llm(board, difficulty or "초급", history=history)
+        move = None
+        full_budget = prof.get("time_budget", 0)
+        budget = min(full_budget, _remaining(deadline))
+        if budget > 0:
+            from search import search_move
+            move = search_move(board, me=2, time_budget=budget,
+                               max_depth=prof["search_depth"], width=prof["search_width"],
+                               near_radius=prof["near_radius"], renju_player=renju_player)
+        if move is None:
+            move = _best_by_heuristic_with_profile(board, me=2, profile=prof)
+        return move, _force_delay_sec(), budget >= full_budget   # ⬅️ 고급 난이도도 동일하게 지연
+    return None, 0.0, True
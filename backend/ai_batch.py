@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# backend/ai_batch.py
+"""
+AI 요청 마이크로배칭 — 붐빌 때 판마다 따로 풀에 보내던 계산을 몇 ms 모아 한 번에
+- 첫 요청이 오면 max_wait_ms 뒤(또는 max_batch 개가 차면 즉시) 모인 요청을 워커 수만큼 묶음으로 나눠 ai_pool 에 보낸다
+  → 호출마다 들던 피클/IPC/스케줄 비용을 묶음당 한 번으로, 워커는 모두 바쁘게
+- key 가 같은 요청(예: 같은 국면의 고급 수)은 한 번만 계산해 결과를 나눠 준다
+- fn 은 워커에서 도는 모듈 최상위 함수: 항목 목록 → 같은 순서의 결과 목록 (항목별 실패는 예외 객체로)
+- max_batch <= 1 이면 모으지 않고 바로 보낸다 (이전 동작)
+"""
+from __future__ import annotations
+import asyncio
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import ai_pool
+
+
+class MicroBatcher:
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_batch: int = 16, max_wait_ms: float = 2.0,
+                 shards: int = 1, key: Optional[Callable[[Any], Optional[Hashable]]] = None):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.shards = max(1, shards)
+        self.key = key
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._by_key: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # 루프는 태스크를 약한 참조로만 들고 있어, 돌고 있는 묶음은 여기서 붙잡는다
+        self._stats = {"batches": 0, "items": 0, "coalesced": 0, "largest": 0}
+
+    async def submit(self, item: Any) -> Any:
+        """item 하나를 배치에 넣고 그 결과를 기다린다 (fn 이 그 항목에 돌려준 예외는 그대로 올라온다)"""
+        if self.max_batch <= 1:
+            fut = asyncio.get_running_loop().create_future()
+            await self._run([(item, fut)])
+            return fut.result()
+        k = self.key(item) if self.key is not None else None
+        fut = self._by_key.get(k) if k is not None else None
+        if fut is not None:
+            self._stats["coalesced"] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._pending.append((item, fut))
+            if k is not None:
+                self._by_key[k] = fut
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+        # shield: 기다리던 요청 하나가 취소돼도 같은 결과를 기다리는 다른 요청/배치는 그대로
+        return await asyncio.shield(fut)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._by_key = self._pending, [], {}
+        if not batch:
+            return
+        self._stats["batches"] += 1
+        self._stats["items"] += len(batch)
+        self._stats["largest"] = max(self._stats["largest"], len(batch))
+        n = min(self.shards, len(batch))
+        for i in range(n):
+            task = asyncio.ensure_future(self._run(batch[i::n]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, chunk: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await ai_pool.run(self.fn, [item for item, _ in chunk])
+        except Exception as e:  # 풀 자체 실패(워커 사망 등) → 묶음 전체
+            results = [e] * len(chunk)
+        for (_, fut), r in zip(chunk, results):
+            if fut.done():
+                continue
+            if isinstance(r, BaseException):
+                fut.set_exception(r)
+            else:
+                fut.set_result(r)
+
+    def stats(self) -> dict:
+        s = dict(self._stats, pending=len(self._pending))
+        s["mean_batch"] = round(s["items"] / s["batches"], 2) if s["batches"] else 0.0
+        return s
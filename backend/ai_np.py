@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# backend/ai_np.py
+"""
+NumPy 전판 평가 — 후보마다 ai._score_move 를 부르는 대신 보드 전체의 점수 행렬을 한 번에
+- 형태 점수: 형태표(threat_masks) 비트마스크를 (n, n) 불리언 배열로 풀어 가중합
+- 연장 선호: 네 방향 연속 길이·열린 끝을 패딩 배열의 시프트 뷰로 모든 칸 동시에 (BitBoard.line_info 와 같은 값)
+- 근접(반경 r 팽창) / 중앙 보너스 / 동점 흔들림도 배열로. 점유 칸은 _score_move 와 같이 -1e15
+- numpy 가 없으면 AVAILABLE = False → ai.py 는 칸별 순수 파이썬 경로를 그대로 쓴다
+"""
+from __future__ import annotations
+import random
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+from bitboard import BitBoard, DIR_VECS
+
+AVAILABLE = np is not None
+
+
+def _unpack(board: BitBoard, mask: int) -> "np.ndarray":
+    """가로 레이아웃(stride n+1) 비트마스크 → (n, n) bool"""
+    n, s = board.n, board.geo.stride
+    raw = np.frombuffer(mask.to_bytes((n * s + 7) // 8, "little"), np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:n * s].reshape(n, s)[:, :n].view(bool)
+
+
+@lru_cache(maxsize=None)
+def _center(n: int) -> "np.ndarray":
+    """ai._center_bonus 와 같은 값의 (n, n) 배열"""
+    c = (n - 1) / 2.0
+    ys, xs = np.mgrid[0:n, 0:n]
+    return 1.0 - ((xs - c) ** 2 + (ys - c) ** 2) / (c * c * 2)
+
+
+@lru_cache(maxsize=None)
+def _jitter_pool() -> "np.ndarray":
+    return np.random.default_rng(0x0A0C).uniform(-1.0, 1.0, 1 << 16)
+
+
+def _padded_rows(board: BitBoard) -> "np.ndarray":
+    """보드를 사방 n 칸씩 '보드 밖(3)'으로 둘러싼 (3n, 3n) int8 — 시프트 뷰가 경계를 따로 검사하지 않게"""
+    n = board.n
+    p = np.full((3 * n, 3 * n), 3, np.int8)
+    p[n:2 * n, n:2 * n] = board.rows
+    return p
+
+
+def _near(pocc: "np.ndarray", n: int, r: int) -> "np.ndarray":
+    """체비쇼프 반경 r 안에 돌이 있는 칸 (pocc: 패딩된 점유 배열). 빈칸만 쓰므로 자기 자신 포함 팽창과 같다"""
+    rows = np.zeros((n + 2 * r, n), bool)
+    band = pocc[n - r:2 * n + r]
+    for dx in range(n - r, n + r + 1):
+        rows |= band[:, dx:dx + n]
+    out = np.zeros((n, n), bool)
+    for dy in range(2 * r + 1):
+        out |= rows[dy:dy + n]
+    return out
+
+
+@lru_cache(maxsize=None)
+def _ray_index(n: int) -> "np.ndarray":
+    """[k-1, r, y, x] = (y, x) 에서 8방향 중 r 번째로 k 칸 간 곳의 평탄 인덱스 (_padded_rows 기준)"""
+    rays = [v for dx, dy in DIR_VECS for v in ((dx, dy), (-dx, -dy))]
+    ys, xs = np.mgrid[0:n, 0:n]
+    w = 3 * n
+    return np.array([[(ys + n + k * sy) * w + (xs + n + k * sx) for sx, sy in rays]
+                     for k in range(1, n)], np.intp)
+
+
+def _extension(pm: "np.ndarray", pe: "np.ndarray", n: int) -> "np.ndarray":
+    """
+    모든 칸의 Σ_방향 (연속 길이 × 1e6 + 열린 끝 수 × 2e5) — 칸을 내 돌로 간주 (pm/pe: 패딩된 내 돌/빈칸, 평탄)
+    8개 반직선을 한 배열로 쌓아 k 칸째를 한 번에 본다 (가장 긴 연속이 끝나면 멈춤)
+    """
+    run = np.zeros((8, n, n), np.int64)
+    opens = np.zeros((8, n, n), np.int64)
+    cur = np.ones((8, n, n), bool)  # 1..k-1 칸이 모두 내 돌
+    for idx in _ray_index(n):
+        opens += cur & pe[idx]
+        cur &= pm[idx]
+        if not cur.any():
+            break
+        run += cur
+    # 반직선 둘(정·역방향)이 한 방향: 연속 길이 = 1 + 앞 + 뒤
+    return (4 + run.sum(axis=0)) * 1e6 + opens.sum(axis=0) * 2e5
+
+
+def score_matrix(board: BitBoard, me: int, center_scale: float, center_phase: float, near_radius: int,
+                 jitter: float, neighbor_bonus: float, shape_weights: Sequence[Tuple[str, float]],
+                 block_weights: Sequence[Tuple[str, float]]) -> "np.ndarray":
+    """(n, n) 점수 행렬 [y, x] — 칸마다 ai._score_move 와 같은 식 (흔들림 값만 다름)"""
+    n = board.n
+    opp = 3 - me
+    mine, theirs = board.threat_masks(me), board.threat_masks(opp)
+    p = _padded_rows(board)
+    pocc = (p == 1) | (p == 2)
+    occ = pocc[n:2 * n, n:2 * n]
+
+    score = _extension((p == me).ravel(), (p == 0).ravel(), n)
+    for k, w in shape_weights:
+        if mine[k]:
+            score += _unpack(board, mine[k]) * w
+    for k, w in block_weights:
+        if theirs[k]:
+            score += _unpack(board, theirs[k]) * w
+    score += _near(pocc, n, near_radius) * neighbor_bonus
+    score += _center(n) * (center_scale * center_phase)
+    if jitter > 0:
+        # 미리 뽑아 둔 난수 풀에서 random 모듈로 구간을 고른다 → random.seed 로 재현되는 대국(오프닝북 생성 등)이 그대로
+        pool = _jitter_pool()
+        o = random.randrange(len(pool) - n * n)
+        score += pool[o:o + n * n].reshape(n, n) * jitter
+
+    # 즉승 / 즉패 차단은 다른 항을 덮어쓴다
+    if theirs["five"]:
+        score[_unpack(board, theirs["five"])] = 1e11
+    if mine["five"]:
+        score[_unpack(board, mine["five"])] = 1e12
+    score[occ] = -1e15
+    return score
+
+
+def top_k(score: "np.ndarray", cells: List[Tuple[int, int]],
+          k: Optional[int] = None) -> List[Tuple[Tuple[int, int], float]]:
+    """후보 칸들의 [(pos, score)] — k 가 있으면 점수 상위 k 개만 (내림차순)"""
+    if not cells:
+        return []
+    xs, ys = np.array(cells).T
+    vals = score[ys, xs]
+    if k is not None and 0 < k < len(cells):
+        idx = np.argpartition(-vals, k - 1)[:k]
+        idx = idx[np.argsort(-vals[idx], kind="stable")]
+    else:
+        idx = range(len(cells))
+    return [((int(xs[i]), int(ys[i])), float(vals[i])) for i in idx]
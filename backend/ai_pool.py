@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# backend/ai_pool.py
+"""
+AI 계산 워커 풀
+- 오프닝북/강제 수/탐색 같은 CPU 작업을 이벤트 루프 밖(프로세스 또는 스레드 풀)에서 돌린다
+- 실행기 종류와 워커 수는 config.OMOK_AI_EXECUTOR / OMOK_AI_WORKERS
+- 프로세스 풀에 넘기는 함수·인자는 피클 가능해야 한다 (모듈 최상위 함수, BitBoard 는 피클 지원)
+"""
+from __future__ import annotations
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+
+from config import OMOK_AI_EXECUTOR, OMOK_AI_WORKERS
+
+_executor: Optional[Executor] = None
+
+
+def _warm() -> None:
+    """워커에서 AI 모듈(북 mmap, 기하 표 포함)을 미리 로드 — 첫 수가 import 비용을 내지 않도록"""
+    import ai  # noqa: F401
+    import search  # noqa: F401
+
+
+def get_executor() -> Optional[Executor]:
+    """공유 실행기 (inline 모드면 None)"""
+    global _executor
+    if _executor is None and OMOK_AI_EXECUTOR != "inline":
+        if OMOK_AI_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=OMOK_AI_WORKERS, thread_name_prefix="omok-ai")
+        else:
+            # spawn: 스레드가 도는 서버 프로세스를 fork 하면 락 상태까지 복사되므로 새 인터프리터로 띄움
+            _executor = ProcessPoolExecutor(max_workers=OMOK_AI_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def start() -> None:
+    """앱 시작 시 호출: 워커를 띄우고 AI 모듈을 미리 import (기다리지 않음)"""
+    ex = get_executor()
+    if isinstance(ex, ProcessPoolExecutor):
+        for _ in range(OMOK_AI_WORKERS):
+            ex.submit(_warm)
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+async def run(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """fn(*args, **kwargs) 를 풀에서 실행하고 결과를 await. 워커가 죽었으면 다음 호출 때 풀을 새로 만든다"""
+    global _executor
+    ex = get_executor()
+    call = partial(fn, *args, **kwargs)
+    if ex is None:
+        return call()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(ex, call)
+    except BrokenProcessPool:
+        if _executor is ex:
+            _executor = None
+        raise
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/bench/arena.py
+"""
+자가대국 아레나 — 엔진 설정끼리 헤드리스 OmokGame 대국을 프로세스 풀로 돌려 강도(Elo)와 속도(ms/수)를 잰다
+- 엔진 = 기본 프로파일(고급/초급) + 덮어쓸 값
+    소문자 키 → DIFF_PROFILES 항목 (time_budget, search_depth, search_width, exploration_k, jitter …)
+    대문자 키 → ai 모듈 가중치 (BLOCK_OPEN4_BONUS, BLOCK_SEMI4_BONUS(띈 4 차단 포함), BLOCK_OPEN3_BONUS,
+                BLOCK_SPLIT3_BONUS, CENTER_SCALE, NEIGHBOR_BONUS …) — 점수를 매길 때마다 읽으므로 덮어쓰면 바로 반영
+  예) --engine "base=고급" --engine "fast=고급,time_budget=0.1,search_depth=4" --engine "heur=고급,time_budget=0"
+- 초급은 LLM 없이 '강제 수 → 휴리스틱 Top-K 샘플링' 으로 둔다
+- 모든 엔진 쌍이 같은 무작위 오프닝을 흑/백 바꿔 두 번씩 둔다. 흑은 렌주 금수 적용
+- Elo: 전체 결과에 Bradley-Terry 최대우도 적합(평균 1500). --target 을 주면 기준 엔진(첫 번째) 대비
+  그 Elo 차 이상인 엔진 중 ms/수가 가장 작은 것을 고른다
+
+예) python bench/arena.py --engine "base=고급" --engine "d4=고급,search_depth=4" --games 200 --target -30
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+Engine = Tuple[str, str, Dict[str, object]]  # (이름, 기본 프로파일, 덮어쓸 값)
+
+
+def parse_engine(spec: str) -> Engine:
+    """ "name=고급,key=value,..." → (name, "고급", {key: value}) """
+    name, _, rest = spec.partition("=")
+    parts = [p for p in rest.split(",") if p]
+    if not name or not parts:
+        raise argparse.ArgumentTypeError(f"엔진 형식: name=고급[,key=value...] ({spec!r})")
+    base, overrides = parts[0].strip(), {}
+    for p in parts[1:]:
+        k, _, v = p.partition("=")
+        try:
+            overrides[k.strip()] = json.loads(v)
+        except ValueError:
+            overrides[k.strip()] = v.strip()
+    return name.strip(), base, overrides
+
+
+# ---------------- 워커 프로세스 ----------------
+
+_tts: dict = {}
+
+
+def _init_worker(target: str) -> None:
+    # 지연/북/국면 캐시 없이 (ai import 전에 설정)
+    os.environ.update({"OMOK_FORCE_DELAY_SEC": "0", "OMOK_BOOK_PATH": "", "OMOK_MOVE_CACHE_SIZE": "0",
+                       "OMOK_AI_EXECUTOR": "inline", "OMOK_AI_DEBUG": "0"})
+    sys.path.insert(0, target)
+    os.chdir(target)
+
+
+@contextmanager
+def _applied(engine: Engine):
+    """엔진 설정을 ai 모듈에 잠시 적용 (치환표도 엔진별로 따로 — 평가 가중치가 다르면 값이 섞이면 안 됨)"""
+    import ai
+    import ttable
+    name, base, overrides = engine
+    saved_prof = ai.DIFF_PROFILES[base]
+    saved_glob = {k: getattr(ai, k) for k in overrides if k.isupper()}
+    saved_tt = ttable._shared
+    ai.DIFF_PROFILES[base] = dict(saved_prof, **{k: v for k, v in overrides.items() if not k.isupper()})
+    for k in saved_glob:
+        setattr(ai, k, overrides[k])
+    ttable._shared = _tts.setdefault(name, None)
+    try:
+        yield ai
+    finally:
+        _tts[name] = ttable._shared
+        ttable._shared = saved_tt
+        ai.DIFF_PROFILES[base] = saved_prof
+        for k, v in saved_glob.items():
+            setattr(ai, k, v)
+
+
+def _engine_move(g, engine: Engine, color: int) -> Tuple[int, int]:
+    """color(1=흑, 2=백)로 둘 수. AI 는 '자기=2' 보드를 가정하므로 흑이면 뒤집어서 묻는다"""
+    with _applied(engine) as ai:
+        bb = g.bb if color == 2 else g.bb.swapped()
+        base = engine[1]
+        mv, _, _ = ai._decide_without_llm(bb, base, 1 if color == 2 else 2)
+        if mv is None:  # 초급: LLM 대신 휴리스틱 샘플링
+            mv = ai._best_by_heuristic_with_profile(bb, 2, ai._get_profile(base))
+    return mv["x"], mv["y"]
+
+
+def _first_legal(g) -> Optional[Tuple[int, int]]:
+    c = g.board_size // 2
+    n = g.board_size
+    cells = sorted(((x, y) for y in range(n) for x in range(n) if not g.bb.get(x, y)),
+                   key=lambda p: max(abs(p[0] - c), abs(p[1] - c)))
+    for x, y in cells:
+        if g.current_turn != 1 or not g._is_forbidden_move(x, y)[0]:
+            return x, y
+    return None
+
+
+def play_game(black: Engine, white: Engine, opening: List[Tuple[int, int]], board_size: int,
+              max_moves: int) -> dict:
+    """한 판. 반환: 승자 엔진 이름(무승부 None), 수, 엔진별 생각 시간"""
+    from game import OmokGame
+    g = OmokGame(board_size)
+    for x, y in opening:
+        g.place_stone(x, y, g.current_turn)
+    engines = {1: black, 2: white}
+    think = {black[0]: [], white[0]: []}
+    illegal = {black[0]: 0, white[0]: 0}
+    while not g.game_over and len(g.moves) < max_moves and g.bb.stones < board_size * board_size:
+        color = g.current_turn
+        eng = engines[color]
+        t0 = time.perf_counter()
+        x, y = _engine_move(g, eng, color)
+        think[eng[0]].append((time.perf_counter() - t0) * 1000.0)
+        ok, _ = g.place_stone(x, y, color)
+        if not ok:  # 금수/잘못된 좌표 → 가장 가까운 합법 수로 대신 두고 기록
+            illegal[eng[0]] += 1
+            alt = _first_legal(g)
+            if alt is None:
+                break
+            g.place_stone(*alt, color)
+    winner = engines[g.winner][0] if g.winner else None
+    return {"black": black[0], "white": white[0], "winner": winner, "moves": len(g.moves),
+            "think_ms": think, "illegal": illegal}
+
+
+# ---------------- 집계 ----------------
+
+def _opening(rng: random.Random, n: int, stones: int) -> List[Tuple[int, int]]:
+    c, out = n // 2, []
+    while len(out) < stones:
+        p = (c + rng.randint(-2, 2), c + rng.randint(-2, 2))
+        if p not in out:
+            out.append(p)
+    return out
+
+
+def fit_elo(names: List[str], results: List[dict], iters: int = 200) -> Dict[str, float]:
+    """Bradley-Terry (무승부 = 반승) MM 적합 → Elo (평균 1500). 전승/전패 폭주 방지로 가상 무승부 1판씩"""
+    score = {a: {b: 0.0 for b in names} for a in names}
+    games = {a: {b: 0 for b in names} for a in names}
+    for r in results:
+        a, b = r["black"], r["white"]
+        games[a][b] += 1
+        games[b][a] += 1
+        if r["winner"] is None:
+            score[a][b] += 0.5
+            score[b][a] += 0.5
+        else:
+            loser = b if r["winner"] == a else a
+            score[r["winner"]][loser] += 1.0
+    for a in names:
+        for b in names:
+            if a != b:
+                score[a][b] += 0.5
+                games[a][b] += 1
+    gamma = {a: 1.0 for a in names}
+    for _ in range(iters):
+        new = {}
+        for a in names:
+            w = sum(score[a][b] for b in names if b != a)
+            d = sum(games[a][b] / (gamma[a] + gamma[b]) for b in names if b != a and games[a][b])
+            new[a] = w / d if d else gamma[a]
+        mean_log = sum(math.log(v) for v in new.values()) / len(new)
+        gamma = {a: v / math.exp(mean_log) for a, v in new.items()}
+    return {a: round(1500 + 400 * math.log10(gamma[a]), 1) for a in names}
+
+
+def summarize(engines: List[Engine], results: List[dict]) -> dict:
+    names = [e[0] for e in engines]
+    per = {n: {"games": 0, "wins": 0, "draws": 0, "losses": 0, "illegal": 0, "think": []} for n in names}
+    for r in results:
+        for side in ("black", "white"):
+            n = r[side]
+            p = per[n]
+            p["games"] += 1
+            p["think"].extend(r["think_ms"].get(n, []))
+            p["illegal"] += r["illegal"].get(n, 0)
+            if r["winner"] is None:
+                p["draws"] += 1
+            elif r["winner"] == n:
+                p["wins"] += 1
+            else:
+                p["losses"] += 1
+    elo = fit_elo(names, results)
+    out = {}
+    for n in names:
+        p = per[n]
+        xs = sorted(p.pop("think"))
+        pick = lambda q: round(xs[min(len(xs) - 1, int(len(xs) * q))], 2) if xs else None
+        out[n] = {**p, "score": round((p["wins"] + 0.5 * p["draws"]) / p["games"], 3) if p["games"] else None,
+                  "elo": elo[n], "ms_per_move": round(sum(xs) / len(xs), 2) if xs else None,
+                  "p95_ms": pick(0.95)}
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="엔진 설정 자가대국 아레나")
+    ap.add_argument("--engine", action="append", type=parse_engine, required=True,
+                    help='name=고급[,key=value...] (두 개 이상)')
+    ap.add_argument("--games", type=int, default=100, help="엔진 쌍당 대국 수 (흑백 교대로 짝수로 올림)")
+    ap.add_argument("--board-size", type=int, default=15)
+    ap.add_argument("--opening-stones", type=int, default=3, help="무작위 오프닝 돌 수")
+    ap.add_argument("--max-moves", type=int, default=225)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--target", type=float, help="기준 엔진 대비 필요한 Elo 차 (예: -30)")
+    ap.add_argument("--backend", default=str(BENCH_DIR.parent), help="엔진 코드를 가져올 backend 디렉터리")
+    ap.add_argument("--json", help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    engines: List[Engine] = args.engine
+    if len(engines) < 2 or len({e[0] for e in engines}) != len(engines):
+        ap.error("이름이 서로 다른 엔진이 두 개 이상 필요합니다.")
+
+    rng = random.Random(args.seed)
+    pairs = (args.games + 1) // 2
+    tasks = []
+    for a, b in itertools.combinations(engines, 2):
+        for _ in range(pairs):
+            op = _opening(rng, args.board_size, args.opening_stones)
+            tasks += [(a, b, op), (b, a, op)]
+
+    target = str(Path(args.backend).resolve())
+    results: List[dict] = []
+    t0 = time.time()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(target,)) as ex:
+        futs = [ex.submit(play_game, bl, wh, op, args.board_size, args.max_moves) for bl, wh, op in tasks]
+        for i, f in enumerate(as_completed(futs), 1):
+            results.append(f.result())
+            if i % 20 == 0 or i == len(futs):
+                print(f"[ARENA] {i}/{len(futs)} games, {time.time() - t0:.0f}s", flush=True)
+
+    table = summarize(engines, results)
+    print(f"\n{'engine':<14}{'elo':>8}{'score':>8}{'W':>6}{'D':>5}{'L':>6}{'ms/move':>10}{'p95 ms':>9}{'illegal':>9}")
+    for n, s in sorted(table.items(), key=lambda t: -t[1]["elo"]):
+        print(f"{n:<14}{s['elo']:>8.1f}{s['score']:>8.3f}{s['wins']:>6}{s['draws']:>5}{s['losses']:>6}"
+              f"{(s['ms_per_move'] or 0):>10.1f}{(s['p95_ms'] or 0):>9.1f}{s['illegal']:>9}")
+
+    pick = None
+    if args.target is not None:
+        ref = engines[0][0]
+        need = table[ref]["elo"] + args.target
+        ok = [n for n, s in table.items() if s["elo"] >= need and s["ms_per_move"] is not None]
+        pick = min(ok, key=lambda n: table[n]["ms_per_move"]) if ok else None
+        print(f"\n목표: {ref} 대비 Elo {args.target:+.0f} 이상 → "
+              + (f"가장 싼 엔진 '{pick}' ({table[pick]['ms_per_move']} ms/수)" if pick else "만족하는 엔진 없음"))
+
+    if args.json:
+        doc = {"engines": [{"name": n, "base": b, "overrides": o} for n, b, o in engines],
+               "table": table, "pick": pick, "games": results,
+               "meta": {"board_size": args.board_size, "workers": args.workers, "seed": args.seed,
+                        "elapsed_sec": round(time.time() - t0, 1)}}
+        Path(args.json).write_text(json.dumps(doc, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/bench/bench_ai.py
+"""
+AI 핫패스 마이크로벤치 (1단계)
+- 대상: find_best_move(고급), _best_by_heuristic_with_profile(초급), _forced_move, _find_must_block_move_for_beginner,
+        OmokGame.place_stone, OmokGame._is_forbidden_move
+- 고정 국면(corpus.py)마다 반복 측정 → p50/p95/p99(µs), 호출당 할당(tracemalloc 최고치 KB, 순증 블록 수)
+- --target 으로 다른 리비전의 backend 디렉터리를 재면 compare.py 가 두 결과를 비교한다
+
+예) python bench/bench_ai.py --json /tmp/ai.json
+    python bench/bench_ai.py --target /tmp/omok-old/backend --budget 0.2 --repeat 5
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+from corpus import SIZES, corpus, near_empties  # noqa: E402
+
+BENCHES = ("find_best_move", "heuristic", "forced_move", "must_block", "place_stone", "is_forbidden")
+
+
+def _percentiles(samples_ns: List[int]) -> dict:
+    xs = sorted(samples_ns)
+    pick = lambda p: xs[min(len(xs) - 1, int(len(xs) * p))] / 1000.0
+    return {"n": len(xs), "p50_us": pick(0.50), "p95_us": pick(0.95), "p99_us": pick(0.99),
+            "mean_us": sum(xs) / len(xs) / 1000.0}
+
+
+def _alloc(fn: Callable[[], object], setup: Callable[[], object], rounds: int) -> dict:
+    """호출 중 최고 추가 메모리(KB)와 호출 전후 순증 블록 수의 중앙값"""
+    peaks, blocks = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(rounds):
+            setup()
+            gc.collect()
+            before_blocks = sys.getallocatedblocks()
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - base) / 1024.0)
+            blocks.append(sys.getallocatedblocks() - before_blocks)
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_kb": round(median(peaks), 2), "alloc_net_blocks": int(median(blocks))}
+
+
+class _Target:
+    """리비전마다 다른 내부 API 차이를 흡수 (리스트 보드 vs BitBoard)"""
+
+    def __init__(self):
+        import ai
+        import game
+        self.ai = ai
+        self.game = game
+        try:
+            from bitboard import as_bitboard
+            self.prep = as_bitboard
+        except ImportError:
+            self.prep = lambda rows: [r[:] for r in rows]
+
+    def load_game(self, rows, turn: int):
+        g = self.game.OmokGame(len(rows))
+        if hasattr(g, "bb"):
+            from bitboard import BitBoard
+            g.bb = BitBoard.from_rows(rows)
+        else:
+            g.board = [r[:] for r in rows]
+        g.current_turn = turn
+        return g
+
+
+def run(repeat: int, sizes, alloc_rounds: int) -> dict:
+    t = _Target()
+    ai = t.ai
+    results: Dict[str, Dict[str, dict]] = {b: {} for b in BENCHES}
+    totals: Dict[str, List[int]] = {b: [] for b in BENCHES}
+
+    def measure(bench: str, key: str, fn, setup=lambda: None, n: int = repeat, warm: bool = True):
+        if warm:
+            setup()
+            fn()
+        samples = []
+        gc.collect()
+        for _ in range(n):
+            setup()
+            t0 = time.perf_counter_ns()
+            fn()
+            samples.append(time.perf_counter_ns() - t0)
+        stats = _percentiles(samples)
+        stats.update(_alloc(fn, setup, alloc_rounds))
+        results[bench][key] = stats
+        totals[bench].extend(samples)
+
+    for name, rows in corpus(sizes):
+        board = t.prep(rows)
+        cells = near_empties(rows, 8)
+        measure("forced_move", name, lambda: ai._forced_move(board, 2), n=repeat * 20)
+        measure("must_block", name, lambda: ai._find_must_block_move_for_beginner(board, 2, 1.0, True, True),
+                n=repeat * 20)
+        measure("find_best_move", name, lambda: ai.find_best_move(board, "고급"), n=repeat)
+        measure("heuristic", name, lambda: ai._best_by_heuristic_with_profile(board, 2, ai._get_profile("초급")),
+                n=repeat * 20)
+
+        g = t.load_game(rows, 1)
+        it = iter(())
+
+        def forbidden_all():
+            for x, y in cells:
+                g._is_forbidden_move(x, y)
+        measure("is_forbidden", name, forbidden_all, n=repeat * 5)
+
+        # place_stone: 매 표본마다 새 게임(측정 밖)에 흑 한 수
+        state = {}
+
+        def setup_place():
+            nonlocal it
+            try:
+                x, y = next(it)
+            except StopIteration:
+                it = iter(cells)
+                x, y = next(it)
+            state["g"], state["xy"] = t.load_game(rows, 1), (x, y)
+        measure("place_stone", name, lambda: state["g"].place_stone(*state["xy"], 1), setup_place,
+                n=repeat * 10)
+
+    summary = {b: _percentiles(v) for b, v in totals.items() if v}
+    for b in summary:
+        allocs = [r["alloc_peak_kb"] for r in results[b].values()]
+        summary[b]["alloc_peak_kb"] = round(median(allocs), 2)
+    return {"summary": summary, "positions": results}
+
+
+def _git_rev(path: Path) -> str:
+    try:
+        return subprocess.run(["git", "-C", str(path), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_summary(summary: dict, title: str = "") -> None:
+    if title:
+        print(title)
+    print(f"{'bench':<16}{'n':>7}{'p50 µs':>12}{'p95 µs':>12}{'p99 µs':>12}{'peak KB':>10}")
+    for b in BENCHES:
+        s = summary.get(b)
+        if s:
+            print(f"{b:<16}{s['n']:>7}{s['p50_us']:>12.1f}{s['p95_us']:>12.1f}{s['p99_us']:>12.1f}"
+                  f"{s['alloc_peak_kb']:>10.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="AI 핫패스 벤치마크")
+    ap.add_argument("--target", default=str(BENCH_DIR.parent), help="측정할 backend 디렉터리")
+    ap.add_argument("--repeat", type=int, default=5, help="국면당 find_best_move 반복 수 (나머지는 배수)")
+    ap.add_argument("--budget", type=float, default=0.2, help="고급 탐색 시간 예산(초)")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    ap.add_argument("--alloc-rounds", type=int, default=3)
+    ap.add_argument("--json", help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    target = Path(args.target).resolve()
+    # 지연/북/캐시/워커 풀 없이 계산만 잰다 (import 전에 설정)
+    os.environ.update({
+        "OMOK_FORCE_DELAY_SEC": "0",
+        "OMOK_ADV_TIME_BUDGET_SEC": str(args.budget),
+        "OMOK_BOOK_PATH": "",
+        "OMOK_MOVE_CACHE_SIZE": "0",
+        "OMOK_AI_EXECUTOR": "inline",
+        "OMOK_AI_DEBUG": "0",
+    })
+    sys.path.insert(0, str(target))
+    os.chdir(target)
+
+    sizes = tuple(int(s) for s in args.sizes.split(","))
+    t0 = time.time()
+    out = run(args.repeat, sizes, args.alloc_rounds)
+    out["meta"] = {
+        "target": str(target),
+        "rev": _git_rev(target),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "budget": args.budget,
+        "repeat": args.repeat,
+        "sizes": list(sizes),
+        "elapsed_sec": round(time.time() - t0, 1),
+    }
+    print_summary(out["summary"], f"[bench-ai] {out['meta']['rev']} ({target})")
+    if args.json:
+        Path(args.json).write_text(json.dumps(out, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/bench/bench_batch.py
+"""
+AI 마이크로배칭 처리량 — 서로 다른 국면 N개의 find_best_move_async 를 한꺼번에 걸고 초당 수를 잰다
+- OMOK_AI_BATCH_MAX 값마다 새 프로세스에서 (설정은 import 때 읽히므로) 같은 국면 묶음으로 측정
+- 고급, 탐색 예산 0(휴리스틱)·지연 0·국면 캐시 끔 → 요청당 풀 왕복 비용이 그대로 드러나는 조건
+
+예) python bench/bench_batch.py --requests 400 --batch-max 1 16 --workers 2
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def _boards(k: int, seed: int):
+    from bitboard import BitBoard
+    rng = random.Random(seed)
+    out = []
+    for _ in range(k):
+        bb = BitBoard(15)
+        cells = [(x, y) for x in range(3, 12) for y in range(3, 12)]
+        rng.shuffle(cells)
+        for i, (x, y) in enumerate(cells[:rng.randint(2, 10) * 2]):
+            bb.set(x, y, 1 + i % 2)
+        out.append(bb)
+    return out
+
+
+async def _measure(n: int, seed: int) -> dict:
+    import ai
+    import ai_pool
+    ai_pool.start()
+    boards = _boards(n, seed)
+    try:
+        await ai.find_best_move_async(boards[0], "고급")  # 워커 기동·import
+        await asyncio.sleep(1.0)
+        t0 = time.perf_counter()
+        await asyncio.gather(*[ai.find_best_move_async(b, "고급") for b in boards])
+        dt = time.perf_counter() - t0
+    finally:
+        ai_pool.shutdown()
+    return {"moves_per_sec": round(n / dt, 1), "batch": ai.ai_stats()["batch"]}
+
+
+def _child(args) -> None:
+    sys.path.insert(0, str(Path(args.target).resolve()))
+    print(json.dumps(asyncio.run(_measure(args.requests, args.seed))))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="AI 마이크로배칭 처리량")
+    ap.add_argument("--target", default=str(BENCH_DIR.parent), help="잴 backend 디렉터리")
+    ap.add_argument("--requests", type=int, default=400, help="동시에 거는 find_best_move_async 수")
+    ap.add_argument("--batch-max", type=int, nargs="+", default=[1, 16], help="비교할 OMOK_AI_BATCH_MAX 값들")
+    ap.add_argument("--wait-ms", type=float, default=2.0, help="OMOK_AI_BATCH_WAIT_MS")
+    ap.add_argument("--workers", type=int, default=2, help="OMOK_AI_WORKERS")
+    ap.add_argument("--executor", default="process", help="OMOK_AI_EXECUTOR")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="결과 JSON 저장 경로")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return _child(args)
+
+    out = {}
+    for bm in args.batch_max:
+        env = dict(os.environ, OMOK_AI_BATCH_MAX=str(bm), OMOK_AI_BATCH_WAIT_MS=str(args.wait_ms),
+                   OMOK_AI_WORKERS=str(args.workers), OMOK_AI_EXECUTOR=args.executor,
+                   OMOK_ADV_TIME_BUDGET_SEC="0", OMOK_FORCE_DELAY_SEC="0", OMOK_MOVE_CACHE_SIZE="0")
+        cmd = [sys.executable, __file__, "--child", "--target", args.target,
+               "--requests", str(args.requests), "--seed", str(args.seed)]
+        res = subprocess.run(cmd, env=env, capture_output=True, text=True, cwd=args.target)
+        if res.returncode != 0:
+            sys.exit(res.stderr)
+        out[bm] = json.loads(res.stdout.strip().splitlines()[-1])
+        b = out[bm]["batch"]
+        print(f"batch_max={bm:<4} {out[bm]['moves_per_sec']:>9.1f} moves/s   "
+              f"batches={b['batches']} mean={b['mean_batch']} coalesced={b['coalesced']}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(out, indent=1), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
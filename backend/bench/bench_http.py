@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/bench/bench_http.py
+"""
+HTTP 엔드포인트 부하 벤치 (2단계)
+- --target 의 backend 로 로컬 uvicorn 을 띄우고(또는 --url 로 이미 떠 있는 서버 사용),
+  동시 C개 클라이언트가 /api/game/new → (/move 흑 → /ai-move 백) × M 수를 반복
+- 엔드포인트별 처리량(req/s), p50/p95/p99(ms), 오류 수
+- 서버는 지연 0, 오프닝북 없이, 주어진 탐색 예산으로 뜬다 (backend/.env 가 override 하면 그 값이 이김)
+- 초급(LLM) 경로를 재려면 llm_server 를 OMOK_LLM_BACKEND=local 로 띄우고 --difficulty 초급
+
+예) python bench/bench_http.py --games 40 --concurrency 8 --moves 8 --json /tmp/http.json
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+ENDPOINTS = ("new", "move", "ai-move")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentiles(ms: List[float]) -> dict:
+    if not ms:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    xs = sorted(ms)
+    pick = lambda p: round(xs[min(len(xs) - 1, int(len(xs) * p))], 2)
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+class _Recorder:
+    def __init__(self):
+        self.lat: Dict[str, List[float]] = {e: [] for e in ENDPOINTS}
+        self.errors: Dict[str, int] = {e: 0 for e in ENDPOINTS}
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, url: str, body: Optional[dict] = None):
+        t0 = time.perf_counter()
+        try:
+            r = await client.post(url, json=body or {})
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        self.lat[endpoint].append((time.perf_counter() - t0) * 1000.0)
+        if r.status_code != 200:
+            self.errors[endpoint] += 1
+            return None
+        return r.json()
+
+
+def _pick_black(board: List[List[int]], rng: random.Random) -> tuple:
+    """돌 옆 빈칸 중 무작위 (첫 수는 중앙)"""
+    n = len(board)
+    near = [(x, y) for y in range(n) for x in range(n) if board[y][x] == 0 and any(
+        0 <= x + dx < n and 0 <= y + dy < n and board[y + dy][x + dx]
+        for dx in (-1, 0, 1) for dy in (-1, 0, 1))]
+    if not near:
+        return n // 2, n // 2
+    return rng.choice(near)
+
+
+async def _player(client, base: str, rec: _Recorder, games: asyncio.Queue, moves: int,
+                  difficulty: str, seed: int) -> None:
+    rng = random.Random(seed)
+    while True:
+        try:
+            games.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        g = await rec.call(client, "new", f"{base}/api/game/new")
+        if g is None:
+            continue
+        gid, board = g["game_id"], g["board"]
+        for _ in range(moves):
+            placed = None
+            for _ in range(5):  # 금수/중복이면 다른 칸
+                x, y = _pick_black(board, rng)
+                placed = await rec.call(client, "move", f"{base}/api/game/{gid}/move", {"x": x, "y": y})
+                if placed is not None:
+                    break
+            if placed is None or placed.get("game_over"):
+                break
+            ai = await rec.call(client, "ai-move", f"{base}/api/game/{gid}/ai-move", {"difficulty": difficulty})
+            if ai is None or ai.get("game_over"):
+                break
+            board = ai["board"]
+
+
+async def drive(base: str, games: int, concurrency: int, moves: int, difficulty: str, seed: int) -> dict:
+    rec = _Recorder()
+    q: asyncio.Queue = asyncio.Queue()
+    for i in range(games):
+        q.put_nowait(i)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*[_player(client, base, rec, q, moves, difficulty, seed + i)
+                               for i in range(concurrency)])
+        wall = time.perf_counter() - t0
+    endpoints = {}
+    for e in ENDPOINTS:
+        n = len(rec.lat[e])
+        endpoints[e] = {"count": n, "errors": rec.errors[e], "rps": round(n / wall, 2) if wall else 0.0,
+                        **_percentiles(rec.lat[e])}
+    total = sum(v["count"] for v in endpoints.values())
+    return {"wall_sec": round(wall, 2), "total_rps": round(total / wall, 2) if wall else 0.0,
+            "endpoints": endpoints}
+
+
+def _start_server(target: Path, port: int, budget: float, verbose: bool) -> subprocess.Popen:
+    env = dict(os.environ, OMOK_FORCE_DELAY_SEC="0", OMOK_ADV_TIME_BUDGET_SEC=str(budget), OMOK_BOOK_PATH="")
+    out = None if verbose else subprocess.DEVNULL
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                             "--port", str(port), "--log-level", "warning"],
+                            cwd=str(target), env=env, stdout=out, stderr=out)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn 이 종료됐습니다 (code {proc.returncode})")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/__ping__", timeout=1.0).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn 이 60초 안에 뜨지 않았습니다")
+
+
+def _git_rev(path: Path) -> str:
+    try:
+        return subprocess.run(["git", "-C", str(path), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="HTTP 엔드포인트 부하 벤치")
+    ap.add_argument("--target", default=str(BENCH_DIR.parent), help="uvicorn 으로 띄울 backend 디렉터리")
+    ap.add_argument("--url", help="이미 떠 있는 서버 주소 (주면 서버를 띄우지 않음)")
+    ap.add_argument("--games", type=int, default=40)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--moves", type=int, default=8, help="게임당 흑/백 왕복 수")
+    ap.add_argument("--difficulty", default="고급")
+    ap.add_argument("--budget", type=float, default=0.2, help="서버 고급 탐색 시간 예산(초)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--verbose", action="store_true", help="서버 로그 출력")
+    ap.add_argument("--json", help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    target = Path(args.target).resolve()
+    proc = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        port = _free_port()
+        proc = _start_server(target, port, args.budget, args.verbose)
+        base = f"http://127.0.0.1:{port}"
+    try:
+        out = asyncio.run(drive(base, args.games, args.concurrency, args.moves, args.difficulty, args.seed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    out["meta"] = {
+        "target": base if args.url else str(target),
+        "rev": "external" if args.url else _git_rev(target),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "games": args.games,
+        "concurrency": args.concurrency,
+        "moves": args.moves,
+        "difficulty": args.difficulty,
+        "budget": args.budget,
+    }
+    print(f"[bench-http] {out['meta']['rev']}  wall {out['wall_sec']}s  total {out['total_rps']} req/s")
+    print(f"{'endpoint':<10}{'count':>7}{'err':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for e, s in out["endpoints"].items():
+        fmt = lambda v: f"{v:>10.1f}" if v is not None else f"{'-':>10}"
+        print(f"{e:<10}{s['count']:>7}{s['errors']:>6}{s['rps']:>9.1f}{fmt(s['p50_ms'])}{fmt(s['p95_ms'])}"
+              f"{fmt(s['p99_ms'])}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(out, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/bench/compare.py
+"""
+두 git 리비전의 벤치마크 비교 (회귀 검사)
+- 각 리비전을 임시 git worktree 로 꺼내고, '지금' 체크아웃의 벤치 스크립트로 양쪽을 잰다 (같은 측정 코드·국면)
+- HEAD 자리에 "." 를 주면 커밋 안 한 작업 트리 그대로 잰다
+- 요약 p50/p95 가 기준보다 threshold 이상 느려지면 REGRESSION 표시 후 종료 코드 1
+
+예) python bench/compare.py cd064be .                 # 1단계(AI 핫패스)
+    python bench/compare.py main HEAD --tier both --threshold 0.15
+"""
+from __future__ import annotations
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+
+
+def _git(*args: str, cwd: Path = BACKEND_DIR) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def _checkout(rev: str, tmp: Path) -> Tuple[Path, bool]:
+    """(backend 디렉터리, worktree 를 만들었는지)"""
+    if rev == ".":
+        return BACKEND_DIR, False
+    top = Path(_git("rev-parse", "--show-toplevel"))
+    rel = BACKEND_DIR.relative_to(top)
+    wt = tmp / rev.replace("/", "_")
+    _git("worktree", "add", "--detach", str(wt), rev)
+    return wt / rel, True
+
+
+def _run(script: str, target: Path, out: Path, extra: List[str]) -> dict:
+    cmd = [sys.executable, str(BENCH_DIR / script), "--target", str(target), "--json", str(out), *extra]
+    print("$", " ".join(cmd), flush=True)
+    subprocess.run(cmd, check=True)
+    return json.loads(out.read_text(encoding="utf-8"))
+
+
+def _compare(base: dict, head: dict, keys: Tuple[str, ...], threshold: float,
+             higher_is_better: bool = False) -> List[str]:
+    """표 출력 후 회귀 항목 목록"""
+    regressions = []
+    print(f"{'':<18}" + "".join(f"{k:>30}" for k in keys))
+    for name in base:
+        if name not in head:
+            continue
+        row = f"{name:<18}"
+        for k in keys:
+            a, b = base[name].get(k), head[name].get(k)
+            if a is None or b is None:
+                row += f"{'-':>30}"
+                continue
+            ratio = (b / a) if a else float("inf")
+            worse = ratio < 1 - threshold if higher_is_better else ratio > 1 + threshold
+            mark = " !" if worse else "  "
+            row += f"{a:>11.1f} → {b:>11.1f} {ratio:>5.2f}x{mark}"
+            if worse:
+                regressions.append(f"{name}.{k}: {a:.1f} → {b:.1f} ({ratio:.2f}x)")
+        print(row)
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="두 리비전 벤치마크 비교")
+    ap.add_argument("base", help="기준 리비전 (예: main, cd064be)")
+    ap.add_argument("head", nargs="?", default=".", help='비교 리비전 (기본 "." = 작업 트리)')
+    ap.add_argument("--tier", choices=("ai", "http", "both"), default="ai")
+    ap.add_argument("--threshold", type=float, default=0.10, help="허용 저하 비율 (0.10 = 10%%)")
+    ap.add_argument("--out", help="양쪽 결과 JSON 을 남길 디렉터리")
+    ap.add_argument("--ai-args", default="", help='bench_ai.py 에 넘길 인자 (예: "--repeat 3 --budget 0.1")')
+    ap.add_argument("--http-args", default="", help="bench_http.py 에 넘길 인자")
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="omok-bench-"))
+    out_dir = Path(args.out).resolve() if args.out else tmp
+    out_dir.mkdir(parents=True, exist_ok=True)
+    made: List[Path] = []
+    regressions: List[str] = []
+    try:
+        targets = {}
+        for label, rev in (("base", args.base), ("head", args.head)):
+            target, is_wt = _checkout(rev, tmp)
+            targets[label] = target
+            if is_wt:
+                made.append(target)
+
+        if args.tier in ("ai", "both"):
+            res = {label: _run("bench_ai.py", t, out_dir / f"ai_{label}.json", args.ai_args.split())
+                   for label, t in targets.items()}
+            print(f"\n[compare ai] {res['base']['meta']['rev']} → {res['head']['meta']['rev']}  (µs)")
+            regressions += _compare(res["base"]["summary"], res["head"]["summary"],
+                                    ("p50_us", "p95_us"), args.threshold)
+        if args.tier in ("http", "both"):
+            res = {label: _run("bench_http.py", t, out_dir / f"http_{label}.json", args.http_args.split())
+                   for label, t in targets.items()}
+            print(f"\n[compare http] {res['base']['meta']['rev']} → {res['head']['meta']['rev']}  (req/s)")
+            regressions += _compare(res["base"]["endpoints"], res["head"]["endpoints"],
+                                    ("rps",), args.threshold, higher_is_better=True)
+    finally:
+        for target in made:
+            wt = target
+            while wt.parent != tmp:
+                wt = wt.parent
+            subprocess.run(["git", "worktree", "remove", "--force", str(wt)], cwd=BACKEND_DIR,
+                           capture_output=True)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if regressions:
+        print("\nREGRESSION (> {:.0%}):".format(args.threshold))
+        for r in regressions:
+            print("  -", r)
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
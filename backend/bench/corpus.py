@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# backend/bench/corpus.py
+"""
+벤치마크용 고정 국면 모음 (15×15, 19×19 × 오프닝/중반/종반)
+- 저장소의 AI 코드를 쓰지 않고 시드 고정 난수로만 만든다 → 어느 리비전을 재든 같은 국면
+- 모든 국면은 백(2) 차례(흑이 한 수 더 많음), 5목은 없음
+"""
+from __future__ import annotations
+import random
+from typing import Dict, List, Tuple
+
+Board = List[List[int]]
+
+SIZES = (15, 19)
+# 단계별 총 돌 수 (보드 크기별) — 흑이 하나 더 많도록 홀수
+PHASES: Dict[str, Dict[int, int]] = {
+    "opening": {15: 7, 19: 7},
+    "midgame": {15: 41, 19: 61},
+    "endgame": {15: 111, 19: 181},
+}
+SEEDS_PER_PHASE = 4
+_DIRS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+def _makes_five(board: Board, x: int, y: int, c: int) -> bool:
+    n = len(board)
+    for dx, dy in _DIRS:
+        cnt = 1
+        for s in (1, -1):
+            nx, ny = x + dx * s, y + dy * s
+            while 0 <= nx < n and 0 <= ny < n and board[ny][nx] == c:
+                cnt += 1
+                nx += dx * s
+                ny += dy * s
+        if cnt >= 5:
+            return True
+    return False
+
+
+def make_position(n: int, stones: int, seed: int) -> Board:
+    """중앙 주변에 뭉치도록 흑/백을 번갈아 두되 5목이 생기는 자리는 건너뜀"""
+    rng = random.Random(f"omok-bench/{n}/{stones}/{seed}")
+    board = [[0] * n for _ in range(n)]
+    c = n // 2
+    placed, color = [], 1
+    spread = max(2.0, (stones ** 0.5) * 0.9)
+    tries = 0
+    while len(placed) < stones and tries < stones * 500:
+        tries += 1
+        if placed and rng.random() < 0.7:
+            bx, by = placed[rng.randrange(len(placed))]
+            x, y = bx + rng.randint(-2, 2), by + rng.randint(-2, 2)
+        else:
+            x, y = round(rng.gauss(c, spread)), round(rng.gauss(c, spread))
+        if not (0 <= x < n and 0 <= y < n) or board[y][x]:
+            continue
+        if _makes_five(board, x, y, color):
+            continue
+        board[y][x] = color
+        placed.append((x, y))
+        color = 3 - color
+    return board
+
+
+def corpus(sizes=SIZES) -> List[Tuple[str, Board]]:
+    """[(이름 "15/midgame/2", 보드)]"""
+    out = []
+    for n in sizes:
+        for phase, counts in PHASES.items():
+            for s in range(SEEDS_PER_PHASE):
+                out.append((f"{n}/{phase}/{s}", make_position(n, counts[n], s)))
+    return out
+
+
+def near_empties(board: Board, k: int) -> List[Tuple[int, int]]:
+    """돌 옆(거리 1) 빈칸을 중앙 가까운 순으로 k개 — 착수/금수 판정 표본"""
+    n = len(board)
+    c = n // 2
+    cells = []
+    for y in range(n):
+        for x in range(n):
+            if board[y][x]:
+                continue
+            if any(0 <= x + dx < n and 0 <= y + dy < n and board[y + dy][x + dx]
+                   for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+                cells.append((max(abs(x - c), abs(y - c)), y, x))
+    cells.sort()
+    return [(x, y) for _, y, x in cells[:k]]
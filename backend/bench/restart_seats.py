@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/bench/restart_seats.py
+"""
+재시작 검사 — 워커가 WebSocket 자리를 쥔 채 죽어도(크래시/kill/재배포) 새 워커에서 자리가 다시 풀리는지
+- 워커 A(자식 프로세스): 게임을 만들고 흑/백 WS 를 붙인 뒤 종료 처리 없이 os._exit (release_owner 가 안 불린다)
+- 워커 B(이 프로세스, 새 WORKER_ID): 같은 저장소로 뜬다
+    임대가 살아 있는 동안은 두 자리 모두 찬 상태 (/join 이 거절)
+    OMOK_SEAT_TTL_SEC 가 지나면 /join 이 흑을 주고, 새 WS 가 흑 자리를 잡는다
+    그 WS 가 붙어 있는 동안은 heartbeat 덕에 TTL 을 여러 번 넘겨도 자리가 유지된다
+- 임대 이전 스키마(seats 에 expires 열 없음) DB 에 남은 자리도 열면 풀린다
+- 하나라도 어기면 종료 코드 1. 서버 없이 main 의 핸들러를 직접 부른다 (저장소는 임시 sqlite)
+
+예) python bench/restart_seats.py --ttl 1
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+class _FakeWS:
+    """main.websocket_endpoint 가 쓰는 만큼만 흉내 낸 소켓 (보낸 것은 버리고, receive 는 close() 까지 대기)"""
+
+    def __init__(self, role: str = ""):
+        self.query_params = {"role": role} if role else {}
+        self._closed = asyncio.Event()
+        from starlette.websockets import WebSocketState
+        self.application_state = WebSocketState.CONNECTED
+
+    async def accept(self):
+        pass
+
+    async def close(self, *a, **kw):
+        self._closed.set()
+
+    async def send_text(self, text: str):
+        pass
+
+    async def send_json(self, obj):
+        pass
+
+    async def receive_json(self):
+        from fastapi import WebSocketDisconnect
+        await self._closed.wait()
+        raise WebSocketDisconnect()
+
+
+async def _worker_a(gid_file: str) -> None:
+    import main
+    for f in main.app.router.on_startup:
+        await f()
+    gid = (await main.new_game())["game_id"]
+    for _ in range(2):  # 흑, 백
+        asyncio.ensure_future(main.websocket_endpoint(_FakeWS(), gid))
+    await asyncio.sleep(0.2)
+    Path(gid_file).write_text(gid)
+    os._exit(0)  # 크래시 — shutdown 훅(release_owner) 없이
+
+
+async def _worker_b(gid: str, ttl: float) -> list:
+    import main
+    fails = []
+
+    def check(ok: bool, what: str):
+        print(("ok   " if ok else "FAIL ") + what)
+        if not ok:
+            fails.append(what)
+
+    for f in main.app.router.on_startup:
+        await f()
+    check(gid in main.games, "죽은 워커의 진행 중 게임이 복원됨")
+    check("error" in await main.join_game(gid), "임대가 살아 있는 동안은 두 자리 모두 참")
+
+    await asyncio.sleep(ttl + 0.3)
+    check((await main.join_game(gid)).get("player_color") == 1, f"TTL({ttl}s) 뒤 /join 이 흑을 줌")
+    ws = _FakeWS()
+    task = asyncio.ensure_future(main.websocket_endpoint(ws, gid))
+    await asyncio.sleep(0.1)
+    seats = main.STORE.seats(gid)
+    check(seats.get("black", "").startswith(main.WORKER_ID), "새 WS 가 흑 자리를 잡음")
+
+    await asyncio.sleep(ttl * 3)
+    seats = main.STORE.seats(gid)
+    check(seats.get("black", "").startswith(main.WORKER_ID), "붙어 있는 동안 heartbeat 로 TTL x3 뒤에도 자리 유지")
+    await ws.close()
+    await task
+    check("black" not in main.STORE.seats(gid), "WS 가 끊기면 자리 반납")
+    for f in main.app.router.on_shutdown:
+        await f()
+    return fails
+
+
+def _legacy_schema(path: str) -> list:
+    from game_store import SqliteGameStore
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE seats (gid TEXT NOT NULL, role TEXT NOT NULL, owner TEXT NOT NULL,
+                            PRIMARY KEY (gid, role)) WITHOUT ROWID;
+        INSERT INTO seats VALUES ('g', 'black', 'deadhost:1:abcdef:1');
+    """)
+    db.close()
+    store = SqliteGameStore(path)
+    ok = store.seats("g") == {} and store.claim_seat("g", "black", "new:1")
+    store.close()
+    print(("ok   " if ok else "FAIL ") + "임대 이전 스키마 DB 의 남은 자리가 풀림")
+    return [] if ok else ["legacy"]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="WebSocket 자리 임대 재시작 검사")
+    ap.add_argument("--ttl", type=float, default=1.0, help="OMOK_SEAT_TTL_SEC (짧게)")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    sys.path.insert(0, str(BACKEND))
+    os.chdir(BACKEND)
+    if args.child:
+        return asyncio.run(_worker_a(args.child))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, OMOK_STORE="sqlite", OMOK_STORE_PATH=os.path.join(tmp, "games.db"),
+                   OMOK_SEAT_TTL_SEC=str(args.ttl), OMOK_PUBSUB="local", OMOK_AI_EXECUTOR="inline",
+                   OMOK_BOOK_PATH="")
+        gid_file = os.path.join(tmp, "gid")
+        subprocess.run([sys.executable, __file__, "--child", gid_file], env=env, check=True)
+        os.environ.update(env)
+        fails = asyncio.run(_worker_b(Path(gid_file).read_text(), args.ttl))
+        fails += _legacy_schema(os.path.join(tmp, "legacy.db"))
+    sys.exit(1 if fails else 0)
+
+
+if __name__ == "__main__":
+    main()
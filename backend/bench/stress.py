@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/bench/stress.py
+"""
+동시성 스트레스 — 한 판에 /move, /ai-move, /assist, GET, WS resync 를 한꺼번에 쏘고 불변식을 검사
+- 판마다 C개 클라이언트가 R번씩 무작위 요청. 400(금수/중복/종료)·409(경합)는 정상 거절로 센다
+- 검사 (하나라도 어기면 종료 코드 1)
+    5xx 가 없다
+    성공한 착수(/move, /ai-move)의 seq 가 서로 겹치지 않고 1..N 을 빈틈없이 채운다 (N = 마지막 보드의 돌 수)
+    seq 홀수는 흑, 짝수는 백 — 성공 응답의 (x, y) 가 마지막 보드에 그 색으로 있다
+    흑 수 - 백 수 ∈ {0, 1}, 안 끝났으면 current_turn 이 돌 수와 맞는다
+    GET 으로 본 보드는 언제나 돌 수가 seq 와 같은 온전한 국면 (흑-백 ∈ {0, 1})
+    WS resync 의 보드 돌 수 == 그 resync 의 seq (websockets 패키지가 있을 때만)
+- 서버는 bench_http.py 와 같은 방식으로 띄운다 (--url 이면 떠 있는 서버)
+
+예) python bench/stress.py --games 8 --concurrency 16 --rounds 30
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import base64
+import json
+import random
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+from bench_http import _free_port, _start_server  # noqa: E402
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+OK_REJECTS = (400, 409)
+
+
+def _counts(board: List[List[int]]) -> Counter:
+    return Counter(v for row in board for v in row if v)
+
+
+def _unpack(data: str, n: int) -> List[List[int]]:
+    cells = [(b >> s) & 3 for b in base64.b64decode(data) for s in (0, 2, 4, 6)]
+    return [cells[y * n:(y + 1) * n] for y in range(n)]
+
+
+class _Game:
+    def __init__(self, gid: str, n: int):
+        self.gid = gid
+        self.n = n
+        self.placed: List[dict] = []  # 성공한 착수 응답
+        self.errors: List[str] = []
+        self.status: Counter = Counter()
+
+    def check_board(self, board: List[List[int]], where: str) -> None:
+        c = _counts(board)
+        if c[1] - c[2] not in (0, 1):
+            self.errors.append(f"{where}: 흑 {c[1]} 백 {c[2]}")
+
+
+async def _client(client: httpx.AsyncClient, base: str, gm: _Game, rounds: int, difficulty: str,
+                  seed: int) -> None:
+    rng = random.Random(seed)
+    url = f"{base}/api/game/{gm.gid}"
+    for _ in range(rounds):
+        op = rng.choice(("move", "move", "move", "ai-move", "assist", "get"))
+        try:
+            if op == "move":
+                c = gm.n // 2
+                x, y = c + rng.randint(-3, 3), c + rng.randint(-3, 3)
+                r = await client.post(f"{url}/move", json={"x": x, "y": y})
+            elif op == "ai-move":
+                r = await client.post(f"{url}/ai-move", json={"difficulty": difficulty})
+            elif op == "assist":
+                r = await client.post(f"{url}/assist", json={"difficulty": difficulty})
+            else:
+                r = await client.get(url)
+        except httpx.HTTPError as e:
+            gm.errors.append(f"{op}: {e!r}")
+            continue
+        gm.status[f"{op} {r.status_code}"] += 1
+        if r.status_code >= 500:
+            gm.errors.append(f"{op} {r.status_code}: {r.text[:200]}")
+        elif r.status_code == 200:
+            body = r.json()
+            if op in ("move", "ai-move"):
+                gm.placed.append(body)
+                gm.check_board(body["board"], f"{op} seq={body['seq']}")
+                if sum(_counts(body["board"]).values()) != body["seq"]:
+                    gm.errors.append(f"{op}: seq {body['seq']} 인데 보드 돌 {sum(_counts(body['board']).values())}")
+            elif op == "get":
+                gm.check_board(body["board"], "get")
+        elif r.status_code not in OK_REJECTS:
+            gm.errors.append(f"{op} {r.status_code}: {r.text[:200]}")
+        if any(p.get("game_over") for p in gm.placed):
+            return
+
+
+async def _watcher(base: str, gm: _Game, stop: asyncio.Event) -> None:
+    """델타 WS 로 붙어 계속 resync 를 요청 — 받은 보드가 seq 와 맞는 온전한 국면인지"""
+    ws_url = base.replace("http", "ws", 1) + f"/ws/{gm.gid}?proto=delta&role=spectator"
+    async with websockets.connect(ws_url) as ws:
+        while not stop.is_set():
+            await ws.send(json.dumps({"type": "resync_request"}))
+            try:
+                while True:
+                    msg = json.loads(await asyncio.wait_for(ws.recv(), timeout=2.0))
+                    if msg.get("type") == "resync":
+                        break
+            except asyncio.TimeoutError:
+                gm.errors.append("ws: resync 응답 없음")
+                return
+            p = msg["payload"]
+            board = _unpack(p["board"], p["size"])
+            gm.status["ws resync"] += 1
+            gm.check_board(board, f"ws resync seq={p['seq']}")
+            if sum(_counts(board).values()) != p["seq"]:
+                gm.errors.append(f"ws resync: seq {p['seq']} 인데 보드 돌 {sum(_counts(board).values())}")
+
+
+def _final_checks(gm: _Game, state: dict) -> None:
+    board = state["board"]
+    total = sum(_counts(board).values())
+    seqs = sorted(p["seq"] for p in gm.placed)
+    if seqs != list(range(1, len(seqs) + 1)) or len(seqs) != total:
+        dup = [s for s, k in Counter(seqs).items() if k > 1]
+        gm.errors.append(f"seq: 성공 {len(seqs)}개, 돌 {total}개, 중복 {dup[:5]}")
+    for p in gm.placed:
+        who = 1 if p["seq"] % 2 else 2
+        if board[p["y"]][p["x"]] != who:
+            gm.errors.append(f"seq {p['seq']} ({p['x']},{p['y']}) 가 보드에 {who} 로 없음")
+    gm.check_board(board, "final")
+    if not state.get("game_over"):
+        want = 1 if total % 2 == 0 else 2
+        if state.get("current_turn") != want:
+            gm.errors.append(f"final: 돌 {total}개인데 current_turn={state.get('current_turn')}")
+
+
+async def drive(base: str, games: int, concurrency: int, rounds: int, difficulty: str, seed: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency * games, max_keepalive_connections=concurrency * games)
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        gms: List[_Game] = []
+        for _ in range(games):
+            g = (await client.post(f"{base}/api/game/new")).json()
+            gms.append(_Game(g["game_id"], len(g["board"])))
+        stop = asyncio.Event()
+        watchers = [asyncio.create_task(_watcher(base, gm, stop)) for gm in gms] if websockets else []
+        await asyncio.gather(*[_client(client, base, gm, rounds, difficulty, seed + 1000 * i + j)
+                               for i, gm in enumerate(gms) for j in range(concurrency)])
+        stop.set()
+        for t in watchers:
+            try:
+                await t
+            except Exception as e:  # 연결 자체 실패
+                gms[watchers.index(t)].errors.append(f"ws: {e!r}")
+        for gm in gms:
+            _final_checks(gm, (await client.get(f"{base}/api/game/{gm.gid}")).json())
+    status: Counter = Counter()
+    for gm in gms:
+        status.update(gm.status)
+    return {
+        "games": games,
+        "moves": sum(len(gm.placed) for gm in gms),
+        "status": dict(sorted(status.items())),
+        "ws_checked": websockets is not None,
+        "violations": {gm.gid: gm.errors for gm in gms if gm.errors},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="게임별 동시성 불변식 스트레스")
+    ap.add_argument("--target", default=str(BENCH_DIR.parent), help="uvicorn 으로 띄울 backend 디렉터리")
+    ap.add_argument("--url", help="이미 떠 있는 서버 주소 (주면 서버를 띄우지 않음)")
+    ap.add_argument("--games", type=int, default=4)
+    ap.add_argument("--concurrency", type=int, default=16, help="판마다 동시 클라이언트 수")
+    ap.add_argument("--rounds", type=int, default=30, help="클라이언트마다 요청 수")
+    ap.add_argument("--difficulty", default="고급")
+    ap.add_argument("--budget", type=float, default=0.05, help="서버 고급 탐색 시간 예산(초)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--verbose", action="store_true", help="서버 로그 출력")
+    ap.add_argument("--json", help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    proc: Optional[subprocess.Popen] = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        port = _free_port()
+        proc = _start_server(Path(args.target).resolve(), port, args.budget, args.verbose)
+        base = f"http://127.0.0.1:{port}"
+    try:
+        out = asyncio.run(drive(base, args.games, args.concurrency, args.rounds, args.difficulty, args.seed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    print(f"[stress] {out['games']} games, {out['moves']} moves placed, ws {'on' if out['ws_checked'] else 'off'}")
+    for k, v in out["status"].items():
+        print(f"  {k:<16}{v:>6}")
+    bad: Dict[str, List[str]] = out["violations"]
+    for gid, errs in bad.items():
+        print(f"[FAIL] {gid}")
+        for e in errs[:10]:
+            print("   ", e)
+    if args.json:
+        Path(args.json).write_text(json.dumps(out, ensure_ascii=False, indent=1), encoding="utf-8")
+    print("[stress] OK" if not bad else f"[stress] {len(bad)} games violated invariants")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# backend/bitboard.py
+"""
+색상별·방향별 비트마스크 보드
+- 방향마다 '라인(가로/세로/대각/역대각)'을 구분 비트 하나씩 두고 이어붙인 레이아웃
+- 한 라인은 (mask >> line_off) & full 로 작은 정수가 되고, 연속 개수/열린 끝은 시프트·AND로 계산
+- rows 는 JSON 응답/레거시 코드용 List[List[int]] 뷰 (set/clear 시 함께 갱신)
+- 형태표(pat)는 빈칸마다 9칸 창을 잘라 patterns.TABLE 에서 한 번에 조회 (띈 3/4 까지)
+"""
+from __future__ import annotations
+import random
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+
+from patterns import KINDS, KIND_BITS, R, TABLE, W, WMASK
+
+# 방향 인덱스: 0=가로(dx=1,dy=0) 1=세로(0,1) 2=대각(1,1) 3=역대각(1,-1)
+DIR_VECS: Tuple[Tuple[int, int], ...] = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+def dir_index(dx: int, dy: int) -> int:
+    """(dx,dy) 또는 그 반대 방향 → 방향 인덱스"""
+    if dy == 0:
+        return 0
+    if dx == 0:
+        return 1
+    return 2 if dx == dy else 3
+
+
+class _Geometry:
+    """보드 크기별 셀→(비트 위치, 라인 오프셋, 라인 길이, 라인 내 위치) 사전계산"""
+
+    def __init__(self, n: int):
+        self.n = n
+        cells = n * n
+        self.bit = [[0] * cells for _ in range(4)]
+        self.line_off = [[0] * cells for _ in range(4)]
+        self.line_len = [[0] * cells for _ in range(4)]
+        self.pos = [[0] * cells for _ in range(4)]
+        # 방향 d 레이아웃의 비트 → 셀 인덱스 (구분 비트는 -1), 유효 비트 전체
+        self.cell_of_bit: List[List[int]] = [[] for _ in range(4)]
+        self.full = [0, 0, 0, 0]
+        self.span = [0, 0, 0, 0]  # 구분 비트까지 포함한 전체 비트
+        # 셀이 속한 방향 d 라인의 (라인 내 위치 순) 가로 레이아웃 비트 목록 / 마스크 — 증분 갱신용
+        self.line_h: List[List[List[int]]] = [[[]] * cells for _ in range(4)]
+        self.line_hmask = [[0] * cells for _ in range(4)]
+        # 같은 라인에서 셀 좌우 R칸(형태 창이 그 셀을 덮는 칸들)의 가로 레이아웃 마스크
+        self.near_h = [[0] * cells for _ in range(4)]
+
+        for d, (dx, dy) in enumerate(DIR_VECS):
+            off = 0
+            for sx, sy in self._line_starts(d):
+                line = []
+                x, y = sx, sy
+                while 0 <= x < n and 0 <= y < n:
+                    line.append(y * n + x)
+                    x += dx
+                    y += dy
+                hbits = [(c // n) * (n + 1) + c % n for c in line]
+                hmask = 0
+                for hb in hbits:
+                    hmask |= 1 << hb
+                for p, c in enumerate(line):
+                    self.bit[d][c] = off + p
+                    self.line_off[d][c] = off
+                    self.line_len[d][c] = len(line)
+                    self.pos[d][c] = p
+                    self.line_h[d][c] = hbits
+                    self.line_hmask[d][c] = hmask
+                    for hb in hbits[max(0, p - R):p + R + 1]:
+                        self.near_h[d][c] |= 1 << hb
+                self.cell_of_bit[d].extend(line)
+                self.cell_of_bit[d].append(-1)
+                self.full[d] |= ((1 << len(line)) - 1) << off
+                off += len(line) + 1  # 구분 비트 1칸
+            self.span[d] = (1 << off) - 1
+
+        # 가로 레이아웃(= stride n+1 의 패딩된 행우선)에서 유효 셀 전체
+        self.stride = n + 1
+        self.valid = 0
+        for y in range(n):
+            self.valid |= ((1 << n) - 1) << (y * self.stride)
+        self._neighbor: dict = {}
+
+        # Zobrist 키: 보드 크기별 고정 시드 → 프로세스/워커가 달라도 같은 국면은 같은 해시
+        rng = random.Random(0x0A0C ^ n)
+        self.zobrist = [[0] * cells] + [[rng.getrandbits(64) for _ in range(cells)] for _ in (1, 2)]
+
+    def _line_starts(self, d: int) -> List[Tuple[int, int]]:
+        n = self.n
+        if d == 0:
+            return [(0, y) for y in range(n)]
+        if d == 1:
+            return [(x, 0) for x in range(n)]
+        if d == 2:
+            return [(0, y) for y in range(n - 1, 0, -1)] + [(x, 0) for x in range(n)]
+        # 역대각: x 증가, y 감소 방향으로 진행
+        return [(0, y) for y in range(n)] + [(x, n - 1) for x in range(1, n)]
+
+    def neighbor_masks(self, r: int) -> List[int]:
+        """셀별 체비쇼프 반경 r 이웃(자기 자신 제외) 마스크 — 가로 레이아웃 기준"""
+        masks = self._neighbor.get(r)
+        if masks is None:
+            n, s = self.n, self.stride
+            masks = []
+            for y in range(n):
+                for x in range(n):
+                    m = 0
+                    for yy in range(max(0, y - r), min(n, y + r + 1)):
+                        for xx in range(max(0, x - r), min(n, x + r + 1)):
+                            if xx != x or yy != y:
+                                m |= 1 << (yy * s + xx)
+                    masks.append(m)
+            self._neighbor[r] = masks
+        return masks
+
+
+@lru_cache(maxsize=None)
+def geometry(n: int) -> _Geometry:
+    return _Geometry(n)
+
+
+def _trailing_ones(t: int) -> int:
+    return (~t & (t + 1)).bit_length() - 1
+
+
+# 형태 종류 이름 — pat[color][k] 의 k 순서 (patterns.KINDS 와 같음)
+PATTERN_KINDS: Tuple[str, ...] = KINDS
+_K = len(KINDS)
+
+
+class BitBoard:
+    """
+    1: 흑, 2: 백
+    masks[color][d] — 방향 d 레이아웃의 해당 색 돌 비트
+    hash             — Zobrist 해시 (착수/해제 때 XOR로 증분 갱신)
+    pat[color][k][d] — 형태표: color가 두면 방향 d로 PATTERN_KINDS[k]가 되는 빈칸 (가로 레이아웃)
+                       착수/해제 때 그 돌을 지나는 네 라인만 다시 계산한다
+    _renju           — renju.forbidden_move 결과 캐시 {칸*3+색: (금수, 이유, 읽은 칸 마스크)}
+                       착수/해제된 칸을 읽었던 항목만 지운다
+    """
+
+    __slots__ = ("n", "geo", "masks", "rows", "stones", "pat", "hash", "_threats", "_renju")
+
+    def __init__(self, n: int = 15):
+        self.n = n
+        self.geo = geometry(n)
+        self.masks: List[List[int]] = [[0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+        self.rows: List[List[int]] = [[0] * n for _ in range(n)]
+        self.stones = 0
+        self.hash = 0
+        self.pat: List[List[List[int]]] = [[], _empty_pat(), _empty_pat()]
+        self._threats: dict = {}
+        self._renju: dict = {}
+
+    @classmethod
+    def from_rows(cls, rows: List[List[int]]) -> "BitBoard":
+        bb = cls(len(rows))
+        for y, row in enumerate(rows):
+            for x, v in enumerate(row):
+                if v:
+                    bb._place(x, y, v)
+        bb._rebuild_patterns()
+        return bb
+
+    def copy(self) -> "BitBoard":
+        bb = BitBoard.__new__(BitBoard)
+        bb.n = self.n
+        bb.geo = self.geo
+        bb.masks = [m[:] for m in self.masks]
+        bb.rows = [r[:] for r in self.rows]
+        bb.stones = self.stones
+        bb.hash = self.hash
+        bb.pat = [[], [k[:] for k in self.pat[1]], [k[:] for k in self.pat[2]]]
+        bb._threats = {}
+        bb._renju = dict(self._renju)  # 같은 국면이라 그대로 유효
+        return bb
+
+    def swapped(self) -> "BitBoard":
+        """흑↔백을 바꾼 사본 (흑 추천을 백 알고리즘으로 돌릴 때)"""
+        bb = self.copy()
+        bb.masks[1], bb.masks[2] = bb.masks[2], bb.masks[1]
+        bb.pat[1], bb.pat[2] = bb.pat[2], bb.pat[1]
+        bb._renju = {k - k % 3 + (3 - k % 3): v for k, v in self._renju.items()}  # 색 번호만 바뀐다
+        bb.rows = [[0 if v == 0 else 3 - v for v in r] for r in self.rows]
+        z, n, h = self.geo.zobrist, self.n, 0
+        for y, r in enumerate(bb.rows):
+            for x, v in enumerate(r):
+                if v:
+                    h ^= z[v][y * n + x]
+        bb.hash = h
+        return bb
+
+    # ---------------- 피클 (AI 워커 프로세스로 보낼 때) ----------------
+
+    def __getstate__(self):
+        # geo 는 크기별 공용 표라 보내지 않고 받는 쪽에서 geometry(n) 으로 다시 얻는다
+        return self.n, self.masks, self.rows, self.stones, self.pat, self.hash
+
+    def __setstate__(self, state) -> None:
+        self.n, self.masks, self.rows, self.stones, self.pat, self.hash = state
+        self.geo = geometry(self.n)
+        self._threats = {}
+        self._renju = {}
+
+    # ---------------- 레거시 호환 (board[y][x], len(board)) ----------------
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, y: int) -> List[int]:
+        return self.rows[y]
+
+    # ---------------- 착수/해제 ----------------
+
+    def get(self, x: int, y: int) -> int:
+        return self.rows[y][x]
+
+    def set(self, x: int, y: int, color: int) -> None:
+        self._place(x, y, color)
+        self._update_lines(y * self.n + x)
+        if self._renju:
+            self._drop_renju(x, y)
+
+    def clear(self, x: int, y: int) -> None:
+        color = self.rows[y][x]
+        if not color:
+            return
+        c = y * self.n + x
+        m = self.masks[color]
+        bit = self.geo.bit
+        for d in range(4):
+            m[d] &= ~(1 << bit[d][c])
+        self.rows[y][x] = 0
+        self.stones -= 1
+        self.hash ^= self.geo.zobrist[color][c]
+        self._update_lines(c)
+        if self._renju:
+            self._drop_renju(x, y)
+
+    def _drop_renju(self, x: int, y: int) -> None:
+        bit = 1 << (y * self.geo.stride + x)
+        cache = self._renju
+        for k in [k for k, v in cache.items() if v[2] & bit]:
+            del cache[k]
+
+    def _place(self, x: int, y: int, color: int) -> None:
+        c = y * self.n + x
+        m = self.masks[color]
+        bit = self.geo.bit
+        for d in range(4):
+            m[d] |= 1 << bit[d][c]
+        self.rows[y][x] = color
+        self.stones += 1
+        self.hash ^= self.geo.zobrist[color][c]
+
+    # ---------------- 형태표 ----------------
+
+    def _update_lines(self, c: int) -> None:
+        """셀 c를 지나는 네 라인에서, 9칸 창이 c를 덮는 빈칸(좌우 R칸)만 형태를 다시 매김"""
+        g = self.geo
+        for d in range(4):
+            p = g.pos[d][c]
+            self._scan_line(d, c, max(0, p - R), p + R + 1, g.near_h[d][c])
+        self._threats = {}
+
+    def _scan_line(self, d: int, c: int, lo: int, hi: int, span: int) -> None:
+        """
+        셀 c가 속한 방향 d 라인의 위치 lo..hi-1 빈칸을 두 색 모두 patterns.TABLE 조회로 분류
+        span: 그 칸들의 가로 레이아웃 마스크 (형태표에서 이 범위를 통째로 바꿔 끼운다)
+        """
+        g = self.geo
+        off, ln = g.line_off[d][c], g.line_len[d][c]
+        hi = min(ln, hi)
+        full = (1 << ln) - 1
+        m1 = (self.masks[1][d] >> off) & full
+        m2 = (self.masks[2][d] >> off) & full
+        occ = m1 | m2
+        # 라인 양쪽에 R칸씩 보드 밖(두 워드 모두 1)을 붙여 어느 칸이든 창이 9칸이 되게
+        edge = ((1 << (ln + 2 * R)) - 1) ^ (full << R)
+        a, b = (m1 << R) | edge, (m2 << R) | edge
+        hbits = g.line_h[d][c]
+        acc1, acc2 = [0] * _K, [0] * _K
+        e = ~occ & ((1 << hi) - (1 << lo))
+        while e:
+            low = e & -e
+            e ^= low
+            q = low.bit_length() - 1
+            hb = 1 << hbits[q]
+            wa, wb = (a >> q) & WMASK, (b >> q) & WMASK
+            f = TABLE[(wa << W) | wb]
+            if f:
+                for k in KIND_BITS[f]:
+                    acc1[k] |= hb
+            f = TABLE[(wb << W) | wa]
+            if f:
+                for k in KIND_BITS[f]:
+                    acc2[k] |= hb
+        keep = ~span
+        p1, p2 = self.pat[1], self.pat[2]
+        for k in range(_K):
+            p1[k][d] = (p1[k][d] & keep) | acc1[k]
+            p2[k][d] = (p2[k][d] & keep) | acc2[k]
+
+    def _rebuild_patterns(self) -> None:
+        """형태표 전체 재계산 — 모든 라인의 모든 빈칸을 표로"""
+        g, n = self.geo, self.n
+        self.pat = [[], _empty_pat(), _empty_pat()]
+        for d in range(4):
+            for x, y in g._line_starts(d):
+                c = y * n + x
+                self._scan_line(d, c, 0, g.line_len[d][c], g.line_hmask[d][c])
+        self._threats = {}
+        self._renju = {}
+
+    # ---------------- 라인 분석 ----------------
+
+    def line_words(self, x: int, y: int, d: int, who: int) -> Tuple[int, int, int, int]:
+        """방향 d 라인에서 (who 돌 워드, 빈칸 워드, 라인 내 위치, 라인 길이)"""
+        g = self.geo
+        c = y * self.n + x
+        off = g.line_off[d][c]
+        ln = g.line_len[d][c]
+        full = (1 << ln) - 1
+        mine = (self.masks[who][d] >> off) & full
+        occ = ((self.masks[1][d] | self.masks[2][d]) >> off) & full
+        return mine, ~occ & full, g.pos[d][c], ln
+
+    def line_info(self, x: int, y: int, d: int, who: int) -> Tuple[int, int]:
+        """
+        (x,y)를 who 돌로 간주했을 때 방향 d의 (연속 길이, 열린 끝 수)
+        - 빈칸이면 '가상 착수' 결과와 같다 (보드를 건드리지 않음)
+        """
+        mine, empty, p, ln = self.line_words(x, y, d, who)
+        f = _trailing_ones(mine >> (p + 1))
+        below = ~mine & ((1 << p) - 1)
+        b = p - below.bit_length() if below else p
+        opens = 0
+        ef = p + 1 + f
+        if ef < ln and (empty >> ef) & 1:
+            opens += 1
+        eb = p - 1 - b
+        if eb >= 0 and (empty >> eb) & 1:
+            opens += 1
+        return 1 + f + b, opens
+
+    def run(self, x: int, y: int, dx: int, dy: int, who: int) -> int:
+        """(x,y) 다음 칸부터 (dx,dy) 방향으로 이어진 who 돌 개수 (자기 자신 제외)"""
+        d = dir_index(dx, dy)
+        mine, _, p, _ = self.line_words(x, y, d, who)
+        dvx, dvy = DIR_VECS[d]
+        if (dx, dy) == (dvx, dvy):
+            return _trailing_ones(mine >> (p + 1))
+        below = ~mine & ((1 << p) - 1)
+        return p - below.bit_length() if below else p
+
+    def max_run(self, x: int, y: int, who: int) -> int:
+        """(x,y)를 who 돌로 간주했을 때 네 방향 중 최장 연속 길이"""
+        return max(self.line_info(x, y, d, who)[0] for d in range(4))
+
+    def threat_masks(self, who: int) -> dict:
+        """
+        who가 두면 생기는 형태별 빈칸 마스크(가로 레이아웃) — 형태표의 네 방향을 OR
+        - five : 5 이상 (overline: 그중 6 이상)
+        - open4: 정확히 4 + 양끝 열림 / semi4: 정확히 4 + 한쪽 이상 열림 / open3: 정확히 3 + 양끝 열림
+        - split4: 띈 4 (X.XXX, XX.XX) / split3: 띈 3 (X.XX → 한 수 더 두면 열린 4) / two: 살아 있는 2
+        """
+        cached = self._threats.get(who)
+        if cached is None:
+            cached = {}
+            for k, name in enumerate(PATTERN_KINDS):
+                p = self.pat[who][k]
+                cached[name] = p[0] | p[1] | p[2] | p[3]
+            self._threats[who] = cached
+        return cached
+
+    def cell_bit(self, x: int, y: int) -> int:
+        """가로 레이아웃에서 (x,y)의 비트"""
+        return 1 << (y * self.geo.stride + x)
+
+    # ---------------- 점유/이웃 ----------------
+
+    def occupancy(self) -> int:
+        """가로 레이아웃(stride n+1) 점유 마스크"""
+        return self.masks[1][0] | self.masks[2][0]
+
+    def has_neighbor(self, x: int, y: int, r: int) -> bool:
+        return bool(self.geo.neighbor_masks(r)[y * self.n + x] & self.occupancy())
+
+    def near_mask(self, r: int) -> int:
+        """돌에서 체비쇼프 반경 r 이내의 빈칸 마스크 (가로 레이아웃)"""
+        g = self.geo
+        s = g.stride
+        occ = self.occupancy()
+        m = occ
+        for _ in range(r):
+            m |= (m << 1) | (m >> 1)
+            m |= (m << s) | (m >> s)
+            m &= g.valid  # 패딩 열로 넘어간 비트 제거
+        return m & ~occ
+
+    def empty_mask(self) -> int:
+        return self.geo.valid & ~self.occupancy()
+
+    def iter_mask(self, m: int) -> Iterator[Tuple[int, int]]:
+        """가로 레이아웃 마스크의 셀을 행우선 순서로 (x,y) 산출"""
+        s = self.geo.stride
+        while m:
+            low = m & -m
+            i = low.bit_length() - 1
+            yield i % s, i // s
+            m ^= low
+
+    def empties(self) -> Iterator[Tuple[int, int]]:
+        return self.iter_mask(self.empty_mask())
+
+
+def _empty_pat() -> List[List[int]]:
+    return [[0, 0, 0, 0] for _ in PATTERN_KINDS]
+
+
+def as_bitboard(board) -> BitBoard:
+    """List[List[int]] 또는 BitBoard → BitBoard"""
+    if isinstance(board, BitBoard):
+        return board
+    return BitBoard.from_rows(board)
+
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# backend/book.py
+"""
+오프닝북 (백=AI 차례 국면 → 둘 수)
+- 키: 대칭 정규화 Zobrist 해시(symmetry.canonical), 수는 정규화 좌표로 저장
+- 파일: 헤더 + 키 오름차순 고정 길이 레코드 → mmap 후 이진 탐색 (빌드는 build_book.py)
+
+  헤더  <4sHHI  magic=b"OMBK", board_size, max_stones, count
+  레코드 <QBBH   key, x, y, weight
+"""
+from __future__ import annotations
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from bitboard import BitBoard
+from symmetry import canonical, stones_of, to_canonical, from_canonical
+
+MAGIC = b"OMBK"
+_HEADER = struct.Struct("<4sHHI")
+_RECORD = struct.Struct("<QBBH")
+
+BOOK_PATH = os.getenv("OMOK_BOOK_PATH", str(Path(__file__).with_name("opening_book.bin")))
+
+
+class OpeningBook:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.board_size, self.max_stones, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"오프닝북 형식이 아닙니다: {path}")
+        self.hits = 0
+        self.misses = 0
+
+    def _find(self, key: int) -> Optional[Tuple[int, int]]:
+        lo, hi = 0, self.count
+        base, size = _HEADER.size, _RECORD.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, x, y, _ = _RECORD.unpack_from(self._mm, base + mid * size)
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return x, y
+        return None
+
+    def lookup(self, board: BitBoard) -> Optional[Dict[str, int]]:
+        """board(백 차례) 북 수 {"x","y"}, 없으면 None"""
+        n = len(board)
+        if n != self.board_size or board.stones > self.max_stones:
+            return None
+        key, k = canonical(stones_of(board), n)
+        hit = self._find(key)
+        if hit is None:
+            self.misses += 1
+            return None
+        x, y = from_canonical(hit[0], hit[1], n, k)
+        if board[y][x] != 0:  # 해시 충돌 방어
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {"x": x, "y": y}
+
+
+def write_book(path: str, board_size: int, max_stones: int,
+               entries: Iterable[Tuple[int, int, int, int]]) -> int:
+    """entries: (정규화 키, 정규화 x, 정규화 y, 가중치). 키가 겹치면 가중치 큰 쪽을 남김"""
+    best: Dict[int, Tuple[int, int, int]] = {}
+    for key, x, y, w in entries:
+        if key not in best or w > best[key][2]:
+            best[key] = (x, y, w)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, board_size, max_stones, len(best)))
+        for key in sorted(best):
+            x, y, w = best[key]
+            f.write(_RECORD.pack(key, x, y, min(w, 0xFFFF)))
+    os.replace(tmp, path)
+    return len(best)
+
+
+def book_entry(board: BitBoard, x: int, y: int, weight: int = 1) -> Tuple[int, int, int, int]:
+    """현재 국면에서 (x,y)를 두는 북 레코드 (정규화 좌표로 변환)"""
+    n = len(board)
+    key, k = canonical(stones_of(board), n)
+    cx, cy = to_canonical(x, y, n, k)
+    return key, cx, cy, weight
+
+
+def load_book(path: str = BOOK_PATH) -> Optional[OpeningBook]:
+    """북 파일이 없거나 깨졌으면 None (북 없이 동작)"""
+    try:
+        return OpeningBook(path)
+    except (OSError, ValueError, struct.error) as e:
+        if os.path.exists(path):
+            print(f"[BOOK] 로드 실패: {e!r}")
+        return None
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/build_book.py
+"""
+오프닝북 오프라인 빌더 (자가대국)
+- 흑: 휴리스틱 Top-K 샘플링으로 다양한 오프닝을 만든다
+- 백: 고급 결정(강제 수 → 탐색 엔진)을 넉넉한 시간 예산으로 돌린 수를 북에 기록
+  (_decide_without_llm 을 마감 없이 직접 — 응답 마감(OMOK_AI_SLO_SEC)·국면 캐시를 거치지 않는다)
+- 같은 국면(대칭 포함)이 여러 번 나오면 가장 많이 나온 수를 남긴다
+
+예) python build_book.py --games 300 --max-stones 10 --budget 2.0 --out opening_book.bin
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter
+
+
+def _black_move(g, ai) -> tuple:
+    """흑(1) 수: 보드를 뒤집어 백 휴리스틱을 샘플링 모드로 사용, 금수는 건너뜀"""
+    inv = g.bb.swapped()
+    forced = ai._find_must_block_move_for_beginner(inv, 2, 1.0, True, True)
+    if forced is not None and not g._is_forbidden_move(*forced)[0]:
+        return forced
+    prof = ai._get_profile("초급")
+    for _ in range(8):
+        mv = ai._best_by_heuristic_with_profile(inv, 2, prof)
+        if not g._is_forbidden_move(mv["x"], mv["y"])[0]:
+            return mv["x"], mv["y"]
+    for x, y in g.bb.empties():
+        if not g._is_forbidden_move(x, y)[0]:
+            return x, y
+    raise RuntimeError("흑이 둘 곳이 없습니다.")
+
+
+def build(games: int, max_stones: int, board_size: int, seed: int):
+    import ai
+    from book import book_entry
+    from game import OmokGame
+
+    random.seed(seed)
+    votes = {}  # key -> Counter[(x,y)]
+    t0 = time.time()
+    for gi in range(games):
+        g = OmokGame(board_size)
+        c = board_size // 2
+        g.place_stone(c, c, 1)
+        while not g.game_over and g.bb.stones <= max_stones:
+            if g.current_turn == 2:
+                mv, _, _ = ai._decide_without_llm(g.bb, "고급", 1, deadline=None)
+                key, cx, cy, _ = book_entry(g.bb, mv["x"], mv["y"])
+                votes.setdefault(key, Counter())[(cx, cy)] += 1
+                ok, _ = g.place_stone(mv["x"], mv["y"], 2)
+            else:
+                x, y = _black_move(g, ai)
+                ok, _ = g.place_stone(x, y, 1)
+            if not ok:
+                break
+        if (gi + 1) % 10 == 0:
+            print(f"[BOOK] {gi + 1}/{games} games, {len(votes)} positions, {time.time() - t0:.0f}s")
+    for key, cnt in votes.items():
+        (cx, cy), w = cnt.most_common(1)[0]
+        yield key, cx, cy, w
+
+
+def main():
+    ap = argparse.ArgumentParser(description="자가대국으로 오프닝북 생성")
+    ap.add_argument("--games", type=int, default=200)
+    ap.add_argument("--max-stones", type=int, default=10, help="북에 넣을 최대 돌 수")
+    ap.add_argument("--budget", type=float, default=2.0, help="백 수당 탐색 시간(초)")
+    ap.add_argument("--board-size", type=int, default=int(os.getenv("OMOK_BOARD_SIZE", "15")))
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin"))
+    args = ap.parse_args()
+
+    # 빌드 중엔 기존 북을 쓰지 않고, 지연 없이, 주어진 예산으로 탐색 (ai/book import 전에 설정)
+    os.environ["OMOK_BOOK_PATH"] = ""
+    os.environ["OMOK_FORCE_DELAY_SEC"] = "0"
+    os.environ["OMOK_ADV_TIME_BUDGET_SEC"] = str(args.budget)
+    from book import write_book
+    entries = build(args.games, args.max_stones, args.board_size, args.seed)
+    n = write_book(args.out, args.board_size, args.max_stones, entries)
+    print(f"[BOOK] wrote {n} positions -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,3 +10,60 @@ OMOK_LLM_KEY = os.getenv("OMOK_LLM_KEY", "")  # 프록시에 토큰이 필요하
 
 # RL 모델 경로 (고급에서 사용)
 OMOK_RL_PATH = os.getenv("OMOK_RL_PATH", "model.pt")
+
+# 탐색 엔진 치환표(transposition table) 메모리 상한(MB) — 워커 프로세스 하나가 모든 게임과 공유
+OMOK_TT_MAX_MB = float(os.getenv("OMOK_TT_MAX_MB", "64"))
+
+# AI 계산 실행기 — process(기본: 탐색이 이벤트 루프/GIL 을 막지 않음) | thread | inline(디버그용, 루프에서 직접)
+OMOK_AI_EXECUTOR = os.getenv("OMOK_AI_EXECUTOR", "process").strip().lower()
+# 워커 수 (프로세스 모드면 워커마다 치환표를 따로 가지므로 메모리는 워커 수 × OMOK_TT_MAX_MB)
+OMOK_AI_WORKERS = max(1, int(os.getenv("OMOK_AI_WORKERS", str(min(4, os.cpu_count() or 1)))))
+# AI 한 요청의 지연 목표(SLO, 초) — 요청이 들어온 때부터의 마감. 강제 수/휴리스틱/LLM 블렌딩/탐색 모두 마감 안에서
+# 그때까지의 최선 수를 낸다. 생각하는 척 지연(OMOK_FORCE_DELAY_SEC)도 이 예산 안에서 (계산에 쓴 만큼 덜 기다림)
+# 0 이면 마감 없음 (지연은 계산 뒤에 덧붙고 LLM 은 OMOK_LLM_TIMEOUT_SEC 까지 기다리는 이전 동작)
+OMOK_AI_SLO_SEC = float(os.getenv("OMOK_AI_SLO_SEC", "3"))
+# 마감 전에 남겨 둘 여유(초) — 탐색을 끊고 응답을 만들어 보내는 시간
+OMOK_AI_SLO_MARGIN_SEC = float(os.getenv("OMOK_AI_SLO_MARGIN_SEC", "0.05"))
+
+# AI 요청 마이크로배칭 (ai_batch.py) — 첫 요청 뒤 최대 대기(ms)와 한 배치 최대 크기. 크기 1 이면 모으지 않음
+OMOK_AI_BATCH_MAX = int(os.getenv("OMOK_AI_BATCH_MAX", "16"))
+OMOK_AI_BATCH_WAIT_MS = float(os.getenv("OMOK_AI_BATCH_WAIT_MS", "2"))
+# 휴리스틱 후보 점수를 numpy 로 보드 전체 한 번에 (ai_np.py). numpy 가 없으면 이 값과 무관하게 칸별 파이썬 경로
+OMOK_AI_NUMPY = os.getenv("OMOK_AI_NUMPY", "1") == "1"
+
+# find_best_move 앞단 국면 캐시 — 항목 수 상한(0이면 끔)과 항목 수명(초)
+OMOK_MOVE_CACHE_SIZE = int(os.getenv("OMOK_MOVE_CACHE_SIZE", "10000"))
+OMOK_MOVE_CACHE_TTL_SEC = float(os.getenv("OMOK_MOVE_CACHE_TTL_SEC", "600"))
+
+# 게임 영속 저장소 — sqlite(기본) | file | redis | memory(재시작하면 사라짐)
+OMOK_STORE = os.getenv("OMOK_STORE", "sqlite").strip().lower()
+# sqlite 면 DB 파일, file 이면 디렉터리, redis 면 URL
+OMOK_STORE_PATH = os.getenv("OMOK_STORE_PATH") or (
+    "redis://127.0.0.1:6379/0" if OMOK_STORE == "redis" else
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.db" if OMOK_STORE == "sqlite" else "games"))
+# 로그 레코드가 이만큼 쌓이면 스냅샷으로 접는다 / 착수마다 fsync 할지(느리지만 전원 장애에도 안전)
+OMOK_STORE_SNAPSHOT_EVERY = int(os.getenv("OMOK_STORE_SNAPSHOT_EVERY", "2000"))
+OMOK_STORE_FSYNC = os.getenv("OMOK_STORE_FSYNC", "0") == "1"
+# 시작 시 메모리에 미리 올릴 진행 중 게임의 최대 유휴 시간(초) — 더 오래된 게임은 요청이 오면 읽는다
+OMOK_STORE_PRELOAD_MAX_AGE_SEC = float(os.getenv("OMOK_STORE_PRELOAD_MAX_AGE_SEC", "86400"))
+# WebSocket 자리(흑/백) 임대 시간(초) — 워커가 TTL/3 마다 갱신. 워커가 죽으면(크래시/kill/재배포) 이만큼 뒤 자리가 풀린다
+OMOK_SEAT_TTL_SEC = max(1.0, float(os.getenv("OMOK_SEAT_TTL_SEC", "30")))
+
+# 메모리 게임 정리 — 끝난 게임/방치된 게임을 이 시간(초) 뒤 메모리에서 뺀다 (0 이하면 끔)
+OMOK_REAP_FINISHED_TTL_SEC = float(os.getenv("OMOK_REAP_FINISHED_TTL_SEC", "600"))
+OMOK_REAP_IDLE_TTL_SEC = float(os.getenv("OMOK_REAP_IDLE_TTL_SEC", "3600"))
+OMOK_REAP_INTERVAL_SEC = float(os.getenv("OMOK_REAP_INTERVAL_SEC", "30"))
+# 1: 뺀 게임은 저장소에 남겨 두었다가 요청이 오면 다시 읽음 | 0: 저장소에서도 지움
+OMOK_REAP_SPILL = os.getenv("OMOK_REAP_SPILL", "1") == "1"
+
+# 워커 간 메시지 채널 (착수/채팅 브로드캐스트) — local(워커 1개) | socket(같은 호스트, TCP 허브) | redis
+OMOK_PUBSUB = os.getenv("OMOK_PUBSUB", "local").strip().lower()
+OMOK_PUBSUB_URL = os.getenv("OMOK_PUBSUB_URL") or ("redis://127.0.0.1:6379/0" if OMOK_PUBSUB == "redis"
+                                                   else "127.0.0.1:8765")
+# uvicorn 워커 수 (run.py). 2 이상이면 OMOK_STORE=sqlite|redis, OMOK_PUBSUB=socket|redis 여야 서로 보인다
+OMOK_WORKERS = max(1, int(os.getenv("OMOK_WORKERS", "1")))
+
+# WebSocket 팬아웃 (fanout.py) — 연결마다 송신 큐 길이, 큐가 찼을 때 정책(drop_oldest | disconnect), 한 번 전송 제한 시간
+OMOK_WS_QUEUE_SIZE = max(1, int(os.getenv("OMOK_WS_QUEUE_SIZE", "64")))
+OMOK_WS_SLOW_POLICY = os.getenv("OMOK_WS_SLOW_POLICY", "drop_oldest").strip().lower()
+OMOK_WS_SEND_TIMEOUT_SEC = float(os.getenv("OMOK_WS_SEND_TIMEOUT_SEC", "5"))
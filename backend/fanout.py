@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# backend/fanout.py
+"""
+WebSocket 팬아웃 — 느린 클라이언트 하나가 다른 사람의 업데이트를 막지 않게
+- 연결마다 크기 제한 송신 큐 + 전용 쓰기 태스크. 브로드캐스트는 각 큐에 put_nowait 만 하고 바로 돌아온다
+- 큐가 차면 정책대로: drop_oldest(가장 오래된 메시지를 버림 — 델타 클라이언트는 seq 빈틈을 보고 resync 요청,
+  전체 보드 클라이언트는 어차피 최신 상태가 이김) | disconnect(그 연결을 끊음)
+- 한 번의 전송이 send_timeout_sec 를 넘기면 끊는다 (반쯤 죽은 모바일 연결)
+- Room: 게임 하나의 흑/백 자리 + 관전자(수 제한 없음)
+"""
+from __future__ import annotations
+import asyncio
+from typing import Dict, Iterator, Optional, Set
+
+POLICIES = ("drop_oldest", "disconnect")
+
+# 프로세스 누적 (연결이 끊겨도 남도록 Peer 가 아니라 모듈에) — /metrics
+STATS = {"dropped": 0, "slow_disconnects": 0, "send_failures": 0}
+
+
+class Peer:
+    def __init__(self, ws, role: str, delta: bool, queue_size: int = 64, policy: str = "drop_oldest",
+                 send_timeout_sec: float = 5.0):
+        if policy not in POLICIES:
+            raise ValueError(f"OMOK_WS_SLOW_POLICY 는 {POLICIES} 중 하나여야 합니다: {policy!r}")
+        self.ws = ws
+        self.role = role  # black | white | spectator
+        self.delta = delta
+        self.policy = policy
+        self.send_timeout_sec = send_timeout_sec
+        self.queue: asyncio.Queue = asyncio.Queue(max(1, queue_size))
+        self.closed = False
+        self.dropped = 0
+        self.sent = 0
+        self.close_reason = ""
+        self._task = asyncio.create_task(self._writer())
+
+    def offer(self, text: str) -> bool:
+        """보낼 JSON 문자열을 큐에 (기다리지 않음). 연결이 이미 닫혔거나 정책상 끊었으면 False"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self.policy == "disconnect":
+            STATS["slow_disconnects"] += 1
+            self.close("slow consumer")
+            return False
+        self.queue.get_nowait()
+        self.dropped += 1
+        STATS["dropped"] += 1
+        self.queue.put_nowait(text)
+        return True
+
+    async def _writer(self) -> None:
+        while True:
+            text = await self.queue.get()
+            try:
+                await asyncio.wait_for(self.ws.send_text(text), timeout=self.send_timeout_sec)
+                self.sent += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                STATS["send_failures"] += 1
+                self.close("send failed")
+                return
+
+    def close(self, reason: str = "") -> None:
+        """쓰기 태스크를 멈추고 소켓을 닫는다 → 그 연결의 수신 루프가 끊김을 보고 정리"""
+        if self.closed:
+            return
+        self.closed = True
+        self._task.cancel()
+        self.close_reason = reason
+        asyncio.ensure_future(self._close_ws())
+
+    async def _close_ws(self) -> None:
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+
+
+class Room:
+    """게임 하나에 붙은 (이 워커의) 연결들"""
+
+    def __init__(self):
+        self.players: Dict[str, Optional[Peer]] = {"black": None, "white": None}
+        self.spectators: Set[Peer] = set()
+
+    def __bool__(self) -> bool:
+        return any(self.players.values()) or bool(self.spectators)
+
+    def peers(self) -> Iterator[Peer]:
+        for p in self.players.values():
+            if p is not None:
+                yield p
+        yield from list(self.spectators)
+
+    def add(self, peer: Peer) -> None:
+        if peer.role == "spectator":
+            self.spectators.add(peer)
+        else:
+            self.players[peer.role] = peer
+
+    def remove(self, peer: Peer) -> None:
+        if peer.role == "spectator":
+            self.spectators.discard(peer)
+        elif self.players.get(peer.role) is peer:
+            self.players[peer.role] = None
@@ -3,6 +3,9 @@
 from __future__ import annotations
 from typing import Tuple, Optional, List
 
+from bitboard import BitBoard
+from renju import forbidden_move
+
 
 class OmokGame:
     """
@@ -18,12 +21,17 @@ class OmokGame:
 
     def reset(self) -> None:
         n = self.board_size
-        self.board: List[List[int]] = [[0 for _ in range(n)] for _ in range(n)]
+        self.bb: BitBoard = BitBoard(n)
         self.current_turn: int = 1  # 1=흑, 2=백
         self.winner: Optional[int] = None
         self.game_over: bool = False
         self.moves: List[Tuple[int, int]] = []
 
+    @property
+    def board(self) -> List[List[int]]:
+        """JSON 응답/레거시 코드용 List[List[int]] 뷰 (읽기 전용으로 사용)"""
+        return self.bb.rows
+
     def place_stone(self, x: int, y: int, player: int) -> Tuple[bool, str]:
         """
         플레이어(player)가 (x,y)에 수를 두려고 시도.
@@ -52,8 +60,8 @@ class OmokGame:
                 # 보드/기록/턴 전혀 변경하지 않음
                 return False, f"금수입니다! {reason} 다른 곳에 놓아주세요."
 
-        # 5) 착수
-        self.board[y][x] = player
+        # 5) 착수 (비트보드와 형태표는 이 돌을 지나는 네 라인만 갱신)
+        self.bb.set(x, y, player)
         self.moves.append((x, y))
 
         # 6) 승리 체크
@@ -74,129 +82,17 @@ class OmokGame:
         - 흑: 정확히 5목만 승리
         - 백: 5목 이상이면 승리
         """
-        n = self.board_size
-        player = self.board[y][x]
+        player = self.bb.get(x, y)
         if player == 0:
             return False
-
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
-        for dx, dy in directions:
-            count = 1
-            for s in (1, -1):
-                nx, ny = x + dx * s, y + dy * s
-                while 0 <= nx < n and 0 <= ny < n and self.board[ny][nx] == player:
-                    count += 1
-                    nx += dx * s
-                    ny += dy * s
-
-            if player == 1:
-                # 흑은 정확히 5
-                if count == 5:
-                    return True
-            else:
-                # 백은 5 이상
-                if count >= 5:
-                    return True
-        return False
+        return makes_five(self.bb, x, y, player, exact=(player == 1))
 
     def _is_forbidden_move(self, x: int, y: int) -> Tuple[bool, str]:
         """
-        흑 금수 판정: 장목(>5), 3-3, 4-4
-        간단 판별(근사). 규칙 엔진을 단순화했지만 실제 플레이엔 충분.
+        흑 금수 판정: 장목(>5), 3-3, 4-4 (렌주 정확판, renju.py)
+        (x,y)를 흑으로 '간주'만 하고 보드는 건드리지 않는다.
         """
-        n = self.board_size
-        # 가상 착수
-        self.board[y][x] = 1
-
-        # 1) 장목 검사
-        if self._makes_overline(x, y):
-            self.board[y][x] = 0
-            return True, "장목"
-
-        # 2) 3-3, 4-4 검사
-        open_threes = 0
-        open_fours = 0
-        for dx, dy in [(1, 0), (0, 1), (1, 1), (1, -1)]:
-            t = self._check_line(x, y, dx, dy)  # "open_three" | "four" | None
-            if t == "open_three":
-                open_threes += 1
-            elif t == "four":
-                # 이 수 자체가 5를 완성시키지 않는 4만 카운트
-                if not self.check_win(x, y):
-                    open_fours += 1
-
-        self.board[y][x] = 0
-
-        if open_threes >= 2:
-            return True, "3-3"
-        if open_fours >= 2:
-            return True, "4-4"
-        return False, ""
-
-    def _makes_overline(self, x: int, y: int) -> bool:
-        """흑이 (x,y)에 두었을 때 6목 이상이 되는지"""
-        n = self.board_size
-        player = 1
-        for dx, dy in [(1, 0), (0, 1), (1, 1), (1, -1)]:
-            cnt = 1
-            for s in (1, -1):
-                nx, ny = x + dx * s, y + dy * s
-                while 0 <= nx < n and 0 <= ny < n and self.board[ny][nx] == player:
-                    cnt += 1
-                    nx += dx * s
-                    ny += dy * s
-            if cnt > 5:
-                return True
-        return False
-
-    def _check_line(self, x: int, y: int, dx: int, dy: int) -> Optional[str]:
-        """
-        (x,y)=흑 가상착수 상태에서 한 방향 라인 분석
-        - "open_three": 활삼(열린3) 하나로 판단
-        - "four"     : 4 형성(양끝 중 한 곳만 열려 있어도 카운트)
-        - None       : 해당 없음
-        매우 단순화된 근사 판별
-        """
-        n = self.board_size
-        player = self.board[y][x]
-        # 정방향 수집
-        fwd = []
-        nx, ny = x + dx, y + dy
-        while 0 <= nx < n and 0 <= ny < n:
-            fwd.append(self.board[ny][nx])
-            nx += dx
-            ny += dy
-        # 역방향 수집
-        bwd = []
-        nx, ny = x - dx, y - dy
-        while 0 <= nx < n and 0 <= ny < n:
-            bwd.append(self.board[ny][nx])
-            nx -= dx
-            ny -= dy
-
-        # 연속 개수
-        cf = 0
-        for v in fwd:
-            if v == player:
-                cf += 1
-            else:
-                break
-        cb = 0
-        for v in bwd:
-            if v == player:
-                cb += 1
-            else:
-                break
-
-        total = cf + cb + 1
-        side_f_empty = (len(fwd) > cf and fwd[cf] == 0)
-        side_b_empty = (len(bwd) > cb and bwd[cb] == 0)
-
-        if side_f_empty and side_b_empty and total == 3:
-            return "open_three"
-        if total == 4 and (side_f_empty or side_b_empty):
-            return "four"
-        return None
+        return forbidden_move(self.bb, x, y, 1)
 
     # -------- 디버그 보조 --------
     def print_board(self) -> None:
@@ -205,7 +101,20 @@ class OmokGame:
         for i, row in enumerate(self.board):
             print(f"{i:2d} " + " ".join(mp[v] for v in row))
 
-    
+
+# ---------------- 비트보드 규칙 함수 (탐색 엔진과 공용) ----------------
+
+def makes_five(bb: BitBoard, x: int, y: int, player: int, exact: bool) -> bool:
+    """(x,y)를 player 돌로 간주했을 때 승리 형태가 되는지 (exact=True: 정확히 5, False: 5 이상)"""
+    for d in range(4):
+        count, _ = bb.line_info(x, y, d, player)
+        if exact:
+            if count == 5:
+                return True
+        elif count >= 5:
+            return True
+    return False
+
 
 if __name__ == "__main__":
     # 간단 자가 테스트
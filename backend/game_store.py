@@ -0,0 +1,590 @@
+# -*- coding: utf-8 -*-
+# backend/game_store.py
+"""
+게임 영속 저장소 — 서버를 재시작/재배포해도 진행 중인 게임이 살아남게
+- 착수마다 (게임, 수 번호, x, y, 플레이어) 레코드 하나를 append-only 로그에 추가
+- 로그 레코드가 snapshot_every 개 쌓이면 게임별 스냅샷(수 목록을 3바이트씩 압축)으로 접고 로그를 비운다
+- 복원은 스냅샷 + 로그를 재생 (규칙 검사 없이 돌만 놓고 형태표는 한 번에 다시 계산 → 빠름)
+- 백엔드: sqlite(기본) | file(스냅샷 + 텍스트 로그) | redis | memory(저장 안 함) — OMOK_STORE 로 교체
+- 여러 워커가 함께 쓰려면 sqlite(같은 호스트) 또는 redis(여러 호스트). file/memory 는 워커 1개 전용
+- append 는 수 번호가 이어질 때만 기록 → 두 워커가 같은 판에 동시에 두면 한쪽만 성공한다
+- 시작 때는 최근에 움직인 진행 중 게임만 메모리에 올리고, 나머지는 요청이 오면 그때 읽는다
+- WebSocket 자리는 seat_ttl 초짜리 임대 — 잡은 워커가 refresh_seats 로 갱신하고, 워커가 죽으면 만료돼 다시 잡을 수 있다
+"""
+from __future__ import annotations
+import base64
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from game import OmokGame
+
+Move = Tuple[int, int, int]  # (x, y, player)
+
+
+def pack_moves(moves: Iterable[Move]) -> bytes:
+    return bytes(v for m in moves for v in m)
+
+
+def unpack_moves(data: bytes) -> List[Move]:
+    return [(data[i], data[i + 1], data[i + 2]) for i in range(0, len(data) - 2, 3)]
+
+
+def replay(size: int, moves: List[Move]) -> OmokGame:
+    """기록된 수로 OmokGame 복원 (이미 검증된 수라 금수/차례 검사는 건너뛴다)"""
+    g = OmokGame(size)
+    for x, y, p in moves:
+        g.bb._place(x, y, p)
+        g.moves.append((x, y))
+    g.bb._rebuild_patterns()
+    if moves:
+        x, y, p = moves[-1]
+        if g.check_win(x, y):
+            g.winner, g.game_over, g.current_turn = p, True, p
+        else:
+            g.current_turn = 2 if p == 1 else 1
+    return g
+
+
+class GameStore:
+    """저장소 인터페이스 (그대로 쓰면 memory: 아무것도 저장하지 않는다)"""
+
+    backend = "memory"
+
+    def __init__(self, seat_ttl: float = 30.0):
+        self.seat_ttl = seat_ttl
+        self._seats: Dict[str, Dict[str, str]] = {}
+        self._seat_lock = Lock()
+
+    def create(self, gid: str, size: int) -> None:
+        pass
+
+    def append(self, gid: str, move_no: int, x: int, y: int, player: int, finished: bool) -> bool:
+        """
+        move_no: 1부터 (len(g.moves)). 저장된 수가 정확히 move_no - 1 개일 때만 기록하고 True
+        — 다른 워커가 같은 번호의 수를 먼저 썼으면 False (호출 쪽이 다시 읽고 재시도)
+        """
+        return True
+
+    def load(self, gid: str) -> Optional[OmokGame]:
+        return None
+
+    def move_count(self, gid: str) -> Optional[int]:
+        """저장된 수의 개수 (게임이 없으면 None) — 캐시한 게임이 뒤처졌는지 볼 때"""
+        return None
+
+    def load_live(self, max_age_sec: float) -> Dict[str, OmokGame]:
+        """끝나지 않았고 max_age_sec 안에 움직인 게임"""
+        return {}
+
+    def delete(self, gid: str) -> None:
+        with self._seat_lock:
+            self._seats.pop(gid, None)
+
+    # WebSocket 자리(black/white) — 여러 워커가 같은 자리를 동시에 잡지 않게 저장소에서 선점
+    # (기본 구현은 프로세스 메모리: 워커 1개일 때만 의미 있고, 재시작하면 함께 사라지므로 임대가 필요 없다)
+
+    def claim_seat(self, gid: str, role: str, owner: str) -> bool:
+        with self._seat_lock:
+            seats = self._seats.setdefault(gid, {})
+            if role in seats:
+                return False
+            seats[role] = owner
+            return True
+
+    def release_seat(self, gid: str, role: str, owner: str) -> None:
+        with self._seat_lock:
+            seats = self._seats.get(gid) or {}
+            if seats.get(role) == owner:
+                del seats[role]
+
+    def release_owner(self, owner_prefix: str) -> None:
+        """이 워커가 잡았던 자리 전부 (종료 시)"""
+        with self._seat_lock:
+            for seats in self._seats.values():
+                for role in [r for r, o in seats.items() if o.startswith(owner_prefix)]:
+                    del seats[role]
+
+    def seats(self, gid: str) -> Dict[str, str]:
+        with self._seat_lock:
+            return dict(self._seats.get(gid) or {})
+
+    def refresh_seats(self, owner_prefix: str) -> None:
+        """이 워커가 잡은 자리의 임대를 지금부터 seat_ttl 초로 연장 (heartbeat)"""
+        pass
+
+    def snapshot(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+
+class _Compacting(GameStore):
+    """로그가 snapshot_every 개 쌓이면 백그라운드 스레드 하나로 스냅샷을 뜨는 공통 부분"""
+
+    def __init__(self, snapshot_every: int, seat_ttl: float = 30.0):
+        super().__init__(seat_ttl)
+        self.snapshot_every = max(1, int(snapshot_every))
+        self._lock = Lock()
+        self._snap_lock = Lock()  # 스냅샷은 한 번에 하나씩 (백그라운드 스레드와 close 가 겹칠 수 있음)
+        self._pending = 0  # 마지막 스냅샷 이후 로그 레코드 수
+        self._snapshotting = False
+        self.appends = 0
+        self.snapshots = 0
+        self.last_snapshot_ms = 0.0
+
+    def _logged(self) -> None:
+        """로그 레코드 하나 추가 후 (self._lock 안에서 호출)"""
+        self.appends += 1
+        self._pending += 1
+        if self._pending >= self.snapshot_every and not self._snapshotting:
+            self._snapshotting = True
+            threading.Thread(target=self._snapshot_bg, name="omok-store-snapshot", daemon=True).start()
+
+    def _snapshot_bg(self) -> None:
+        try:
+            self.snapshot()
+        except Exception as e:
+            print("[STORE] snapshot failed:", repr(e))
+        finally:
+            self._snapshotting = False
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "appends": self.appends, "pending_log": self._pending,
+                "snapshots": self.snapshots, "last_snapshot_ms": round(self.last_snapshot_ms, 2)}
+
+
+class SqliteGameStore(_Compacting):
+    """
+    games(스냅샷) + moves(로그) + seats(WebSocket 자리, expires 까지 임대) 세 테이블
+    WAL 모드라 같은 호스트의 여러 워커 프로세스가 한 DB 파일을 함께 쓸 수 있다 (쓰기는 BEGIN IMMEDIATE 로 직렬화)
+    """
+
+    backend = "sqlite"
+    SNAPSHOT_CHUNK = 2000  # 스냅샷 트랜잭션 하나에 접는 로그 레코드 수
+
+    def __init__(self, path: str, snapshot_every: int = 2000, fsync: bool = False, seat_ttl: float = 30.0):
+        super().__init__(snapshot_every, seat_ttl)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS games (
+                gid TEXT PRIMARY KEY, size INTEGER NOT NULL, finished INTEGER NOT NULL DEFAULT 0,
+                snap BLOB NOT NULL DEFAULT x'', updated REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS moves (
+                gid TEXT NOT NULL, seq INTEGER NOT NULL, x INTEGER NOT NULL, y INTEGER NOT NULL,
+                p INTEGER NOT NULL, PRIMARY KEY (gid, seq)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS seats (
+                gid TEXT NOT NULL, role TEXT NOT NULL, owner TEXT NOT NULL, expires REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (gid, role)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS games_live ON games (finished, updated);
+        """)
+        # 임대 이전 DB: 열을 더한다 (기존 자리는 expires=0 → 이미 만료, 죽은 워커가 남긴 자리도 함께 풀린다)
+        if "expires" not in [r[1] for r in self._db.execute("PRAGMA table_info(seats)")]:
+            try:
+                self._db.execute("ALTER TABLE seats ADD COLUMN expires REAL NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:  # 같이 뜬 다른 워커가 먼저 더함
+                pass
+        self._pending = self._db.execute("SELECT COUNT(*) FROM moves").fetchone()[0]
+
+    @contextmanager
+    def _tx(self):
+        """쓰기 트랜잭션 (다른 프로세스의 쓰기와 겹치지 않게 처음부터 쓰기 락)"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def create(self, gid: str, size: int) -> None:
+        with self._tx() as db:
+            db.execute("INSERT OR REPLACE INTO games (gid, size, updated) VALUES (?, ?, ?)", (gid, size, time.time()))
+
+    def append(self, gid: str, move_no: int, x: int, y: int, player: int, finished: bool) -> bool:
+        with self._tx() as db:
+            row = db.execute("SELECT length(snap) / 3 + (SELECT COUNT(*) FROM moves WHERE gid = ?) FROM games "
+                             "WHERE gid = ?", (gid, gid)).fetchone()
+            if row is None or row[0] != move_no - 1:
+                return False
+            db.execute("INSERT INTO moves VALUES (?, ?, ?, ?, ?)", (gid, move_no, x, y, player))
+            db.execute("UPDATE games SET finished = ?, updated = ? WHERE gid = ?", (int(finished), time.time(), gid))
+            self._logged()
+        return True
+
+    def _read(self, rows) -> Dict[str, OmokGame]:
+        out = {}
+        for gid, size, snap in rows:
+            moves = unpack_moves(snap)
+            moves += [(x, y, p) for seq, x, y, p in self._db.execute(
+                "SELECT seq, x, y, p FROM moves WHERE gid = ? ORDER BY seq", (gid,)) if seq > len(moves)]
+            out[gid] = replay(size, moves)
+        return out
+
+    def load(self, gid: str) -> Optional[OmokGame]:
+        with self._lock:
+            return self._read(self._db.execute(
+                "SELECT gid, size, snap FROM games WHERE gid = ?", (gid,)).fetchall()).get(gid)
+
+    def move_count(self, gid: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute("SELECT length(snap) / 3 + (SELECT COUNT(*) FROM moves WHERE gid = ?) FROM games "
+                                   "WHERE gid = ?", (gid, gid)).fetchone()
+        return row[0] if row else None
+
+    def load_live(self, max_age_sec: float) -> Dict[str, OmokGame]:
+        with self._lock:
+            return self._read(self._db.execute(
+                "SELECT gid, size, snap FROM games WHERE finished = 0 AND updated >= ?",
+                (time.time() - max_age_sec,)).fetchall())
+
+    def delete(self, gid: str) -> None:
+        with self._tx() as db:
+            for table in ("moves", "seats", "games"):
+                db.execute(f"DELETE FROM {table} WHERE gid = ?", (gid,))
+
+    def claim_seat(self, gid: str, role: str, owner: str) -> bool:
+        now = time.time()
+        with self._tx() as db:
+            db.execute("DELETE FROM seats WHERE gid = ? AND role = ? AND expires < ?", (gid, role, now))
+            return db.execute("INSERT OR IGNORE INTO seats VALUES (?, ?, ?, ?)",
+                              (gid, role, owner, now + self.seat_ttl)).rowcount == 1
+
+    def release_seat(self, gid: str, role: str, owner: str) -> None:
+        with self._tx() as db:
+            db.execute("DELETE FROM seats WHERE gid = ? AND role = ? AND owner = ?", (gid, role, owner))
+
+    def release_owner(self, owner_prefix: str) -> None:
+        with self._tx() as db:
+            db.execute("DELETE FROM seats WHERE substr(owner, 1, ?) = ?", (len(owner_prefix), owner_prefix))
+
+    def seats(self, gid: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._db.execute("SELECT role, owner FROM seats WHERE gid = ? AND expires >= ?",
+                                         (gid, time.time())).fetchall())
+
+    def refresh_seats(self, owner_prefix: str) -> None:
+        with self._tx() as db:
+            db.execute("UPDATE seats SET expires = ? WHERE substr(owner, 1, ?) = ?",
+                       (time.time() + self.seat_ttl, len(owner_prefix), owner_prefix))
+
+    def snapshot(self) -> None:
+        """
+        moves 의 레코드를 게임별 snap 블롭 뒤에 붙이고 접은 레코드를 지운다
+        SNAPSHOT_CHUNK 개씩 트랜잭션을 나눠 커밋 — 쓰기 락을 한 번에 오래 쥐지 않아 그 사이 append 가 끼어든다
+        (게임의 앞쪽 수부터 접으므로 중간에 끊겨도 snap + moves 는 항상 온전한 수 목록)
+        """
+        t0 = time.perf_counter()
+        with self._snap_lock:
+            with self._lock:
+                todo = self._db.execute("SELECT COUNT(*) FROM moves").fetchone()[0]
+            while todo > 0:
+                with self._tx() as db:
+                    rows = db.execute("SELECT gid, seq, x, y, p FROM moves ORDER BY gid, seq LIMIT ?",
+                                      (min(todo, self.SNAPSHOT_CHUNK),)).fetchall()
+                    if not rows:
+                        break
+                    by_game: Dict[str, List[Tuple[int, Move]]] = {}
+                    for gid, seq, x, y, p in rows:
+                        by_game.setdefault(gid, []).append((seq, (x, y, p)))
+                    # (sqlite 의 || 는 결과가 TEXT 라 블롭 이어 붙이기는 여기서)
+                    for gid, ms in by_game.items():
+                        row = db.execute("SELECT snap FROM games WHERE gid = ?", (gid,)).fetchone()
+                        if row is not None:
+                            db.execute("UPDATE games SET snap = ? WHERE gid = ?",
+                                       (bytes(row[0]) + pack_moves(m for _, m in ms), gid))
+                        db.execute("DELETE FROM moves WHERE gid = ? AND seq <= ?", (gid, ms[-1][0]))
+                    self._pending = max(0, self._pending - len(rows))
+                todo -= len(rows)
+            self.snapshots += 1
+        self.last_snapshot_ms = (time.perf_counter() - t0) * 1000.0
+
+    def close(self) -> None:
+        self.snapshot()
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        return dict(super().stats(), path=self.path)
+
+
+class FileGameStore(_Compacting):
+    """
+    디렉터리 하나에 snapshot(게임당 한 줄) + log(레코드당 한 줄)
+      log:      N <gid> <size> <ts> | M <gid> <seq> <x> <y> <p> <finished> <ts> | D <gid>
+      snapshot: <gid> <size> <finished> <updated> <base64 수 목록>
+    게임별 압축 수 목록(수당 3바이트)을 메모리에 색인으로 들고 있어 load 는 디스크를 읽지 않는다
+    스냅샷: 로그를 log.old 로 돌리고(락 안) → 색인 사본을 snapshot 에 원자적으로 쓰고 → log.old 삭제
+    """
+
+    backend = "file"
+
+    def __init__(self, path: str, snapshot_every: int = 2000, fsync: bool = False, seat_ttl: float = 30.0):
+        super().__init__(snapshot_every, seat_ttl)
+        self.path = path
+        self.fsync = fsync
+        os.makedirs(path, exist_ok=True)
+        self._snap_path = os.path.join(path, "snapshot")
+        self._log_path = os.path.join(path, "log")
+        # gid -> [size, finished, updated, packed moves]
+        self._index: Dict[str, list] = {}
+        self._recover()
+        self._log = open(self._log_path, "a", encoding="ascii")
+
+    # ---------- 복구 ----------
+
+    def _recover(self) -> None:
+        if os.path.exists(self._snap_path):
+            with open(self._snap_path, encoding="ascii") as f:
+                for line in f:
+                    gid, size, fin, upd, moves = line.split(" ")
+                    self._index[gid] = [int(size), fin == "1", float(upd), base64.b64decode(moves)]
+        # 스냅샷 도중 죽었으면 log.old 가 남아 있다 — seq 로 중복 적용을 막으므로 다시 재생해도 안전
+        for p in (self._log_path + ".old", self._log_path):
+            if os.path.exists(p):
+                with open(p, encoding="ascii") as f:
+                    for line in f:
+                        self._apply(line.split())
+                        self._pending += 1
+
+    def _apply(self, rec: List[str]) -> None:
+        if not rec:
+            return
+        kind, gid = rec[0], rec[1]
+        if kind == "N":
+            self._index[gid] = [int(rec[2]), False, float(rec[3]), b""]
+        elif kind == "M":
+            e = self._index.get(gid)
+            seq, x, y, p = map(int, rec[2:6])
+            if e is not None and seq == len(e[3]) // 3 + 1:
+                e[1], e[2], e[3] = rec[6] == "1", float(rec[7]), e[3] + bytes((x, y, p))
+        elif kind == "D":
+            self._index.pop(gid, None)
+
+    # ---------- 기록 ----------
+
+    def _write(self, line: str) -> None:
+        rec = line.split()
+        self._log.write(line + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._apply(rec)
+        self._logged()
+
+    def create(self, gid: str, size: int) -> None:
+        with self._lock:
+            self._write(f"N {gid} {size} {time.time():.3f}")
+
+    def append(self, gid: str, move_no: int, x: int, y: int, player: int, finished: bool) -> bool:
+        with self._lock:
+            e = self._index.get(gid)
+            if e is None or len(e[3]) // 3 != move_no - 1:
+                return False
+            self._write(f"M {gid} {move_no} {x} {y} {player} {int(finished)} {time.time():.3f}")
+        return True
+
+    def delete(self, gid: str) -> None:
+        super().delete(gid)
+        with self._lock:
+            if gid in self._index:
+                self._write(f"D {gid}")
+
+    # ---------- 읽기 ----------
+
+    def load(self, gid: str) -> Optional[OmokGame]:
+        with self._lock:
+            e = self._index.get(gid)
+        return replay(e[0], unpack_moves(e[3])) if e else None
+
+    def move_count(self, gid: str) -> Optional[int]:
+        with self._lock:
+            e = self._index.get(gid)
+        return len(e[3]) // 3 if e else None
+
+    def load_live(self, max_age_sec: float) -> Dict[str, OmokGame]:
+        since = time.time() - max_age_sec
+        with self._lock:
+            live = [(gid, e[0], e[3]) for gid, e in self._index.items() if not e[1] and e[2] >= since]
+        return {gid: replay(size, unpack_moves(moves)) for gid, size, moves in live}
+
+    # ---------- 스냅샷 ----------
+
+    def snapshot(self) -> None:
+        with self._snap_lock:
+            self._snapshot_locked()
+
+    def _snapshot_locked(self) -> None:
+        t0 = time.perf_counter()
+        old = self._log_path + ".old"
+        with self._lock:
+            self._log.close()
+            if os.path.exists(old):  # 지난번 스냅샷이 중간에 실패 → 그 로그 뒤에 이어 붙여 보존
+                with open(old, "a", encoding="ascii") as dst, open(self._log_path, encoding="ascii") as src:
+                    dst.write(src.read())
+                os.remove(self._log_path)
+            else:
+                os.replace(self._log_path, old)
+            self._log = open(self._log_path, "a", encoding="ascii")
+            rows = [(gid, e[0], e[1], e[2], e[3]) for gid, e in self._index.items()]
+            self._pending = 0
+        tmp = self._snap_path + ".tmp"
+        with open(tmp, "w", encoding="ascii") as f:
+            for gid, size, fin, upd, moves in rows:
+                f.write(f"{gid} {size} {int(fin)} {upd:.3f} {base64.b64encode(moves).decode('ascii')}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._snap_path)
+        os.remove(old)
+        self.snapshots += 1
+        self.last_snapshot_ms = (time.perf_counter() - t0) * 1000.0
+
+    def close(self) -> None:
+        self.snapshot()
+        with self._lock:
+            self._log.close()
+
+    def stats(self) -> dict:
+        return dict(super().stats(), path=self.path, games=len(self._index))
+
+
+class RedisGameStore(GameStore):
+    """
+    Redis(또는 호환 서버) — 여러 호스트의 워커가 함께 쓰는 저장소. 스냅샷/영속화는 Redis 쪽(AOF/RDB)에 맡긴다
+      omok:g:<gid>  해시 {size, finished, updated}
+      omok:m:<gid>  문자열 — 수당 3바이트를 APPEND (이 자체가 압축 스냅샷)
+      omok:s:<gid>:<role>  owner — seat_ttl 만료 키(임대), 잡은 워커가 refresh_seats 로 연장
+      omok:live  진행 중 게임 (점수 = 마지막 착수 시각)
+    """
+
+    backend = "redis"
+
+    # 저장된 수가 move_no - 1 개일 때만 붙인다 (워커 간 같은 번호 중복 방지)
+    _APPEND = """
+        if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+        if redis.call('STRLEN', KEYS[2]) ~= (tonumber(ARGV[1]) - 1) * 3 then return 0 end
+        redis.call('APPEND', KEYS[2], ARGV[2])
+        redis.call('HSET', KEYS[1], 'finished', ARGV[3], 'updated', ARGV[4])
+        if ARGV[3] == '1' then redis.call('ZREM', KEYS[3], ARGV[5]) else redis.call('ZADD', KEYS[3], ARGV[4], ARGV[5]) end
+        return 1
+    """
+
+    # 자리 주인이 맞을 때만 임대 연장(ARGV[2] = ms) / 반납
+    _REFRESH = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('PEXPIRE', KEYS[1], ARGV[2]) end
+        return 0
+    """
+    _RELEASE = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+        return 0
+    """
+    ROLES = ("black", "white")
+
+    def __init__(self, url: str, seat_ttl: float = 30.0):
+        super().__init__(seat_ttl)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("OMOK_STORE=redis 에는 redis 패키지가 필요합니다 (pip install redis)") from e
+        self.url = url
+        self._r = redis.Redis.from_url(url)
+        self._append = self._r.register_script(self._APPEND)
+        self._refresh = self._r.register_script(self._REFRESH)
+        self._release = self._r.register_script(self._RELEASE)
+        self._mine: set = set()  # 이 프로세스가 잡은 자리 (gid, role, owner)
+        self.appends = 0
+        self.conflicts = 0
+
+    def create(self, gid: str, size: int) -> None:
+        now = time.time()
+        p = self._r.pipeline()
+        p.hset(f"omok:g:{gid}", mapping={"size": size, "finished": 0, "updated": now})
+        p.delete(f"omok:m:{gid}")
+        p.zadd("omok:live", {gid: now})
+        p.execute()
+
+    def append(self, gid: str, move_no: int, x: int, y: int, player: int, finished: bool) -> bool:
+        ok = self._append(keys=[f"omok:g:{gid}", f"omok:m:{gid}", "omok:live"],
+                          args=[move_no, bytes((x, y, player)), int(finished), time.time(), gid])
+        if ok:
+            self.appends += 1
+        else:
+            self.conflicts += 1
+        return bool(ok)
+
+    def load(self, gid: str) -> Optional[OmokGame]:
+        size, moves = self._r.hget(f"omok:g:{gid}", "size"), self._r.get(f"omok:m:{gid}")
+        return replay(int(size), unpack_moves(moves or b"")) if size is not None else None
+
+    def move_count(self, gid: str) -> Optional[int]:
+        if not self._r.exists(f"omok:g:{gid}"):
+            return None
+        return self._r.strlen(f"omok:m:{gid}") // 3
+
+    def load_live(self, max_age_sec: float) -> Dict[str, OmokGame]:
+        out = {}
+        for gid in self._r.zrangebyscore("omok:live", time.time() - max_age_sec, "+inf"):
+            gid = gid.decode()
+            g = self.load(gid)
+            if g is not None:
+                out[gid] = g
+        return out
+
+    def delete(self, gid: str) -> None:
+        self._r.delete(f"omok:g:{gid}", f"omok:m:{gid}", *(f"omok:s:{gid}:{r}" for r in self.ROLES))
+        self._r.zrem("omok:live", gid)
+
+    def claim_seat(self, gid: str, role: str, owner: str) -> bool:
+        if self._r.set(f"omok:s:{gid}:{role}", owner, nx=True, px=int(self.seat_ttl * 1000)):
+            self._mine.add((gid, role, owner))
+            return True
+        return False
+
+    def release_seat(self, gid: str, role: str, owner: str) -> None:
+        self._release(keys=[f"omok:s:{gid}:{role}"], args=[owner])
+        self._mine.discard((gid, role, owner))
+
+    def release_owner(self, owner_prefix: str) -> None:
+        for gid, role, owner in [m for m in self._mine if m[2].startswith(owner_prefix)]:
+            self.release_seat(gid, role, owner)
+
+    def seats(self, gid: str) -> Dict[str, str]:
+        owners = self._r.mget([f"omok:s:{gid}:{r}" for r in self.ROLES])
+        return {r: o.decode() for r, o in zip(self.ROLES, owners) if o is not None}
+
+    def refresh_seats(self, owner_prefix: str) -> None:
+        ms = int(self.seat_ttl * 1000)
+        for gid, role, owner in [m for m in self._mine if m[2].startswith(owner_prefix)]:
+            if not self._refresh(keys=[f"omok:s:{gid}:{role}"], args=[owner, ms]):
+                self._mine.discard((gid, role, owner))  # 이미 만료돼 다른 워커가 잡았거나 지워진 게임
+
+    def close(self) -> None:
+        self._r.close()
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "url": self.url, "appends": self.appends, "conflicts": self.conflicts}
+
+
+def open_store(kind: str, path: str, snapshot_every: int = 2000, fsync: bool = False,
+               seat_ttl: float = 30.0) -> GameStore:
+    if kind == "sqlite":
+        return SqliteGameStore(path, snapshot_every, fsync, seat_ttl)
+    if kind == "file":
+        return FileGameStore(path, snapshot_every, fsync, seat_ttl)
+    if kind == "redis":
+        return RedisGameStore(path, seat_ttl)
+    if kind == "memory":
+        return GameStore(seat_ttl)
+    raise ValueError(f"OMOK_STORE 는 sqlite | file | redis | memory 중 하나여야 합니다: {kind!r}")
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# backend/llm_cache.py
+"""
+llm_server 응답 캐시
+- 키: 대칭 정규화 보드 키(symmetry.canonical), 값: 정규화 좌표의 (x, y, [(x, y, llm_score)...])
+- 같은 키를 동시에 요청하면 첫 요청만 위로(OpenAI) 보내고 나머지는 그 결과를 함께 기다림(in-flight 병합)
+- 한 클라이언트가 같은 국면을 여러 샘플로 물을 때(OMOK_LLM_N_SAMPLES)는 sample_key 로 샘플 번호마다 키를 갈라
+  샘플끼리 병합/캐시를 공유하지 않는다 (0 번은 원래 키 → 단일 샘플 요청끼리는 그대로 공유)
+- 용량 초과 시 LRU 제거, 디스크(JSON)에 저장해 재시작 후에도 재사용 — 모델/보드 크기가 다르면 버림
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+CacheValue = Tuple[int, int, List[Tuple[int, int, float]]]
+
+_FORMAT_VERSION = 1
+_KEY_MASK = (1 << 64) - 1
+
+
+def sample_key(key: int, sample: int) -> int:
+    """보드 키 + 샘플 번호 → 캐시 키 (0 이면 그대로, 아니면 64비트 안에서 섞는다 — 재시작해도 같은 값)"""
+    if sample <= 0:
+        return key
+    return key ^ ((sample * 0x9E3779B97F4A7C15) & _KEY_MASK)
+
+
+class LLMResponseCache:
+    def __init__(self, max_entries: int, path: str = "", model: str = "", board_size: int = 15,
+                 save_every: int = 50):
+        self.max_entries = max(0, int(max_entries))
+        self.path = path
+        self.model = model
+        self.board_size = board_size
+        self.save_every = max(1, int(save_every))
+        self._data: "OrderedDict[int, CacheValue]" = OrderedDict()
+        self._inflight: Dict[int, Future] = {}
+        self._lock = Lock()
+        self._save_lock = Lock()  # 저장은 한 번에 하나씩 (같은 임시 파일을 씀)
+        self._dirty = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: int) -> Optional[CacheValue]:
+        with self._lock:
+            v = self._data.get(key)
+            if v is not None:
+                self._data.move_to_end(key)
+            return v
+
+    def _store(self, key: int, value: CacheValue) -> bool:
+        """저장하고, 디스크에 쓸 때가 됐으면 True"""
+        if self.max_entries <= 0:
+            return False
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            self._dirty += 1
+            return self._dirty >= self.save_every
+
+    def put(self, key: int, value: CacheValue) -> None:
+        if self._store(key, value):
+            self.save()
+
+    def _join(self, key: int) -> Tuple[Optional[CacheValue], Optional[Future], bool]:
+        """(캐시 값, 기다릴/채울 Future, 내가 계산할 차례인지)"""
+        with self._lock:
+            v = self._data.get(key)
+            if v is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return v, None, False
+            fut = self._inflight.get(key)
+            if fut is None:
+                fut = self._inflight[key] = Future()
+                self.misses += 1
+                return None, fut, True
+            self.coalesced += 1
+            return None, fut, False
+
+    def _finish(self, key: int, fut: Future, value: Optional[CacheValue], exc: Optional[BaseException]) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        if exc is not None:
+            fut.set_exception(exc)  # 기다리던 요청도 같은 오류로 끝남 (실패는 캐시하지 않음)
+        else:
+            fut.set_result(value)
+
+    def get_or_compute(self, key: int, compute: Callable[[], CacheValue]) -> CacheValue:
+        """캐시에 있으면 그 값, 같은 키를 계산 중이면 그 결과를 기다리고, 아니면 compute() 후 저장"""
+        v, fut, leader = self._join(key)
+        if v is not None:
+            return v
+        if not leader:
+            return fut.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            self._finish(key, fut, None, e)
+            raise
+        flush = self._store(key, value)
+        self._finish(key, fut, value, None)
+        if flush:
+            self.save()
+        return value
+
+    async def aget_or_compute(self, key: int, compute: Callable[[], Awaitable[CacheValue]]) -> CacheValue:
+        """get_or_compute 의 비동기 판 (같은 in-flight 표를 쓰므로 동기 호출과도 병합됨). 디스크 저장은 스레드로"""
+        v, fut, leader = self._join(key)
+        if v is not None:
+            return v
+        if not leader:
+            return await asyncio.wrap_future(fut)
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._finish(key, fut, None, e)
+            raise
+        flush = self._store(key, value)
+        self._finish(key, fut, value, None)
+        if flush:
+            await asyncio.to_thread(self.save)
+        return value
+
+    # ---------------- 디스크 저장/복원 ----------------
+
+    def load(self) -> int:
+        """저장 파일을 읽어 채운 항목 수 (없거나 모델/크기가 다르면 0)"""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[LLM-CACHE] 로드 실패: {e!r}")
+            return 0
+        if (doc.get("version") != _FORMAT_VERSION or doc.get("model") != self.model
+                or doc.get("board_size") != self.board_size):
+            return 0
+        entries = doc.get("entries", [])[-self.max_entries:] if self.max_entries else []
+        with self._lock:
+            for key, x, y, cands in entries:  # 저장 순서 = 오래된 것부터 (LRU 순서 유지)
+                self._data[int(key)] = (x, y, [tuple(c) for c in cands])
+        return len(self._data)
+
+    def save(self) -> None:
+        """원자적 저장 (임시 파일 → os.replace). 저장 경로가 없으면 아무것도 안 함"""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                entries = [[key, x, y, [list(c) for c in cands]] for key, (x, y, cands) in self._data.items()]
+                self._dirty = 0
+            doc = {"version": _FORMAT_VERSION, "model": self.model, "board_size": self.board_size,
+                   "entries": entries}
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(doc, f, separators=(",", ":"))
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"[LLM-CACHE] 저장 실패: {e!r}")
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
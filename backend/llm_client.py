@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# backend/llm_client.py
+"""
+LLM 서버 비동기 클라이언트
+- 이벤트 루프당 하나의 httpx.AsyncClient (keep-alive 연결 풀)
+- post_json_fanout(): 요청 N개(샘플)를 동시에 보내고 '공동 마감' 안에 도착한 응답만 모음
+"""
+from __future__ import annotations
+import asyncio
+import os
+from typing import List, Optional, Tuple
+
+import httpx
+
+POOL_SIZE = int(os.getenv("OMOK_LLM_POOL_SIZE", "32"))
+KEEPALIVE_SEC = float(os.getenv("OMOK_LLM_KEEPALIVE_SEC", "30"))
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프에 묶인 공유 클라이언트 (루프가 바뀌면 새로 만듦)"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=POOL_SIZE,
+                                max_keepalive_connections=POOL_SIZE,
+                                keepalive_expiry=KEEPALIVE_SEC),
+            timeout=None,  # 마감은 post_json_fanout 이 한꺼번에 관리
+        )
+        _client_loop = loop
+    return _client
+
+
+async def aclose() -> None:
+    """앱 종료 시 연결 풀 정리"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def post_json_fanout(url: str, payloads: List[dict], timeout: float) -> Tuple[List[dict], List[str]]:
+    """
+    payloads 를 동시에 POST, timeout초 공동 마감.
+    반환: (200 응답 JSON 목록, 실패/시간초과 사유 목록). 마감 때 남은 요청은 취소한다.
+    """
+    client = get_client()
+    tasks = [asyncio.ensure_future(client.post(url, json=p)) for p in payloads]
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for t in pending:
+        t.cancel()
+
+    results: List[dict] = []
+    errors: List[str] = []
+    for t in done:
+        exc = t.exception()
+        if exc is not None:
+            errors.append(f"연결 실패: {exc!r}")
+            continue
+        resp = t.result()
+        if resp.status_code != 200:
+            errors.append(f"{resp.status_code} {resp.text[:200]}")
+            continue
+        try:
+            results.append(resp.json())
+        except ValueError as e:
+            errors.append(f"JSON 파싱 실패: {e!r}")
+    if pending:
+        errors.append(f"시간 초과 {len(pending)}/{len(tasks)} ({timeout}s)")
+    return results, errors
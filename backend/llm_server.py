@@ -1,17 +1,23 @@
 # -*- coding: utf-8 -*-
 # backend/llm_server.py
 from __future__ import annotations
-import os, json, re
-from typing import List, Tuple, Optional, Any
+import os, json, re, time, asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, List, Tuple, Optional
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, field_validator
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from llm_cache import CacheValue, LLMResponseCache, sample_key
+from local_llm import LocalEngine
+from symmetry import canonical, from_canonical, stones_of, to_canonical
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or os.getenv("OMOK_LLM_KEY")
 OPENAI_MODEL   = os.getenv("OMOK_LLM_MODEL", "gpt-4.1")
+BACKEND        = os.getenv("OMOK_LLM_BACKEND", "openai").strip().lower()  # openai | local(오프라인 대역)
 DEBUG          = os.getenv("OMOK_LLM_DEBUG", "0") == "1"
 PROMPT_LOG_MODE = os.getenv("OMOK_LLM_DEBUG_PROMPT", "lite").lower()
 
@@ -21,23 +27,66 @@ CAND_MIN_DIST    = int(os.getenv("OMOK_CAND_MIN_DIST", "2"))     # 체비쇼프
 HISTORY_MAX      = int(os.getenv("OMOK_HISTORY_MAX", "16"))      # 최근 16수만 모델에 전달
 MAX_TOKENS       = int(os.getenv("OMOK_LLM_MAX_TOKENS", "700"))
 RETRY_MAX_TOKENS = int(os.getenv("OMOK_LLM_RETRY_MAX_TOKENS", "1200"))
+# 응답 캐시: 항목 수 상한(0이면 끔), 저장 파일(빈 값이면 메모리만), 새 항목 몇 개마다 저장할지
+CACHE_SIZE       = int(os.getenv("OMOK_LLM_CACHE_SIZE", "50000"))
+CACHE_PATH       = os.getenv("OMOK_LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.json"))
+CACHE_SAVE_EVERY = int(os.getenv("OMOK_LLM_CACHE_SAVE_EVERY", "50"))
+# 업스트림: 동시 호출 상한, 헤지(느린 호출에 큰 max_tokens 재시도를 병렬로 띄움) 기준 백분위(0이면 끔)
+MAX_CONCURRENCY   = int(os.getenv("OMOK_LLM_MAX_CONCURRENCY", "16"))
+HEDGE_PCT         = float(os.getenv("OMOK_LLM_HEDGE_PCT", "95"))
+HEDGE_AFTER_SEC   = float(os.getenv("OMOK_LLM_HEDGE_AFTER_SEC", "6"))   # 지연 표본이 모이기 전 기준
+HEDGE_MIN_SAMPLES = 20
+# local 백엔드: 후보 엔진(heuristic|search), 지연 평균/퍼짐(ms)과 분포(fixed|uniform|normal|lognormal|exp), 난수 시드
+LOCAL_ENGINE        = os.getenv("OMOK_LOCAL_ENGINE", "heuristic").strip().lower()
+LOCAL_LATENCY_MS    = float(os.getenv("OMOK_LOCAL_LATENCY_MS", "800"))
+LOCAL_JITTER_MS     = float(os.getenv("OMOK_LOCAL_JITTER_MS", "200"))
+LOCAL_LATENCY_DIST  = os.getenv("OMOK_LOCAL_LATENCY_DIST", "normal").strip().lower()
+LOCAL_SEED          = int(os.getenv("OMOK_LOCAL_SEED", "0"))
+LOCAL_SEARCH_BUDGET = float(os.getenv("OMOK_LOCAL_SEARCH_BUDGET_SEC", "0.3"))
 
 if BOARD_SIZE < 5 or BOARD_SIZE > 25:
     raise RuntimeError("OMOK_BOARD_SIZE는 5~25 사이의 정수여야 합니다.")
-if not OPENAI_API_KEY:
-    raise RuntimeError("OPENAI_API_KEY 또는 OMOK_LLM_KEY가 필요합니다.")
-client = OpenAI(api_key=OPENAI_API_KEY)
-
-print("✅ Using model:", OPENAI_MODEL)
+if BACKEND not in ("openai", "local"):
+    raise RuntimeError(f"OMOK_LLM_BACKEND는 openai 또는 local 이어야 합니다: {BACKEND!r}")
+
+client: Optional[AsyncOpenAI] = None
+LOCAL: Optional[LocalEngine] = None
+if BACKEND == "local":
+    LOCAL = LocalEngine(LOCAL_ENGINE, n_cands=N_CANDS, latency_ms=LOCAL_LATENCY_MS,
+                        jitter_ms=LOCAL_JITTER_MS, dist=LOCAL_LATENCY_DIST, seed=LOCAL_SEED,
+                        search_budget=LOCAL_SEARCH_BUDGET)
+    MODEL_NAME = LOCAL.model
+else:
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY 또는 OMOK_LLM_KEY가 필요합니다. (오프라인이면 OMOK_LLM_BACKEND=local)")
+    client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    MODEL_NAME = OPENAI_MODEL
+
+print("✅ Using model:", MODEL_NAME)
+if LOCAL is not None:
+    print(f"✅ Local latency: {LOCAL_LATENCY_DIST} {LOCAL_LATENCY_MS}±{LOCAL_JITTER_MS}ms (seed={LOCAL_SEED})")
 print("✅ Debug mode:", DEBUG)
 print(f"✅ BOARD_SIZE: {BOARD_SIZE}×{BOARD_SIZE}")
 
+# 보드(대칭 정규화) → 파싱된 후보. 진행 로그는 키에 넣지 않는다 (같은 국면이면 같은 답)
+RESPONSE_CACHE = LLMResponseCache(CACHE_SIZE, CACHE_PATH, model=MODEL_NAME,
+                                  board_size=BOARD_SIZE, save_every=CACHE_SAVE_EVERY)
+
 app = FastAPI(title="Omok LLM Server", version="1.5.1")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_credentials=False, allow_methods=["*"], allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def _load_cache():
+    n = RESPONSE_CACHE.load()
+    print(f"✅ LLM cache: {n} entries" + (f" ({CACHE_PATH})" if CACHE_PATH else ""))
+
+@app.on_event("shutdown")
+def _save_cache():
+    RESPONSE_CACHE.save()
+
 # ── 모델 I/O 스키마 ────────────────────────────────────────────────────
 class Candidate(BaseModel):
     x: int
@@ -55,6 +104,7 @@ class OmokMoveReq(BaseModel):
     difficulty: str = Field(..., description="초급/고급")
     player: int = Field(2, description="AI stone: 2(white)")
     history: Optional[List[HistoryMove]] = None
+    sample: int = Field(0, ge=0, description="같은 국면의 몇 번째 샘플 (0이 아니면 캐시/병합 키가 달라 따로 묻는다)")
 
     @field_validator("board")
     @classmethod
@@ -203,8 +253,77 @@ def _print_virtual_board(board: List[List[int]], move: Tuple[int,int], player:in
         print(f"{r:2d}  " + " ".join(f"{mp[v]:2s}" for v in row))
     print(f"last move -> (x={x}, y={y}), player={player}\n")
 
-def _call_openai_json(prompt: str, max_tokens: int):
-    return client.chat.completions.create(
+class _Upstream:
+    """업스트림(OpenAI/local) 호출 동시성 제한 + 지연/대기열 지표"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.latencies: deque = deque(maxlen=200)  # 성공한 호출의 최근 지연(초)
+        self.waiting = 0   # 세마포어 대기 중 (= 대기열 깊이)
+        self.active = 0    # OpenAI 호출 중
+        self.calls = 0
+        self.errors = 0
+        self.hedged = 0        # 헤지 호출을 띄운 횟수
+        self.hedge_wins = 0    # 헤지 결과가 먼저 쓰인 횟수
+        self.parse_retries = 0 # 파싱 실패 후 재시도
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        xs = sorted(self.latencies)
+        return xs[min(len(xs) - 1, int(len(xs) * pct / 100.0))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """주 호출이 이 시간(초) 안에 안 끝나면 헤지를 띄움. None 이면 헤지 안 함"""
+        if HEDGE_PCT <= 0:
+            return None
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_AFTER_SEC
+        return self.percentile(HEDGE_PCT)
+
+    async def call(self, make_call: Callable[[], Awaitable[Any]]):
+        """make_call() 이 만드는 업스트림 호출(OpenAI 또는 local)을 동시성 상한 안에서 실행"""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.limit)
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.calls += 1
+        t0 = time.perf_counter()
+        try:
+            resp = await make_call()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.active -= 1
+            self._sem.release()
+        self.latencies.append(time.perf_counter() - t0)
+        return resp
+
+    def stats(self) -> dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "queue_depth": self.waiting,
+            "active": self.active,
+            "max_concurrency": self.limit,
+            "calls": self.calls,
+            "errors": self.errors,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "parse_retries": self.parse_retries,
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+UPSTREAM = _Upstream(MAX_CONCURRENCY)
+
+async def _call_openai_json(prompt: str, max_tokens: int):
+    return await client.chat.completions.create(
         model=OPENAI_MODEL,
         messages=[
             {"role": "system",
@@ -219,28 +338,64 @@ def _call_openai_json(prompt: str, max_tokens: int):
         },
     )
 
-# ── 라우트 ─────────────────────────────────────────────────────────────
-@app.get("/__ping__")
-def ping():
-    return {"ok": True, "model": OPENAI_MODEL, "board_size": BOARD_SIZE, "server": "llm_server"}
+async def _fetch_json(prompt: str, max_tokens: int, tag: str) -> dict:
+    resp = await UPSTREAM.call(lambda: _call_openai_json(prompt, max_tokens))
+    text = (resp.choices[0].message.content or "").strip()
+    if DEBUG:
+        print(f"=== LLM RESPONSE ({tag}) ==="); print(text[:1400]); print("====================")
+    return _safe_json_loads(text)
 
-@app.post("/omok/move", response_model=OmokMoveRes)
-def omok_move(req: OmokMoveReq) -> OmokMoveRes:
-    size = len(req.board)
+async def _complete_json(prompt: str) -> dict:
+    """
+    주 호출(MAX_TOKENS) → JSON. 주 호출이 최근 지연 HEDGE_PCT 백분위를 넘기면 큰 max_tokens 재시도를
+    병렬로 띄우고(헤지) 먼저 파싱에 성공한 쪽을 쓴다. 헤지 전에 파싱이 실패하면 그때 재시도를 띄움
+    """
+    primary = asyncio.ensure_future(_fetch_json(prompt, MAX_TOKENS, "primary"))
+    hedge: Optional[asyncio.Future] = None
 
-    # 보드↔로그 일치 검증
-    if DEBUG:
-        recon = _board_from_history(size, req.history)
-        diffs = _diff_coords(recon, req.board)
-        if diffs:
-            print("[WARN] history ↔ board mismatch (count=%d)" % len(diffs))
-            for x,y,a,b in diffs[:10]:
-                print(f"  - at (x={x}, y={y}): from_history={a}, in_board={b}")
-        else:
-            print("[OK] history and board are consistent.")
+    def _start_hedge():
+        return asyncio.ensure_future(_fetch_json(prompt, RETRY_MAX_TOKENS, "retry"))
 
-    used = {(mv.x, mv.y) for mv in (req.history or [])}
+    try:
+        delay = UPSTREAM.hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done:
+                if DEBUG: print(f"[HEDGE] primary slower than {delay:.2f}s; starting retry in parallel")
+                UPSTREAM.hedged += 1
+                hedge = _start_hedge()
+
+        pending = {t for t in (primary, hedge) if t is not None}
+        last_exc: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                exc = t.exception()
+                if exc is None:
+                    if t is hedge:
+                        UPSTREAM.hedge_wins += 1
+                    return t.result()
+                last_exc = exc
+                if t is primary and hedge is None and isinstance(exc, json.JSONDecodeError):
+                    if DEBUG: print("[RETRY] parsing failed; retrying with larger max_tokens =", RETRY_MAX_TOKENS)
+                    UPSTREAM.parse_retries += 1
+                    hedge = _start_hedge()
+                    pending.add(hedge)
+        if isinstance(last_exc, json.JSONDecodeError):
+            raise HTTPException(status_code=502, detail=f"LLM 응답 파싱 실패: {last_exc!r}")
+        raise HTTPException(status_code=502, detail=f"OpenAI 호출 실패: {last_exc!r}")
+    finally:
+        for t in (primary, hedge):
+            if t is not None and not t.done():
+                t.cancel()
 
+# ── 라우트 ─────────────────────────────────────────────────────────────
+@app.get("/__ping__")
+def ping():
+    return {"ok": True, "model": MODEL_NAME, "board_size": BOARD_SIZE, "server": "llm_server",
+            "cache": RESPONSE_CACHE.stats(), "upstream": UPSTREAM.stats()}
+
+def _build_prompt(req: OmokMoveReq, size: int) -> str:
     # 진행 로그: 최근 HISTORY_MAX 수만 사용
     hist_cut   = (req.history or [])[-HISTORY_MAX:]
     history_txt = _format_history(hist_cut)
@@ -280,26 +435,18 @@ Make the candidate list spatially diverse: avoid near-duplicates (at most one mo
             print("=== LLM PROMPT ==="); print(prompt); print("==================")
         else:
             print("=== LLM PROMPT (lite) ===")
-            print(f"model={OPENAI_MODEL}, size={size}x{size}")
+            print(f"model={MODEL_NAME}, size={size}x{size}")
             print("Move log:"); print(history_txt or "(none)")
             print("[board omitted]"); print("=========================")
+    return prompt
 
-    # 호출 + 파싱 (재시도 포함)
-    try:
-        resp = _call_openai_json(prompt, MAX_TOKENS)
-        text = (resp.choices[0].message.content or "").strip()
-        if DEBUG:
-            print("=== LLM RESPONSE ==="); print(text[:1000]); print("====================")
-        data = _safe_json_loads(text)
-    except json.JSONDecodeError:
-        if DEBUG: print("[RETRY] parsing failed; retrying with larger max_tokens =", RETRY_MAX_TOKENS)
-        resp = _call_openai_json(prompt, RETRY_MAX_TOKENS)
-        text = (resp.choices[0].message.content or "").strip()
-        if DEBUG:
-            print("=== LLM RESPONSE (retry) ==="); print(text[:1400]); print("====================")
-        data = _safe_json_loads(text)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"OpenAI 호출 실패: {e!r}")
+async def _ask_model(req: OmokMoveReq, size: int) -> CacheValue:
+    """프롬프트 → OpenAI(또는 local) → 파싱. (x, y, [(x, y, llm_score)]) — 후보는 보드 안·빈칸만, 공간 다양화 후 N개"""
+    if LOCAL is not None:
+        data = await UPSTREAM.call(lambda: LOCAL.complete(req.board))
+    else:
+        # 호출 + 파싱 (느리면 헤지, 파싱 실패면 큰 max_tokens 로 재시도)
+        data = await _complete_json(_build_prompt(req, size))
 
     # 파싱
     x, y = _parse_xy(data)
@@ -323,6 +470,43 @@ Make the candidate list spatially diverse: avoid near-duplicates (at most one mo
         # 공간 다양화 + 최종 N개로 컷
         if cand_models:
             cand_models = _diversify_candidates(cand_models, N_CANDS, CAND_MIN_DIST)
+    return x, y, [(c.x, c.y, c.llm_score) for c in (cand_models or [])]
+
+def _to_canonical_value(v: CacheValue, size: int, k: int) -> CacheValue:
+    x, y, cands = v
+    x, y = to_canonical(x, y, size, k) if (0 <= x < size and 0 <= y < size) else (-1, -1)
+    return x, y, [(*to_canonical(cx, cy, size, k), s) for cx, cy, s in cands]
+
+def _from_canonical_value(v: CacheValue, size: int, k: int) -> CacheValue:
+    x, y, cands = v
+    x, y = from_canonical(x, y, size, k) if x >= 0 else (-1, -1)
+    return x, y, [(*from_canonical(cx, cy, size, k), s) for cx, cy, s in cands]
+
+@app.post("/omok/move", response_model=OmokMoveRes)
+async def omok_move(req: OmokMoveReq) -> OmokMoveRes:
+    size = len(req.board)
+
+    # 보드↔로그 일치 검증
+    if DEBUG:
+        recon = _board_from_history(size, req.history)
+        diffs = _diff_coords(recon, req.board)
+        if diffs:
+            print("[WARN] history ↔ board mismatch (count=%d)" % len(diffs))
+            for x,y,a,b in diffs[:10]:
+                print(f"  - at (x={x}, y={y}): from_history={a}, in_board={b}")
+        else:
+            print("[OK] history and board are consistent.")
+
+    used = {(mv.x, mv.y) for mv in (req.history or [])}
+
+    # 대칭 정규화 캐시 (동시에 온 같은 국면은 OpenAI 호출 하나를 공유 — 단, 샘플 번호가 다르면 따로)
+    key, k = canonical(stones_of(req.board), size)
+    key = sample_key(key, req.sample)
+    async def _compute() -> CacheValue:
+        return _to_canonical_value(await _ask_model(req, size), size, k)
+
+    x, y, cands = _from_canonical_value(await RESPONSE_CACHE.aget_or_compute(key, _compute), size, k)
+    cand_models: Optional[List[Candidate]] = [Candidate(x=cx, y=cy, llm_score=sc) for cx, cy, sc in cands]
 
     # 좌표 검증 & 후보 기반 보정
     def _valid(p: Tuple[int,int]) -> bool:
@@ -368,7 +552,7 @@ Make the candidate list spatially diverse: avoid near-duplicates (at most one mo
     if cand_models:
         res.candidates = cand_models
     if DEBUG:
-        res.debug_model = getattr(resp, "model", None) or OPENAI_MODEL
+        res.debug_model = MODEL_NAME
         res.server = "llm_server"
     return res
 
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# backend/local_llm.py
+"""
+llm_server 로컬 대역(stand-in) 백엔드 — OpenAI 없이 /omok/move 와 같은 JSON({x, y, candidates})을 만든다
+- 후보: heuristic(ai 휴리스틱, 지터 0 → 같은 보드면 같은 답) | search(탐색 엔진 수 + 휴리스틱 보충)
+- 인위적 지연: fixed | uniform | normal | lognormal | exp 분포, 시드 고정 난수로 재현 가능
+- 계산은 전용 스레드 하나에서 직렬로 — 이벤트 루프는 막지 않되, GIL 아래 CPU 작업이라 여러 스레드로 나눠도 빨라지지 않고
+  search 엔진은 시간 예산 안에서 여럿이 CPU 를 나눠 쓰면 얕게 끝나 같은 보드라도 부하에 따라 답이 달라진다
+"""
+from __future__ import annotations
+import asyncio
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+ENGINES = ("heuristic", "search")
+LATENCY_DISTS = ("fixed", "uniform", "normal", "lognormal", "exp")
+
+
+class LocalEngine:
+    def __init__(self, engine: str = "heuristic", n_cands: int = 3, latency_ms: float = 800.0,
+                 jitter_ms: float = 200.0, dist: str = "normal", seed: int = 0,
+                 search_budget: float = 0.3):
+        if engine not in ENGINES:
+            raise ValueError(f"OMOK_LOCAL_ENGINE 는 {ENGINES} 중 하나여야 합니다: {engine!r}")
+        if dist not in LATENCY_DISTS:
+            raise ValueError(f"OMOK_LOCAL_LATENCY_DIST 는 {LATENCY_DISTS} 중 하나여야 합니다: {dist!r}")
+        self.engine = engine
+        self.n_cands = max(1, n_cands)
+        self.latency_ms = max(0.0, latency_ms)
+        self.jitter_ms = max(0.0, jitter_ms)
+        self.dist = dist
+        self.search_budget = search_budget
+        self._rng = random.Random(seed)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="omok-local-llm")
+
+    @property
+    def model(self) -> str:
+        return f"local:{self.engine}"
+
+    def sample_latency(self) -> float:
+        """다음 응답 지연(초). 평균 latency_ms, 퍼짐 jitter_ms"""
+        mu, sd, r = self.latency_ms, self.jitter_ms, self._rng
+        if self.dist == "fixed" or mu <= 0:
+            ms = mu
+        elif self.dist == "uniform":
+            ms = r.uniform(mu - sd, mu + sd)
+        elif self.dist == "normal":
+            ms = r.gauss(mu, sd)
+        elif self.dist == "lognormal":
+            # 평균 mu, 표준편차 sd 가 되도록 로그 공간 파라미터 환산 (긴 꼬리)
+            s2 = math.log(1.0 + (sd / mu) ** 2)
+            ms = r.lognormvariate(math.log(mu) - s2 / 2, math.sqrt(s2))
+        else:  # exp: 최소 mu - sd 에 평균 sd 의 지수 꼬리
+            ms = max(0.0, mu - sd) + (r.expovariate(1.0 / sd) if sd > 0 else 0.0)
+        return max(0.0, ms) / 1000.0
+
+    def _candidates(self, board: List[List[int]]) -> dict:
+        import ai
+        from bitboard import as_bitboard
+
+        bb = as_bitboard(board)
+        prof = dict(ai._get_profile("고급"), jitter=0.0)
+        scored = sorted(ai._heuristic_scored(bb, 2, prof), key=lambda t: t[1], reverse=True)
+        if self.engine == "search":
+            from search import search_move
+            mv = search_move(bb, me=2, time_budget=self.search_budget,
+                             max_depth=prof["search_depth"], width=prof["search_width"])
+            if mv is not None:
+                top = scored[0][1] + 1.0 if scored else 1.0
+                pos = (mv["x"], mv["y"])
+                scored = [(pos, top)] + [t for t in scored if t[0] != pos]
+        # 다양화는 llm_server 가 하므로 여유 있게 넘긴다
+        cands = [{"x": x, "y": y, "llm_score": float(s)} for (x, y), s in scored[:self.n_cands * 4]]
+        if not cands:
+            return {"x": -1, "y": -1, "candidates": []}
+        return {"x": cands[0]["x"], "y": cands[0]["y"], "candidates": cands}
+
+    async def complete(self, board: List[List[int]]) -> dict:
+        """지연을 흉내 낸 뒤 LLM JSON 과 같은 모양의 응답"""
+        delay = self.sample_latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._candidates, board)
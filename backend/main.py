@@ -1,30 +1,66 @@
 # -*- coding: utf-8 -*-
 # backend/main.py
 
-from ai import find_best_move, LLMError
+from ai import find_best_move_async, ai_deadline, ai_stats, LLMError
+import ai_pool
+import llm_client
 from game import OmokGame
+from game_store import open_store
+from reaper import GameReaper, approx_game_bytes
+from pubsub import open_pubsub
+from wire import move_message, resync_message
+import fanout
+from fanout import Peer, Room
+from config import (OMOK_STORE, OMOK_STORE_PATH, OMOK_STORE_SNAPSHOT_EVERY, OMOK_STORE_FSYNC,
+                    OMOK_STORE_PRELOAD_MAX_AGE_SEC, OMOK_SEAT_TTL_SEC, OMOK_REAP_FINISHED_TTL_SEC, OMOK_REAP_IDLE_TTL_SEC,
+                    OMOK_REAP_INTERVAL_SEC, OMOK_REAP_SPILL, OMOK_PUBSUB, OMOK_PUBSUB_URL, OMOK_WORKERS,
+                    OMOK_WS_QUEUE_SIZE, OMOK_WS_SLOW_POLICY, OMOK_WS_SEND_TIMEOUT_SEC)
+import asyncio
+import json
 import os
+import socket
+try:
+    import resource  # 유닉스 전용 (/metrics 의 RSS)
+except ImportError:
+    resource = None
 import uuid
 import traceback
+from itertools import islice
 from typing import Dict, Optional
-from threading import Lock
+from contextlib import asynccontextmanager
 from collections import defaultdict
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect  # [PvP] WebSocket 추가
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 from pathlib import Path
 from dotenv import load_dotenv
-from starlette.websockets import WebSocketState  # [PvP] 상태 체크용
 
 load_dotenv(dotenv_path=Path(__file__).with_name(".env"), override=True)
 
 OMOK_LLM_URL = os.getenv("OMOK_LLM_URL", "http://127.0.0.1:8001/omok/move")
 print("OMOK_LLM_URL =", OMOK_LLM_URL)
 
-_game_locks = defaultdict(Lock)
-def _get_lock(game_id: str) -> Lock:
-    return _game_locks[game_id]
+# 게임마다 asyncio.Lock — 착수/AI 착수/추천/상태 읽기/WS 싱크가 모두 이 락 안에서 게임을 본다
+# (이벤트 루프 밖 스레드에서는 게임을 건드리지 않으므로 threading.Lock 이 필요 없고, 기다려도 루프가 멈추지 않는다)
+_game_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+@asynccontextmanager
+async def _locked(game_id: str):
+    """
+    락을 기다리는 동안에도 _inflight 에 잡혀 있어 reaper 가 락/게임을 치우지 않는다
+    마지막 사용자가 나갈 때 게임이 메모리에 없으면(없는 id 로 404, 기록 실패로 버림 등) 두 항목도 바로 치운다
+    — reaper 는 메모리에 있는 게임만 알므로, 아무 id 나 보내는 요청으로 두 dict 가 끝없이 자라지 않게
+    """
+    _inflight[game_id] += 1
+    try:
+        async with _game_locks[game_id]:
+            yield
+    finally:
+        _inflight[game_id] -= 1
+        if not _inflight[game_id] and game_id not in games:
+            _inflight.pop(game_id, None)
+            _game_locks.pop(game_id, None)
 
 load_dotenv(override=True)
 
@@ -44,6 +80,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def _start_ai_pool():
+    ai_pool.start()
+
+@app.on_event("startup")
+async def _start_bus():
+    await BUS.start(_on_bus)
+    if OMOK_WORKERS > 1 and (STORE.backend in ("memory", "file") or BUS.kind == "local"):
+        print(f"[WARN] OMOK_WORKERS={OMOK_WORKERS} 인데 저장소={STORE.backend}, 채널={BUS.kind} "
+              "— 워커끼리 게임이 보이지 않습니다 (sqlite|redis + socket|redis 권장)")
+
+@app.on_event("startup")
+async def _restore_games():
+    # 재시작 전 진행 중이던 게임 복원 (스냅샷 + 로그 재생)
+    live = await _store(STORE.load_live, OMOK_STORE_PRELOAD_MAX_AGE_SEC)
+    for gid, g in live.items():
+        games.setdefault(gid, g)
+        connections.setdefault(gid, Room())
+        REAPER.touch(gid)
+    print(f"[STORE] {STORE.backend}: restored {len(live)} live games")
+
+_reaper_task: Optional[asyncio.Task] = None
+
+async def _reap_loop():
+    while True:
+        await asyncio.sleep(OMOK_REAP_INTERVAL_SEC)
+        for gid, reason in REAPER.due():
+            if _evict(gid, reason) and not OMOK_REAP_SPILL:
+                await _store(STORE.delete, gid)
+
+@app.on_event("startup")
+async def _start_reaper():
+    global _reaper_task
+    if OMOK_REAP_IDLE_TTL_SEC > 0 or OMOK_REAP_FINISHED_TTL_SEC > 0:
+        _reaper_task = asyncio.create_task(_reap_loop())
+
+@app.on_event("shutdown")
+async def _close_llm_client():
+    await llm_client.aclose()
+    ai_pool.shutdown()
+
+_seat_task: Optional[asyncio.Task] = None
+
+async def _seat_heartbeat_loop():
+    # 이 워커가 잡은 WebSocket 자리 임대를 TTL 의 1/3 마다 연장 — 워커가 죽으면 갱신이 멈춰 TTL 뒤 자리가 풀린다
+    while True:
+        await asyncio.sleep(OMOK_SEAT_TTL_SEC / 3)
+        try:
+            await _store(STORE.refresh_seats, WORKER_ID)
+        except Exception as e:
+            print("[STORE] seat refresh failed:", repr(e))
+
+@app.on_event("startup")
+async def _start_seat_heartbeat():
+    global _seat_task
+    _seat_task = asyncio.create_task(_seat_heartbeat_loop())
+
+@app.on_event("shutdown")
+async def _stop_reaper():
+    if _reaper_task is not None:
+        _reaper_task.cancel()
+
+@app.on_event("shutdown")
+async def _stop_seat_heartbeat():
+    if _seat_task is not None:
+        _seat_task.cancel()
+
+@app.on_event("shutdown")
+async def _stop_bus():
+    await _store(STORE.release_owner, WORKER_ID)  # 이 워커에 붙어 있던 WebSocket 자리 반납
+    await BUS.close()
+
+@app.on_event("shutdown")
+async def _close_store():
+    await _store(STORE.close)
+
 # ───────────── 전역 예외 핸들러(디버그) ─────────────
 @app.exception_handler(Exception)
 async def all_exception_handler(request: Request, exc: Exception):
@@ -51,11 +163,29 @@ async def all_exception_handler(request: Request, exc: Exception):
     print("\n[EXC]", exc.__class__.__name__, exc, "\n", tb)
     return JSONResponse(status_code=500, content={"detail": str(exc)})
 
-# ───────────── 메모리 저장 ─────────────
+# ───────────── 메모리 저장 (+ 영속 저장소) ─────────────
 games: Dict[str, OmokGame] = {}
-
-# [PvP] 각 게임의 WS 슬롯(흑/백) 관리
-connections: Dict[str, Dict[str, Optional[WebSocket]]] = {}  # {"game_id": {"black": ws|None, "white": ws|None}}
+STORE = open_store(OMOK_STORE, OMOK_STORE_PATH, OMOK_STORE_SNAPSHOT_EVERY, OMOK_STORE_FSYNC, OMOK_SEAT_TTL_SEC)
+REAPER = GameReaper(OMOK_REAP_IDLE_TTL_SEC, OMOK_REAP_FINISHED_TTL_SEC)
+_inflight: Dict[str, int] = defaultdict(int)  # 락을 쥐었거나 기다리는 요청 + 락 밖에서 AI 가 생각 중인 게임 (정리 대상에서 제외)
+
+# 워커 간 채널 — 착수/채팅을 모든 워커의 로컬 WebSocket 으로 (local 이면 이 프로세스 안에서만)
+BUS = open_pubsub(OMOK_PUBSUB, OMOK_PUBSUB_URL)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+# 다른 워커도 같은 게임을 바꿀 수 있으면, 캐시한 게임을 쓰기 전에 저장소의 수 개수와 맞춰 본다
+_SHARED = BUS.kind != "local"
+
+async def _store(fn, *args):
+    """저장소 호출은 스레드에서 — sqlite/redis I/O 나 스냅샷 락 대기가 이벤트 루프(모든 HTTP/WS)를 멈추지 않게"""
+    if STORE.backend == "memory":
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+# [PvP] 이 워커에 붙은 WS — 게임마다 흑/백 자리 + 관전자 (자리 선점은 STORE.claim_seat 로 워커 간 공유)
+# 소켓마다 송신 큐 + 쓰기 태스크(fanout.Peer)라 느린 소켓 하나가 다른 소켓 전송을 막지 않는다
+connections: Dict[str, Room] = {}
+if OMOK_WS_SLOW_POLICY not in fanout.POLICIES:
+    raise ValueError(f"OMOK_WS_SLOW_POLICY 는 {fanout.POLICIES} 중 하나여야 합니다: {OMOK_WS_SLOW_POLICY!r}")
 
 # ───────────── 유틸(승리 판정 포함) ─────────────
 DIRS = ((1, 0), (0, 1), (1, 1), (1, -1))
@@ -100,18 +230,104 @@ def _is_five_or_more(board, y, x, who):
             return True
     return False
 
-def _get_game_or_404(game_id: str) -> OmokGame:
+async def _load_game(game_id: str) -> Optional[OmokGame]:
+    """메모리에 없으면(또는 다른 워커가 더 둬서 뒤처졌으면) 저장소에서 복원"""
     g = games.get(game_id)
+    if g is not None and _SHARED:
+        n = await _store(STORE.move_count, game_id)
+        if n is not None and n != len(g.moves):
+            if games.get(game_id) is g:
+                games.pop(game_id, None)
+            g = None
+    if g is None:
+        g = await _store(STORE.load, game_id)
+        if g is not None:
+            g = games.setdefault(game_id, g)
+            connections.setdefault(game_id, Room())
+            if g.winner is not None:
+                REAPER.mark_finished(game_id)
+    if g is not None:
+        REAPER.touch(game_id)
+    return g
+
+async def _get_game_or_404(game_id: str) -> OmokGame:
+    g = await _load_game(game_id)
     if g is None:
         raise HTTPException(status_code=404, detail="게임을 찾을 수 없습니다.")
     return g
 
+async def _place_and_log(game_id: str, g: OmokGame, x: int, y: int, player: Optional[int] = None,
+                   retry: bool = True):
+    """
+    착수 + 성공하면 저장소 로그에 한 줄. 반환 (게임, 성공여부, 메시지)
+    - player=None 이면 그 시점의 현재 턴
+    - 다른 워커가 같은 판에 먼저 둬서 기록이 거절되면 저장소 기준으로 다시 읽고
+      retry 면 한 번 더, 아니면(AI 처럼 옛 보드로 계산한 수) 409
+    """
+    for _ in range(2 if retry else 1):
+        who = int(player if player is not None else g.current_turn)
+        ok, msg = g.place_stone(x, y, who)
+        if not ok:
+            return g, ok, msg
+        try:
+            logged = await _store(STORE.append, game_id, len(g.moves), x, y, who, g.winner is not None)
+        except Exception:
+            # 기록 실패(sqlite busy/디스크 오류 등) — 저장소에 없는 돌을 든 캐시는 버리고 다음 접근 때 저장소 기준으로 다시 읽는다
+            if games.get(game_id) is g:
+                games.pop(game_id, None)
+            raise
+        if logged:
+            if g.winner is not None:
+                REAPER.mark_finished(game_id)
+            return g, ok, msg
+        games.pop(game_id, None)
+        g = await _get_game_or_404(game_id)
+    raise HTTPException(status_code=409, detail="다른 곳에서 먼저 수가 놓였습니다. 다시 시도해 주세요.")
+
+async def _apply_remote_move(game_id: str, msg: dict) -> None:
+    """다른 워커의 착수를 캐시한 게임에 반영 — 번호가 안 맞으면(놓친 메시지) 버리고 다음 접근 때 저장소에서 읽음"""
+    if game_id not in games:
+        return
+    async with _locked(game_id):
+        g = games.get(game_id)
+        if g is None:
+            return
+        n = int(msg["n"])
+        if len(g.moves) >= n:
+            return
+        if len(g.moves) == n - 1 and g.place_stone(int(msg["x"]), int(msg["y"]), int(msg["p"]))[0]:
+            if g.winner is not None:
+                REAPER.mark_finished(game_id)
+            return
+        games.pop(game_id, None)
+
+def _evict(game_id: str, reason: str) -> bool:
+    """reaper 가 고른 게임을 메모리에서 뺀다 — 접속 중/락 사용 중/AI 생각 중이면 건너뛰고 다시 touch
+    (저장소에서 지우는 것은 True 를 받은 _reap_loop 가 스레드에서)
+    (루프 위에서 await 없이 도므로 검사와 삭제 사이에 다른 요청이 끼어들 수 없다)"""
+    if connections.get(game_id) or _inflight.get(game_id):
+        REAPER.skipped += 1
+        REAPER.touch(game_id)
+        if reason == "finished":
+            REAPER.mark_finished(game_id)
+        return False
+    games.pop(game_id, None)
+    connections.pop(game_id, None)
+    _inflight.pop(game_id, None)
+    _game_locks.pop(game_id, None)
+    REAPER.evicted[reason] += 1
+    return True
+
 def _try_call_any(obj, name, *args, **kwargs):
     fn = getattr(obj, name, None)
     if callable(fn):
         return True, fn(*args, **kwargs)
     return False, None
 
+def _board_copy(g: OmokGame) -> list:
+    """g.board 는 착수 때 제자리에서 바뀌는 뷰 — 락 밖에서 직렬화될 응답에는 복사본을"""
+    return [row[:] for row in g.board]
+
 # [PvP] 서버 표준 상태 페이로드(프론트 호환: game_over 포함)
 def _state(g: OmokGame, game_id: str, message: str = "") -> dict:
     state = {
@@ -125,35 +341,67 @@ def _state(g: OmokGame, game_id: str, message: str = "") -> dict:
         state["message"] = message
     return state
 
-# [PvP] WS 브로드캐스트
+# [PvP] WS 브로드캐스트 — 채널을 거쳐 모든 워커의 로컬 소켓으로
 async def _broadcast(game_id: str, payload: dict):
-    conns = connections.get(game_id) or {}
-    for role in ("black", "white"):
-        ws = conns.get(role)
-        if ws and ws.application_state == WebSocketState.CONNECTED:
-            try:
-                await ws.send_json(payload)
-            except Exception:
-                pass
+    await BUS.publish({"t": "ws", "gid": game_id, "payload": payload})
+
+async def _publish_move(game_id: str, g: OmokGame):
+    """방금 둔 수를 알림 — 받는 워커마다 자기 캐시에 반영하고 자기 소켓에 game_update 를 보낸다"""
+    x, y = g.moves[-1]
+    await BUS.publish({"t": "move", "gid": game_id, "n": len(g.moves), "x": x, "y": y, "p": g.bb.get(x, y),
+                       "w": g.winner, "turn": g.current_turn, "origin": WORKER_ID})
+
+async def _on_bus(msg: dict):
+    gid = msg.get("gid")
+    if msg.get("t") == "move":
+        if msg.get("origin") != WORKER_ID:
+            await _apply_remote_move(gid, msg)
+        room = connections.get(gid)
+        if room:
+            # 전체 싱크 소켓이 받을 보드는 방금 반영한 캐시에서 — 빈틈 때문에 캐시를 버렸을 때만 저장소에서 다시 읽고,
+            # 그래도 없으면(지워진 게임) 델타 소켓에만 보낸다
+            g = None
+            if any(not p.delta for p in room.peers()):
+                g = games.get(gid)
+                if g is None or len(g.moves) < int(msg["n"]):
+                    g = await _load_game(gid)
+            await _send_local(
+                gid,
+                (lambda: {"type": "game_update", "payload": _state(g, gid)}) if g is not None else None,
+                lambda: move_message(gid, int(msg["n"]), int(msg["x"]), int(msg["y"]), int(msg["p"]),
+                                     msg.get("w"), int(msg.get("turn") or 1)))
+    elif msg.get("t") == "ws":
+        await _send_local(gid, msg["payload"])
+
+def _dumps(msg: dict) -> str:
+    return json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
+
+async def _send_local(game_id: str, payload, delta=None):
+    """
+    이 워커에 붙은 소켓(선수 + 관전자)으로. payload/delta 는 dict 또는 dict 를 만드는 함수(받을 소켓이 있을 때만 만든다), payload=None 이면 델타 소켓만
+    — 델타 소켓은 delta(있으면), 나머지는 payload. JSON 직렬화는 종류별로 한 번만
+    — 각 소켓 큐에 넣기만 하고 돌아온다 (실제 전송은 소켓마다 쓰기 태스크가 동시에)
+    """
+    room = connections.get(game_id)
+    if not room:
+        return
+    texts: Dict[str, str] = {}
+    for peer in room.peers():
+        kind = "delta" if delta is not None and peer.delta else "full"
+        if kind == "full" and payload is None:  # 게임을 못 읽었으면 전체 싱크 소켓은 건너뛴다
+            continue
+        if kind not in texts:
+            src = delta if kind == "delta" else payload
+            texts[kind] = _dumps(src() if callable(src) else src)
+        peer.offer(texts[kind])
 
 # ───────────── [AI-Assist] 유틸 추가 ─────────────
-def _swap_board_colors(board):  # [AI-Assist] 1↔2 스왑 (흑 추천용)
-    return [[0 if v == 0 else (2 if v == 1 else 1) for v in row] for row in board]
-
 def _first_playable_black(g: OmokGame):  # [AI-Assist] 흑 금수 회피 간단 폴백
     n = len(g.board)
     # 인접 빈칸 우선
-    def has_neighbor(x, y):
-        for dy in (-1,0,1):
-            for dx in (-1,0,1):
-                if dx==0 and dy==0: continue
-                yy, xx = y+dy, x+dx
-                if 0<=yy<n and 0<=xx<n and g.board[yy][xx]!=0:
-                    return True
-        return False
-    coords = [(x,y) for y in range(n) for x in range(n) if g.board[y][x]==0 and has_neighbor(x,y)]
+    coords = list(g.bb.iter_mask(g.bb.near_mask(1)))
     if not coords:
-        coords = [(x,y) for y in range(n) for x in range(n) if g.board[y][x]==0]
+        coords = list(g.bb.empties())
     cx = cy = n//2
     coords.sort(key=lambda p: max(abs(p[0]-cx), abs(p[1]-cy)))  # 중심 가까운 순
     # 금수 회피
@@ -183,7 +431,8 @@ class MoveRequest(BaseModel):
 class MoveResponse(BaseModel):
     x: int
     y: int
-    board: list
+    board: Optional[list] = None       # ?compact=1 이면 생략 (클라이언트가 x, y 로 직접 반영)
+    seq: Optional[int] = None          # 이 수의 번호 (= 델타 WS 의 seq)
     winner: Optional[int] = None
     current_turn: Optional[int] = None
     game_over: Optional[bool] = None   # [CHANGE] 추가
@@ -217,14 +466,67 @@ class AssistResponse(BaseModel):  # [AI-Assist] 수정됨
 def ping():
     return {"ok": True}
 
+@app.get("/__stats__")
+def stats():
+    return dict(ai_stats(), store=STORE.stats(), reaper=REAPER.stats(), bus=BUS.stats(), worker=WORKER_ID)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus 텍스트 형식 — 게임당 바이트는 최대 64판 표본의 평균"""
+    live = list(games.values())
+    sample = list(islice(live, 64))
+    per_game = sum(approx_game_bytes(g) for g in sample) / len(sample) if sample else 0.0
+    rooms = list(connections.values())
+    ws = sum(1 for r in rooms for p in r.players.values() if p is not None)
+    spectators = sum(len(r.spectators) for r in rooms)
+    rs = REAPER.stats()
+    ais = ai_stats()
+    bs = ais["batch"]
+    lines = [
+        "# TYPE omok_games_in_memory gauge",
+        f"omok_games_in_memory {len(live)}",
+        f'omok_games_in_memory_by_state{{state="finished"}} {sum(1 for g in live if g.winner is not None)}',
+        f'omok_games_in_memory_by_state{{state="live"}} {sum(1 for g in live if g.winner is None)}',
+        "# TYPE omok_game_bytes_approx gauge",
+        f"omok_game_bytes_approx {per_game:.0f}",
+        "# TYPE omok_games_bytes_approx_total gauge",
+        f"omok_games_bytes_approx_total {per_game * len(live):.0f}",
+        "# TYPE omok_ws_connections gauge",
+        f'omok_ws_connections{{role="player"}} {ws}',
+        f'omok_ws_connections{{role="spectator"}} {spectators}',
+        "# TYPE omok_ws_dropped_messages_total counter",
+        f"omok_ws_dropped_messages_total {fanout.STATS['dropped']}",
+        "# TYPE omok_ws_disconnects_total counter",
+        f'omok_ws_disconnects_total{{reason="slow"}} {fanout.STATS["slow_disconnects"]}',
+        f'omok_ws_disconnects_total{{reason="send_failed"}} {fanout.STATS["send_failures"]}',
+        "# TYPE omok_ai_batches_total counter",
+        f"omok_ai_batches_total {bs['batches']}",
+        "# TYPE omok_ai_batch_items_total counter",
+        f"omok_ai_batch_items_total {bs['items']}",
+        "# TYPE omok_ai_batch_coalesced_total counter",
+        f"omok_ai_batch_coalesced_total {bs['coalesced']}",
+        "# TYPE omok_ai_llm_deadline_fallbacks_total counter",
+        f"omok_ai_llm_deadline_fallbacks_total {ais['slo']['llm_deadline_fallbacks']}",
+        "# TYPE omok_reaper_evicted_total counter",
+        *(f'omok_reaper_evicted_total{{reason="{k}"}} {v}' for k, v in rs["evicted"].items()),
+        "# TYPE omok_reaper_skipped_total counter",
+        f"omok_reaper_skipped_total {rs['skipped_busy']}",
+    ]
+    if resource is not None:
+        lines += ["# TYPE omok_process_max_rss_bytes gauge",
+                  f"omok_process_max_rss_bytes {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}"]
+    return "\n".join(lines) + "\n"
+
 # [CHANGE] 새게임: 기존 응답을 유지하면서 PvP 정보(id=game_id, player_color=1, game_over)도 같이 반환
 @app.post("/api/game/new", response_model=NewGameResponse)
-def new_game():
+async def new_game():
     gid = str(uuid.uuid4())
     g = OmokGame()  # 상대방 엔진 그대로 사용
     games[gid] = g
+    await _store(STORE.create, gid, g.board_size)
+    REAPER.touch(gid)
     # [PvP] 슬롯 준비
-    connections[gid] = {"black": None, "white": None}
+    connections[gid] = Room()
     return {
         "id": gid,
         "game_id": gid,                              # [CHANGE]
@@ -237,209 +539,263 @@ def new_game():
 
 # [PvP] 방 참가 (빈 슬롯 배정)
 @app.post("/api/game/{game_id}/join")
-def join_game(game_id: str):
-    _get_game_or_404(game_id)   # 존재 확인
-    conns = connections[game_id]  # ensure init
-    if conns["black"] is None:
+async def join_game(game_id: str):
+    await _get_game_or_404(game_id)   # 존재 확인
+    seats = await _store(STORE.seats, game_id)  # 다른 워커에 붙은 소켓까지
+    if "black" not in seats:
         return {"game_id": game_id, "player_color": 1}
-    elif conns["white"] is None:
+    elif "white" not in seats:
         return {"game_id": game_id, "player_color": 2}
     else:
         return {"error": "이미 두 명이 참가 중입니다."}
 
 @app.get("/api/game/{game_id}", response_model=GameStateResponse)
-def get_game(game_id: str):
-    g = _get_game_or_404(game_id)
-    return {
-        "id": game_id,
-        "game_id": game_id,                          # [CHANGE]
-        "board": g.board,
-        "winner": g.winner,
-        "current_turn": getattr(g, "current_turn", 1),
-        "game_over": bool(g.winner is not None),     # [CHANGE]
-    }
+async def get_game(game_id: str):
+    async with _locked(game_id):
+        g = await _get_game_or_404(game_id)
+        return {
+            "id": game_id,
+            "game_id": game_id,                          # [CHANGE]
+            "board": _board_copy(g),
+            "winner": g.winner,
+            "current_turn": getattr(g, "current_turn", 1),
+            "game_over": bool(g.winner is not None),     # [CHANGE]
+        }
 
 # [CHANGE] 수 두기: 요청의 player를 신뢰하지 않고, 서버 현재 턴을 사용
 @app.post("/api/game/{game_id}/move", response_model=MoveResponse)
-async def place_move(game_id: str, req: MoveRequest):                     # ★ 수정됨 (async)
-    g = _get_game_or_404(game_id)
-    if g.winner is not None:
-        raise HTTPException(status_code=400, detail="이미 종료된 게임입니다.")
+async def place_move(game_id: str, req: MoveRequest, compact: bool = False):  # ★ 수정됨 (async)
     x, y = int(req.x), int(req.y)
-    server_player = int(getattr(g, "current_turn", 1))  # 서버에서 결정
-
-    ok, msg = g.place_stone(x, y, server_player)
-    if not ok:
-        raise HTTPException(status_code=400, detail=str(msg or "유효하지 않은 수입니다."))
+    async with _locked(game_id):
+        g = await _get_game_or_404(game_id)
+        if g.winner is not None:
+            raise HTTPException(status_code=400, detail="이미 종료된 게임입니다.")
 
-    resp = {
-        "x": x,
-        "y": y,
-        "board": g.board,
-        "winner": g.winner,
-        "current_turn": getattr(g, "current_turn", 1),
-        "game_over": bool(g.winner is not None),
-        "message": msg or "돌을 놓았습니다.",
-    }
+        g, ok, msg = await _place_and_log(game_id, g, x, y)  # 플레이어는 서버 현재 턴으로 결정
+        if not ok:
+            raise HTTPException(status_code=400, detail=str(msg or "유효하지 않은 수입니다."))
+
+        resp = {
+            "x": x,
+            "y": y,
+            "board": None if compact else _board_copy(g),
+            "seq": len(g.moves),
+            "winner": g.winner,
+            "current_turn": getattr(g, "current_turn", 1),
+            "game_over": bool(g.winner is not None),
+            "message": msg or "돌을 놓았습니다.",
+        }
 
-    # ★ 수정됨: PvP 브로드캐스트(양쪽 보드 동기화)
-    try:
-        await _broadcast(game_id, { "type": "game_update", "payload": _state(g, game_id) })
-    except Exception:
-        pass
+        # ★ 수정됨: PvP 브로드캐스트(양쪽 보드 동기화) — 모든 워커가 game_update 를 보낸다
+        # 락 안에서 알려야 수 순서(seq)대로 나간다
+        try:
+            await _publish_move(game_id, g)
+        except Exception:
+            pass
 
     return resp
 
 # ───────────── AI (상대 방식을 유지) ─────────────
 @app.post("/api/game/{game_id}/ai-move", response_model=MoveResponse)
-async def ai_move(game_id: str, req: DifficultyRequest):                 # ★ 수정됨 (async)
-    g = _get_game_or_404(game_id)
-    lock = _get_lock(game_id)
-
-    with lock:
+async def ai_move(game_id: str, req: DifficultyRequest, compact: bool = False):  # ★ 수정됨 (async)
+    # 락 안에서는 스냅샷만 뜨고, AI 계산(워커 풀)·지연·LLM 대기는 락 밖에서 await
+    # — 생각하는 동안 같은 판의 다른 요청(상태 조회/채팅 싱크 등)을 막지 않는다
+    # 마감(OMOK_AI_SLO_SEC)은 요청이 들어온 지금부터 — 락 대기도 예산에 든다
+    deadline = ai_deadline()
+    async with _locked(game_id):
+        g = await _get_game_or_404(game_id)
         if g.winner is not None:
             raise HTTPException(status_code=400, detail="이미 종료된 게임입니다.")
+        if g.current_turn != 2:
+            raise HTTPException(status_code=409, detail="지금은 AI(백) 차례가 아닙니다.")
 
         diff = _normalize_difficulty(getattr(req, "difficulty", None))
         print(f"[ai-move] received={req.difficulty!r} -> normalized={diff}")
         history = _moves_with_players(g)
-        try:
-            move = find_best_move(g.board, diff, history=history)
-        except LLMError as e:
-            raise HTTPException(status_code=503, detail=f"AI(LLM) 사용 불가: {e}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"AI 내부 오류: {e!r}")
+        snapshot = g.bb.copy()
+        n_moves = len(g.moves)
+        _inflight[game_id] += 1
 
+    try:
+        move = await find_best_move_async(snapshot, diff, history=history, deadline=deadline)
+    except LLMError as e:
+        raise HTTPException(status_code=503, detail=f"AI(LLM) 사용 불가: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI 내부 오류: {e!r}")
+    finally:
+        _inflight[game_id] -= 1
+
+    async with _locked(game_id):
+        g = await _get_game_or_404(game_id)
+        if len(g.moves) != n_moves:
+            raise HTTPException(status_code=409, detail="AI가 생각하는 동안 보드가 바뀌었습니다. 다시 요청해 주세요.")
         x, y = int(move["x"]), int(move["y"])
-        ok, msg = g.place_stone(x, y, 2)
+        g, ok, msg = await _place_and_log(game_id, g, x, y, 2, retry=False)
         if not ok:
             raise HTTPException(status_code=500, detail="AI가 유효하지 않은 좌표를 반환했습니다.")
 
-    try:
-        print(f"[APPLY AI] (x={x}, y={y}) -> board[y][x]=2")
-        if hasattr(g, "print_board"):
-            g.print_board()
-    except Exception:
-        pass
+        try:
+            print(f"[APPLY AI] (x={x}, y={y}) -> board[y][x]=2")
+            if hasattr(g, "print_board"):
+                g.print_board()
+        except Exception:
+            pass
+
+        resp = {
+            "x": x,
+            "y": y,
+            "board": None if compact else _board_copy(g),
+            "seq": len(g.moves),
+            "winner": g.winner,
+            "current_turn": getattr(g, "current_turn", 1),
+            "game_over": bool(g.winner is not None),
+            "message": msg or "AI 착수",
+        }
 
-    # ★ 수정됨: AI 수 역시 브로드캐스트(관전자/상대 화면 즉시 반영)
-    try:
-        await _broadcast(game_id, { "type": "game_update", "payload": _state(g, game_id) })
-    except Exception:
-        pass
+        # ★ 수정됨: AI 수 역시 브로드캐스트(관전자/상대 화면 즉시 반영)
+        try:
+            await _publish_move(game_id, g)
+        except Exception:
+            pass
 
-    return {
-        "x": x,
-        "y": y,
-        "board": g.board,
-        "winner": g.winner,
-        "current_turn": getattr(g, "current_turn", 1),
-        "game_over": bool(g.winner is not None),
-        "message": msg or "AI 착수",
-    }
+    return resp
 
 # ───────────── WebSocket (PvP 채팅/시스템 메세지) ─────────────
 @app.websocket("/ws/{game_id}")
 async def websocket_endpoint(websocket: WebSocket, game_id: str):
     await websocket.accept()
-    if game_id not in games:
+    if await _load_game(game_id) is None:
         await websocket.close()
         return
 
-    conns = connections.setdefault(game_id, {"black": None, "white": None})
-
-    if conns["black"] is None:
-        conns["black"] = websocket
-        me = 1
-    elif conns["white"] is None:
-        conns["white"] = websocket
-        me = 2
+    room = connections.setdefault(game_id, Room())
+
+    # 자리는 저장소에서 선점 (다른 워커에 먼저 붙은 사람이 있을 수 있음)
+    # ?role=spectator 이거나 두 자리가 다 찼으면 관전자 (수 제한 없음, 보기만 — 채팅은 선수만)
+    owner = f"{WORKER_ID}:{id(websocket)}"
+    if websocket.query_params.get("role") == "spectator":
+        role, me = "spectator", None
+    elif await _store(STORE.claim_seat, game_id, "black", owner):
+        role, me = "black", 1
+    elif await _store(STORE.claim_seat, game_id, "white", owner):
+        role, me = "white", 2
     else:
-        await websocket.close()
-        return
+        role, me = "spectator", None
+    peer = Peer(websocket, role, websocket.query_params.get("proto") == "delta",
+                OMOK_WS_QUEUE_SIZE, OMOK_WS_SLOW_POLICY, OMOK_WS_SEND_TIMEOUT_SEC)
 
-    await websocket.send_json({
+    # 입장 인사와 첫 싱크도 같은 큐로 — 브로드캐스트와 순서가 섞이지 않는다
+    peer.offer(_dumps({
         "type": "system",
         "payload": {
-            "message": f"게임에 참가했습니다. 당신의 돌은 {'흑' if me == 1 else '백'}입니다.",
-            "player_color": me
+            "message": ("관전 중입니다." if me is None
+                        else f"게임에 참가했습니다. 당신의 돌은 {'흑' if me == 1 else '백'}입니다."),
+            "player_color": me,
+            "role": role,
         }
-    })
+    }))
 
-    # ★ 수정됨: 입장과 동시에 현재 보드 상태를 싱크
-    try:
-        await websocket.send_json({ "type": "game_update", "payload": _state(games[game_id], game_id) })
-    except Exception:
-        pass
+    # ★ 수정됨: 입장과 동시에 현재 보드 상태를 싱크 (델타 클라이언트는 압축 보드)
+    # 방에 드는 것과 싱크를 같은 락 안에서 — 이후의 수는 전부 싱크 뒤에 큐에 쌓인다
+    async with _locked(game_id):
+        room.add(peer)
+        try:
+            g = await _load_game(game_id)
+            peer.offer(_dumps(resync_message(game_id, g) if peer.delta
+                              else { "type": "game_update", "payload": _state(g, game_id) }))
+        except Exception:
+            pass
 
     try:
         while True:
             data = await websocket.receive_json()
-            if data.get("type") == "chat_message":
+            if data.get("type") == "chat_message" and me is not None:
                 await _broadcast(game_id, {
                     "type": "chat_message",
                     "payload": { "sender": "흑" if me == 1 else "백", "message": data["payload"]["message"] }
                 })
-    except WebSocketDisconnect:
-        if conns.get("black") is websocket:
-            conns["black"] = None
-        elif conns.get("white") is websocket:
-            conns["white"] = None
+            elif data.get("type") == "resync_request":  # 델타 클라이언트가 seq 빈틈을 발견 (drop_oldest 로 버려진 수 포함)
+                async with _locked(game_id):
+                    peer.offer(_dumps(resync_message(game_id, await _load_game(game_id))))
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # RuntimeError: 느리다고 서버가 먼저 닫은 소켓에서 receive
+    finally:
+        peer.close()
+        room.remove(peer)
+        if me is not None:
+            await _store(STORE.release_seat, game_id, role, owner)
 
 # ───────────── [AI-Assist] 추천 좌표 엔드포인트 ─────────────
 @app.post("/api/game/{game_id}/assist", response_model=AssistResponse)
-def assist_move(game_id: str, req: AssistRequest):
+async def assist_move(game_id: str, req: AssistRequest):
     """
     내 차례에 AI가 '추천 좌표'만 알려주는 API.
     - pvai: 사람=흑(1) 기준 추천
     - pvp : 각자 자신의 color 기준 추천
     - 흑 추천은 금수(장목/3-3/4-4) 반드시 회피
     """
-    g = _get_game_or_404(game_id)
-    if g.winner is not None:
-        raise HTTPException(status_code=400, detail="이미 종료된 게임입니다.")
+    # 락 안에서 스냅샷 → 락 밖에서 생각 → 다시 락 안에서 지금 보드로 검증 (ai_move 와 같은 모양, 마감도 같이)
+    deadline = ai_deadline()
+    async with _locked(game_id):
+        g = await _get_game_or_404(game_id)
+        if g.winner is not None:
+            raise HTTPException(status_code=400, detail="이미 종료된 게임입니다.")
 
-    # 내 색 결정(요청이 없으면 현재 턴)
-    player = int(req.player or getattr(g, "current_turn", 1))
-    diff = _normalize_difficulty(req.difficulty or "고급")
+        # 내 색 결정(요청이 없으면 현재 턴)
+        player = int(req.player or getattr(g, "current_turn", 1))
+        diff = _normalize_difficulty(req.difficulty or "고급")
 
-    # 진행 로그는 ai.py가 흰(2) 기준일 때만 넘김 (흑은 보드 스왑을 하므로 생략)
-    history = _moves_with_players(g) if player == 2 else None
+        # 진행 로그는 ai.py가 흰(2) 기준일 때만 넘김 (흑은 보드 스왑을 하므로 생략)
+        history = _moves_with_players(g) if player == 2 else None
+        # 흑 추천: 보드 색을 1↔2 스왑한 뒤 '백' 알고리즘을 호출
+        snapshot = g.bb.copy() if player == 2 else g.bb.swapped()
+        n_moves = len(g.moves)
+        _inflight[game_id] += 1
 
     try:
         if player == 2:
             # 백 추천: 그대로 호출
-            mv = find_best_move(g.board, diff, history=history)
-            x, y = int(mv["x"]), int(mv["y"])
-            # 유효성
-            if not (0 <= y < len(g.board) and 0 <= x < len(g.board[0])) or g.board[y][x] != 0:
-                raise HTTPException(status_code=500, detail="추천 좌표가 잘못되었습니다(백).")
-            return {"x": x, "y": y, "player": 2, "source": "ai(white)", "message": "추천 수(백)"}
+            mv = await find_best_move_async(snapshot, diff, history=history, deadline=deadline)
         else:
-            # 흑 추천: 보드 색을 1↔2 스왑한 뒤 '백' 알고리즘을 호출
-            inv = _swap_board_colors(g.board)
-            mv = find_best_move(inv, diff, history=None)
-            x, y = int(mv["x"]), int(mv["y"])
-            # 유효성 + 흑 금수 회피
-            if not (0 <= y < len(g.board) and 0 <= x < len(g.board[0])) or g.board[y][x] != 0:
-                # 폴백
-                best = _first_playable_black(g)
-                if not best:
-                    raise HTTPException(status_code=500, detail="추천 좌표를 찾지 못했습니다(흑).")
-                x, y = best
-            if hasattr(g, "_is_forbidden_move"):
-                bad, why = g._is_forbidden_move(x, y)
-                if bad:
-                    # 간단 폴백으로 금수 회피
-                    best = _first_playable_black(g)
-                    if best:
-                        x, y = best
-                    else:
-                        raise HTTPException(status_code=400, detail=f"추천 결과가 금수입니다({why}).")
-            return {"x": x, "y": y, "player": 1, "source": "ai(black, swapped)", "message": "추천 수(흑)"}
-    except HTTPException:
-        raise
+            mv = await find_best_move_async(snapshot, diff, history=None, renju_player=2,  # 스왑 보드에선 '2'가 흑
+                                            deadline=deadline)
+        x, y = int(mv["x"]), int(mv["y"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 실패: {e!r}")
+    finally:
+        _inflight[game_id] -= 1
+
+    async with _locked(game_id):
+        g = await _get_game_or_404(game_id)
+        if len(g.moves) != n_moves:
+            raise HTTPException(status_code=409, detail="추천을 계산하는 동안 보드가 바뀌었습니다. 다시 요청해 주세요.")
+        try:
+            if player == 2:
+                # 유효성
+                if not (0 <= y < len(g.board) and 0 <= x < len(g.board[0])) or g.board[y][x] != 0:
+                    raise HTTPException(status_code=500, detail="추천 좌표가 잘못되었습니다(백).")
+                return {"x": x, "y": y, "player": 2, "source": "ai(white)", "message": "추천 수(백)"}
+            else:
+                # 유효성 + 흑 금수 회피
+                if not (0 <= y < len(g.board) and 0 <= x < len(g.board[0])) or g.board[y][x] != 0:
+                    # 폴백
+                    best = _first_playable_black(g)
+                    if not best:
+                        raise HTTPException(status_code=500, detail="추천 좌표를 찾지 못했습니다(흑).")
+                    x, y = best
+                if hasattr(g, "_is_forbidden_move"):
+                    bad, why = g._is_forbidden_move(x, y)
+                    if bad:
+                        # 간단 폴백으로 금수 회피
+                        best = _first_playable_black(g)
+                        if best:
+                            x, y = best
+                        else:
+                            raise HTTPException(status_code=400, detail=f"추천 결과가 금수입니다({why}).")
+                return {"x": x, "y": y, "player": 1, "source": "ai(black, swapped)", "message": "추천 수(흑)"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"추천 실패: {e!r}")
 
 # ───────────── 기존 코드 유지 ─────────────
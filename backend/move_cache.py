@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# backend/move_cache.py
+"""
+find_best_move 앞단 국면 캐시
+- 키: (Zobrist 해시, 렌주 제한 색, 난이도) — AI 는 항상 넘겨받은 보드의 2 이므로
+  뒤집힌 보드(흑 추천, renju_player=2)와 원래 보드를 렌주 색으로 구분한다
+- 값은 호출한 쪽이 정함: 고급은 정해진 수, 초급은 샘플링 전 점수 매긴 후보 목록(샘플링은 매번 새로)
+- 항목마다 TTL, 용량 초과 시 가장 오래 안 쓴 항목부터 제거(LRU). 상한/TTL 은 config
+"""
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional, Tuple
+
+from config import OMOK_MOVE_CACHE_SIZE, OMOK_MOVE_CACHE_TTL_SEC
+
+
+class MoveCache:
+    def __init__(self, max_entries: int, ttl_sec: float):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_sec = float(ttl_sec)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()  # 동기 경로(스레드)와 이벤트 루프가 함께 씀
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            e = self._data.get(key)
+            if e is None:
+                self.misses += 1
+                return None
+            if e[0] < time.monotonic():
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return e[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_sec, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_sec": self.ttl_sec,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+
+MOVE_CACHE = MoveCache(OMOK_MOVE_CACHE_SIZE, OMOK_MOVE_CACHE_TTL_SEC)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# backend/patterns.py
+"""
+라인 형태 분류표 — 빈칸 하나에 두었을 때 한 방향으로 어떤 형태가 되는지를 표 한 번 조회로
+- 창: 그 칸 좌우 4칸씩 9칸. 인덱스 (a << 9) | b — a = 내 돌, b = 상대 돌, 보드 밖 칸은 두 워드 모두 1
+  → 같은 창 워드 둘을 바꿔 끼우면 상대 색 기준 조회가 된다 (BitBoard 는 칸마다 창을 한 번만 자른다)
+- 값: 형태 플래그 바이트. 가운데(비트 4)가 빈 유효한 창은 보드 밖 조합까지 14641 개뿐이라
+  import 때 한 번 만들어 2^18 바이트 bytes 로 둔다
+- 연속형(five/open4/semi4/open3)은 기존 정의 그대로, 띈 형태(split4/split3)와 two 를 더했다
+"""
+from __future__ import annotations
+from typing import Tuple
+
+R = 4                    # 창 반지름
+W = 2 * R + 1            # 창 크기
+WMASK = (1 << W) - 1
+CENTER = 1 << R
+
+# 플래그 비트 (BitBoard.pat 의 형태 인덱스와 같은 순서)
+KINDS: Tuple[str, ...] = ("five", "open4", "semi4", "open3", "split4", "split3", "two", "overline")
+FIVE, OPEN4, SEMI4, OPEN3, SPLIT4, SPLIT3, TWO, OVERLINE = (1 << k for k in range(len(KINDS)))
+
+
+def _run(bits: int) -> Tuple[int, int]:
+    """bits 에서 가운데를 포함한 연속 구간 (lo, hi) — 가운데는 내 돌로 본다"""
+    bits |= CENTER
+    lo = hi = R
+    while lo > 0 and (bits >> (lo - 1)) & 1:
+        lo -= 1
+    while hi < W - 1 and (bits >> (hi + 1)) & 1:
+        hi += 1
+    return lo, hi
+
+
+def classify(mine: int, blocked: int) -> int:
+    """
+    9칸 창 하나 → 플래그
+    - five(5 이상, overline 은 그중 6 이상) / open4·semi4·open3: 정확히 4·4·3 연속 + 열린 끝 2·1↑·2
+    - split4: 연속 4는 아니지만 빈칸 하나를 더 두면 5 (X.XXX, XX.XX)
+    - split3: 열린3 은 아니지만 빈칸 하나를 더 두면 열린 4 (X.XX)
+    - two   : 위 어느 것도 아니고, 막힘 없는 5칸 구간 안에 내 돌이 가운데 포함 2개
+    """
+    empty = ~(mine | blocked | CENTER) & WMASK
+    lo, hi = _run(mine)
+    r = hi - lo + 1
+    if r >= 5:
+        return FIVE | (OVERLINE if r >= 6 else 0)
+    opens = ((empty >> (lo - 1)) & 1 if lo > 0 else 0) + ((empty >> (hi + 1)) & 1 if hi < W - 1 else 0)
+    if r == 4:
+        if opens:
+            return SEMI4 | (OPEN4 if opens == 2 else 0)
+        return 0
+    out = 0
+    if r == 3 and opens == 2:
+        out |= OPEN3
+    three = False
+    for q in range(W):
+        if not (empty >> q) & 1:
+            continue
+        a, b = _run(mine | 1 << q)
+        if not a <= q <= b:
+            continue
+        if b - a + 1 >= 5:
+            return out | SPLIT4
+        if b - a + 1 == 4 and a > 0 and b < W - 1 and (empty >> (a - 1)) & 1 and (empty >> (b + 1)) & 1:
+            three = True
+    if out:
+        return out
+    if three:
+        return SPLIT3
+    for s in range(R + 1):
+        seg = ((1 << 5) - 1) << s
+        if not blocked & seg and ((mine | CENTER) & seg).bit_count() == 2:
+            return TWO
+    return 0
+
+
+def _build() -> bytes:
+    table = bytearray(1 << (2 * W))
+    others = [i for i in range(W) if i != R]
+    # 보드 밖은 창 양끝에서만 이어진다: 왼쪽 l칸, 오른쪽 r칸 (0..R)
+    edges = [((1 << l) - 1) | (WMASK ^ (WMASK >> r)) for l in range(R + 1) for r in range(R + 1)]
+    for code in range(3 ** len(others)):
+        mine = theirs = 0
+        for i in others:
+            code, v = divmod(code, 3)
+            if v == 1:
+                mine |= 1 << i
+            elif v == 2:
+                theirs |= 1 << i
+        f = classify(mine, theirs)
+        for e in edges:
+            if e & ~theirs == 0:  # 보드 밖 칸은 막힘 쪽에 이미 들어 있는 조합만
+                table[((mine | e) << W) | theirs] = f
+    return bytes(table)
+
+
+TABLE: bytes = _build()
+
+# 플래그 바이트 → 켜진 형태 인덱스들
+KIND_BITS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(k for k in range(len(KINDS)) if (f >> k) & 1) for f in range(256)
+)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# backend/pubsub.py
+"""
+워커 간 메시지 채널 — 한 워커에서 둔 수/채팅을 모든 워커의 로컬 WebSocket 에 전달
+- 메시지는 JSON 으로 바꿀 수 있는 dict. publish 하면 자기 자신을 포함한 모든 구독자의 handler 가 불린다
+- local : 한 프로세스 안에서만 (워커 1개, 테스트용)
+- socket: 같은 호스트의 워커끼리 TCP 허브(host:port). 먼저 포트를 잡은 워커가 허브가 되고
+          나머지는 접속한다. 허브가 죽으면 남은 워커들이 다시 포트를 잡으려 시도한다
+- redis : Redis PUBLISH/SUBSCRIBE (여러 호스트). redis 패키지가 있어야 한다
+- 전달은 최대 한 번(at-most-once) — 놓친 수는 저장소(game_store)를 다시 읽어 맞춘다
+"""
+from __future__ import annotations
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional, Set
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class PubSub:
+    """인터페이스 + local 구현 (같은 프로세스 안의 구독자에게만 전달)"""
+
+    kind = "local"
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+        self.published = 0
+        self.delivered = 0
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def publish(self, msg: dict) -> None:
+        self.published += 1
+        await self._deliver(msg)
+
+    async def _deliver(self, msg: dict) -> None:
+        if self._handler is None:
+            return
+        self.delivered += 1
+        try:
+            await self._handler(msg)
+        except Exception as e:
+            print("[PUBSUB] handler failed:", repr(e))
+
+    async def close(self) -> None:
+        self._handler = None
+
+    def stats(self) -> dict:
+        return {"kind": self.kind, "published": self.published, "delivered": self.delivered}
+
+
+class SocketPubSub(PubSub):
+    """줄 단위 JSON 을 주고받는 TCP 허브. 허브도 자기 자신에게 클라이언트로 붙어 경로가 같다"""
+
+    kind = "socket"
+
+    def __init__(self, addr: str, reconnect_sec: float = 0.5):
+        super().__init__()
+        host, _, port = addr.rpartition(":")
+        self.host, self.port = host or "127.0.0.1", int(port)
+        self.reconnect_sec = reconnect_sec
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._closing = False
+        self.reconnects = 0
+
+    @property
+    def is_hub(self) -> bool:
+        return self._server is not None
+
+    async def start(self, handler: Handler) -> None:
+        await super().start(handler)
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=5.0)
+        except asyncio.TimeoutError:
+            print(f"[PUBSUB] hub {self.host}:{self.port} unreachable; delivering locally until it is back")
+
+    # ---------- 허브 ----------
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        try:
+            while line := await reader.readline():
+                for w in list(self._peers):
+                    try:
+                        w.write(line)
+                    except Exception:
+                        self._peers.discard(w)
+                await asyncio.gather(*(w.drain() for w in list(self._peers)), return_exceptions=True)
+        except (OSError, asyncio.CancelledError):
+            pass  # 피어 끊김 / 허브 종료
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    async def _try_become_hub(self) -> None:
+        try:
+            self._server = await asyncio.start_server(self._serve_peer, self.host, self.port)
+            print(f"[PUBSUB] hub listening on {self.host}:{self.port}")
+        except OSError:
+            pass  # 다른 워커가 이미 허브
+
+    # ---------- 클라이언트 ----------
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await self._try_become_hub()
+                if not self.is_hub:
+                    await asyncio.sleep(self.reconnect_sec)
+                continue
+            self._writer = writer
+            self._connected.set()
+            try:
+                while line := await reader.readline():
+                    await self._deliver(json.loads(line))
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+            if not self._closing:
+                self.reconnects += 1
+                await asyncio.sleep(self.reconnect_sec)
+
+    async def publish(self, msg: dict) -> None:
+        self.published += 1
+        w = self._writer
+        if w is None:  # 허브와 끊긴 동안은 이 워커의 소켓에라도 전달
+            await self._deliver(msg)
+            return
+        try:
+            w.write(json.dumps(msg, ensure_ascii=False).encode("utf-8") + b"\n")
+            await w.drain()
+        except OSError:
+            await self._deliver(msg)
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        if self._server is not None:
+            self._server.close()
+            for w in list(self._peers):
+                w.close()
+        await super().close()
+
+    def stats(self) -> dict:
+        return dict(super().stats(), hub=self.is_hub, connected=self._writer is not None,
+                    peers=len(self._peers), reconnects=self.reconnects)
+
+
+class RedisPubSub(PubSub):
+    """Redis 채널 하나(channel)로 모든 워커/호스트에 전달"""
+
+    kind = "redis"
+
+    def __init__(self, url: str, channel: str = "omok:events"):
+        super().__init__()
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("OMOK_PUBSUB=redis 에는 redis 패키지가 필요합니다 (pip install redis)") from e
+        self.channel = channel
+        self._redis = aioredis.from_url(url)
+        self._sub = self._redis.pubsub()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler) -> None:
+        await super().start(handler)
+        await self._sub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        async for item in self._sub.listen():
+            if item.get("type") == "message":
+                try:
+                    msg = json.loads(item["data"])
+                except ValueError:
+                    continue
+                await self._deliver(msg)
+
+    async def publish(self, msg: dict) -> None:
+        self.published += 1
+        await self._redis.publish(self.channel, json.dumps(msg, ensure_ascii=False))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        for obj in (self._sub, self._redis):  # redis 5.0.1+ 는 aclose, 그 전은 close
+            await (getattr(obj, "aclose", None) or obj.close)()
+        await super().close()
+
+
+def open_pubsub(kind: str, url: str) -> PubSub:
+    if kind == "local":
+        return PubSub()
+    if kind == "socket":
+        return SocketPubSub(url)
+    if kind == "redis":
+        return RedisPubSub(url)
+    raise ValueError(f"OMOK_PUBSUB 는 local | socket | redis 중 하나여야 합니다: {kind!r}")
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# backend/reaper.py
+"""
+메모리 게임 목록 정리(reaper)
+- 게임에 손댈 때마다 touch → 마지막 접근 순서를 OrderedDict 로 유지 (O(1), 요청마다 전체 순회 없음)
+- 주기적으로 맨 앞(가장 오래 안 쓴 것)부터 TTL 이 지난 게임만 꺼내 main 의 evict 콜백에 넘긴다
+- 끝난 게임은 짧은 TTL(finished_ttl), 진행 중인 게임은 긴 TTL(idle_ttl). 0 이하면 그 TTL 은 끔
+"""
+from __future__ import annotations
+import sys
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Tuple
+
+
+class GameReaper:
+    def __init__(self, idle_ttl_sec: float, finished_ttl_sec: float):
+        self.idle_ttl = idle_ttl_sec
+        self.finished_ttl = finished_ttl_sec
+        self._touched: "OrderedDict[str, float]" = OrderedDict()   # gid -> 마지막 접근(monotonic), 오래된 순
+        self._finished: "OrderedDict[str, float]" = OrderedDict()  # gid -> 끝난 시각, 오래된 순
+        self._lock = Lock()
+        self.evicted = {"idle": 0, "finished": 0}
+        self.skipped = 0
+
+    def touch(self, gid: str) -> None:
+        with self._lock:
+            self._touched[gid] = time.monotonic()
+            self._touched.move_to_end(gid)
+
+    def mark_finished(self, gid: str) -> None:
+        with self._lock:
+            self._finished.setdefault(gid, time.monotonic())
+
+    def forget(self, gid: str) -> None:
+        with self._lock:
+            self._touched.pop(gid, None)
+            self._finished.pop(gid, None)
+
+    def due(self) -> List[Tuple[str, str]]:
+        """TTL 이 지난 (gid, 사유) — 꺼낸 항목은 목록에서 빠진다 (못 지우면 호출 쪽이 다시 touch)"""
+        now = time.monotonic()
+        out: List[Tuple[str, str]] = []
+        with self._lock:
+            if self.finished_ttl > 0:
+                while self._finished:
+                    gid, t = next(iter(self._finished.items()))
+                    if now - t < self.finished_ttl:
+                        break
+                    self._finished.popitem(last=False)
+                    self._touched.pop(gid, None)
+                    out.append((gid, "finished"))
+            if self.idle_ttl > 0:
+                while self._touched:
+                    gid, t = next(iter(self._touched.items()))
+                    if now - t < self.idle_ttl:
+                        break
+                    self._touched.popitem(last=False)
+                    self._finished.pop(gid, None)
+                    out.append((gid, "idle"))
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"tracked": len(self._touched), "finished_pending": len(self._finished),
+                    "evicted": dict(self.evicted), "skipped_busy": self.skipped}
+
+
+def approx_bytes(obj, _seen=None) -> int:
+    """컨테이너를 따라가며 sys.getsizeof 합 (공유 객체는 한 번만, 작은 int 캐시 등은 근사)"""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_bytes(k, seen) + approx_bytes(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_bytes(v, seen) for v in obj)
+    return size
+
+
+def approx_game_bytes(g) -> int:
+    """OmokGame 하나가 들고 있는 메모리 근사 (보드 크기별 공용 geometry 표는 제외, 렌주 금수 캐시는 포함)"""
+    bb = g.bb
+    seen: set = set()
+    parts = (bb.masks, bb.rows, bb.pat, getattr(bb, "_threats", {}), getattr(bb, "_renju", {}), g.moves)
+    return sys.getsizeof(g) + sys.getsizeof(bb) + sum(approx_bytes(p, seen) for p in parts)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# backend/renju.py
+"""
+렌주 금수 판정 (정확판) — 제한받는 색(보통 흑)이 (x, y)에 둘 때
+- 정확히 5가 되면 무조건 합법 (다른 방향의 장목/4-4/3-3 보다 우선)
+- 장목(6 이상) / 4-4(같은 라인 안의 X.XXX.X 같은 두 4 포함) / 3-3 이면 금수
+- 3 은 '한 수 더 두면 열린 4(양쪽 모두 정확히 5가 되는 4)가 되는' 형태 — 띈 3(X.XX)도 포함
+  그 한 수(완성점)가 다시 금수면 진짜 3 이 아니다 (가짜 3-3) → 완성점을 재귀로 판정
+- 라인 분석은 표로: 한 방향에서 (x, y) 좌우 5칸씩 11칸 창을 (내 돌, 막힘=상대 돌·보드 밖) 두 11비트로 보고
+  그 창의 결과(5/장목/4 개수/3 완성점)를 한 번 계산해 두고 재사용
+- 결과는 보드(BitBoard._renju)에 칸별로 캐시하고, 판정 때 읽은 칸(재귀 포함)에 돌이 놓이거나 빠지면 그 항목만 지운다
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import List, Tuple
+
+from bitboard import BitBoard
+
+W = 11          # 창 크기
+C = 5           # 창 안에서 판정 칸의 위치
+WMASK = (1 << W) - 1
+MAX_DEPTH = 6   # 가짜 3-3 재귀 한도 — 실전에서 3단계를 넘는 일은 거의 없고, 넘으면 그 완성점은 합법으로 본다
+
+
+class _Tables:
+    """보드 크기별: 칸·방향마다 창 밖(보드 밖) 비트, 칸마다 네 창이 덮는 칸(가로 레이아웃) 마스크"""
+
+    def __init__(self, bb: BitBoard):
+        g = bb.geo
+        cells = bb.n * bb.n
+        self.edge = [[0] * cells for _ in range(4)]
+        self.star = [0] * cells
+        for c in range(cells):
+            star = 0
+            for d in range(4):
+                p, ln = g.pos[d][c], g.line_len[d][c]
+                e = 0
+                for i in range(W):
+                    q = p - C + i
+                    if q < 0 or q >= ln:
+                        e |= 1 << i
+                self.edge[d][c] = e
+                for hb in g.line_h[d][c][max(0, p - C):p - C + W]:
+                    star |= 1 << hb
+            self.star[c] = star
+
+
+@lru_cache(maxsize=None)
+def _tables(n: int) -> _Tables:
+    return _Tables(BitBoard(n))
+
+
+def _run(bits: int, i: int) -> int:
+    """bits 에서 i 를 포함한 연속 구간의 마스크"""
+    lo = hi = i
+    while lo > 0 and (bits >> (lo - 1)) & 1:
+        lo -= 1
+    while hi < W - 1 and (bits >> (hi + 1)) & 1:
+        hi += 1
+    return ((1 << (hi - lo + 1)) - 1) << lo
+
+
+@lru_cache(maxsize=1 << 16)
+def line_pattern(mine: int, blocked: int) -> Tuple[int, int, Tuple[int, ...]]:
+    """
+    11칸 창 하나의 분석 (가운데 C 는 내 돌로 간주). 반환 (5/장목, 4 개수, 3 완성점)
+    - 첫 값: 1 = 가운데를 지나는 정확히 5, 2 = 6 이상, 0 = 둘 다 아님
+    - 4 개수: 빈칸 하나를 더해 가운데를 지나는 정확히 5가 되는 경우를 '남는 네 돌' 기준으로 센 수
+              (.XXXX. 는 완성점이 둘이어도 4 하나, X.XXX.X 는 4 둘)
+    - 3 완성점: 4가 없을 때만 — 두면 가운데를 지나는 열린 4가 되는 빈칸의 창 내 위치
+    """
+    mine |= 1 << C
+    empty = ~(mine | blocked) & WMASK
+    r = _run(mine, C).bit_count()
+    if r >= 5:
+        return (1 if r == 5 else 2), 0, ()
+    fours = set()
+    for q in range(W):
+        if (empty >> q) & 1:
+            run = _run(mine | 1 << q, C)
+            if run.bit_count() == 5 and (run >> q) & 1:
+                fours.add(run & ~(1 << q))
+    if fours:
+        return 0, len(fours), ()
+    threes = []
+    for q in range(W):
+        if not (empty >> q) & 1:
+            continue
+        nm = mine | 1 << q
+        run = _run(nm, C)
+        if run.bit_count() != 4 or not (run >> q) & 1:
+            continue
+        lo = (run & -run).bit_length() - 1
+        hi = run.bit_length() - 1
+        # 양 끝이 비어 있고, 거기 두면 장목이 아닌 정확히 5 (끝 바깥 칸이 내 돌이 아님)
+        if lo < 1 or hi > W - 2 or not (empty >> (lo - 1)) & 1 or not (empty >> (hi + 1)) & 1:
+            continue
+        if (lo >= 2 and (nm >> (lo - 2)) & 1) or (hi <= W - 3 and (nm >> (hi + 2)) & 1):
+            continue
+        threes.append(q - C)
+    return 0, 0, tuple(threes)
+
+
+def _window(word: int, p: int) -> int:
+    return (word >> (p - C)) & WMASK if p >= C else (word << (C - p)) & WMASK
+
+
+def _judge(bb: BitBoard, c: int, player: int, extra: List[int], depth: int) -> Tuple[bool, str, int]:
+    """칸 c (extra 칸들에 player 돌을 가상으로 둔 상태) → (금수, 이유, 읽은 칸 마스크)"""
+    g, t, n = bb.geo, _tables(bb.n), bb.n
+    dep = t.star[c]
+    fours = 0
+    over = False
+    three_dirs = []
+    for d in range(4):
+        off, p, ln = g.line_off[d][c], g.pos[d][c], g.line_len[d][c]
+        full = (1 << ln) - 1
+        mine = (bb.masks[player][d] >> off) & full
+        theirs = (bb.masks[3 - player][d] >> off) & full
+        for e in extra:
+            if g.line_off[d][e] == off:
+                mine |= 1 << g.pos[d][e]
+        five, k, threes = line_pattern(_window(mine, p), _window(theirs, p) | t.edge[d][c])
+        if five == 1:
+            return False, "", dep
+        if five == 2:
+            over = True
+        fours += k
+        if threes:
+            three_dirs.append((d, p, threes))
+    if over:
+        return True, "장목", dep
+    if fours >= 2:
+        return True, "4-4", dep
+    if len(three_dirs) < 2:
+        return False, "", dep
+    if depth >= MAX_DEPTH:
+        return False, "", dep
+    # 가짜 3 걸러내기: 완성점 중 하나라도 (c 를 둔 상태에서) 금수가 아니면 진짜 3
+    real = 0
+    for d, p, threes in three_dirs:
+        line = g.line_h[d][c]
+        ext = extra + [c]
+        for o in threes:
+            hb = line[p + o]
+            q = (hb // g.stride) * n + hb % g.stride
+            bad, _, sub = _judge(bb, q, player, ext, depth + 1)
+            dep |= sub
+            if not bad:
+                real += 1
+                break
+        if real >= 2:
+            return True, "3-3", dep
+    return False, "", dep
+
+
+def forbidden_move(bb: BitBoard, x: int, y: int, player: int = 1) -> Tuple[bool, str]:
+    """
+    제한받는 색(player) 기준 금수 판정 → (금수 여부, "장목" | "4-4" | "3-3" | "")
+    보드를 바꾸지 않는다. 결과는 bb 에 캐시 (같은 국면에서 같은 칸을 다시 물으면 사전 조회 한 번)
+    """
+    c = y * bb.n + x
+    key = c * 3 + player
+    hit = bb._renju.get(key)
+    if hit is not None:
+        return hit[0], hit[1]
+    bad, why, dep = _judge(bb, c, player, [], 0)
+    bb._renju[key] = (bad, why, dep)
+    return bad, why
@@ -1,5 +1,11 @@
 #!/usr/bin/env python3
 import uvicorn
 
+from config import OMOK_WORKERS
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # 워커 1개면 개발용 자동 리로드, 여러 개면 리로드 없이 (uvicorn 은 둘을 함께 못 쓴다)
+    if OMOK_WORKERS > 1:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=OMOK_WORKERS)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
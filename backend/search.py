@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# backend/search.py
+"""
+고급 난이도 탐색 엔진
+- VCF(연속 4) / VCT(3·4 위협) 위협공간 탐색으로 강제승 먼저 확인
+- 반복 심화 negamax + alpha-beta, 수 정렬은 ai._score_move
+- 수당 시간 예산(초)이 다 되면 마지막으로 끝난 깊이의 최선 수를 반환
+- 렌주 제한 색(renju_player)이 둘 차례면 금수 자리는 후보에서 제외
+- Zobrist 해시(BitBoard.hash) 키의 치환표(ttable.py)로 같은 국면 재탐색을 줄임
+"""
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bitboard import BitBoard
+from game import forbidden_move
+from ai import _score_move, _phase_center_factor, CENTER_SCALE, AI_DEBUG
+from ttable import TranspositionTable, shared_table, EXACT, LOWER, UPPER
+
+WIN = 1_000_000_000
+INF = WIN * 2
+MATE_BAND = 10_000  # |값| 이 WIN - MATE_BAND 이상이면 '몇 수 뒤 승/패' 값
+
+# 치환표 키에 섞는 값: 둘 차례, 렌주 제한 색 (보드 해시만으로는 구분되지 않음)
+_SIDE_KEY = 0x9E3779B97F4A7C15
+_RENJU_KEYS = {None: 0, 1: 0x5851F42D4C957F2D, 2: 0x14057B7EF767814F}
+
+# 정적 평가 가중치 (형태표 칸 수 기준)
+EVAL_WEIGHTS = (("open4", 50_000), ("semi4", 8_000), ("split4", 8_000), ("open3", 3_000), ("split3", 2_500),
+                ("two", 150))
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _to_tt(v: int, ply: int) -> int:
+    """승/패 값은 '현재 노드 기준 거리'로 바꿔 저장 (다른 경로에서 만나도 맞도록)"""
+    if v >= WIN - MATE_BAND:
+        return v + ply
+    if v <= -WIN + MATE_BAND:
+        return v - ply
+    return v
+
+
+def _from_tt(v: int, ply: int) -> int:
+    if v >= WIN - MATE_BAND:
+        return v - ply
+    if v <= -WIN + MATE_BAND:
+        return v + ply
+    return v
+
+
+class _Search:
+    def __init__(self, board: BitBoard, deadline: float, renju_player: Optional[int],
+                 width: int, near_radius: int, tt: TranspositionTable):
+        self.bb = board.copy()  # 게임 보드(공유 상태)는 건드리지 않는다
+        self.deadline = deadline
+        self.renju = renju_player
+        self.width = width
+        self.near_radius = near_radius
+        self.tt = tt
+        self.nodes = 0
+
+    def key(self, side: int) -> int:
+        return self.bb.hash ^ (_SIDE_KEY if side == 2 else 0) ^ _RENJU_KEYS.get(self.renju, 0)
+
+    # ---------------- 공통 ----------------
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if (self.nodes & 31) == 0 and time.perf_counter() >= self.deadline:
+            raise _Timeout()
+
+    def _legal(self, x: int, y: int, side: int) -> bool:
+        return side != self.renju or not forbidden_move(self.bb, x, y, side)[0]
+
+    def _cells(self, mask: int, side: int) -> List[Tuple[int, int]]:
+        return [p for p in self.bb.iter_mask(mask) if self._legal(p[0], p[1], side)]
+
+    def _wins(self, side: int) -> List[Tuple[int, int]]:
+        """side가 두면 바로 이기는 칸 (렌주 색은 정확히 5만, 금수 제외)"""
+        return self._cells(self.bb.threat_masks(side)["five"], side)
+
+    def _evaluate(self, side: int) -> int:
+        mine, theirs = self.bb.threat_masks(side), self.bb.threat_masks(3 - side)
+        s = 0
+        for key, w in EVAL_WEIGHTS:
+            s += w * (mine[key].bit_count() - theirs[key].bit_count())
+        return s
+
+    def _ordered_moves(self, side: int) -> List[Tuple[int, int]]:
+        bb = self.bb
+        phase = _phase_center_factor(bb)
+        scored = []
+        for x, y in bb.iter_mask(bb.near_mask(self.near_radius)):
+            if not self._legal(x, y, side):
+                continue
+            scored.append((_score_move(bb, x, y, side, CENTER_SCALE, phase), (x, y)))
+        scored.sort(reverse=True)
+        return [p for _, p in scored[:self.width]]
+
+    # ---------------- 위협공간 탐색 ----------------
+
+    def vcf(self, attacker: int, depth: int) -> Optional[Tuple[int, int]]:
+        """연속 4로 이기는 첫 수 (없으면 None)"""
+        self._tick()
+        wins = self._wins(attacker)
+        if wins:
+            return wins[0]
+        defender = 3 - attacker
+        if depth <= 0 or self.bb.threat_masks(defender)["five"]:
+            return None
+        tm = self.bb.threat_masks(attacker)
+        for x, y in self._cells(tm["semi4"] | tm["split4"], attacker):
+            if self._after_threat(x, y, attacker, depth, self.vcf):
+                return (x, y)
+        return None
+
+    def vct(self, attacker: int, depth: int) -> Optional[Tuple[int, int]]:
+        """4 또는 열린3(띈 3 포함) 위협을 이어 이기는 첫 수 (없으면 None)"""
+        self._tick()
+        hit = self.vcf(attacker, min(depth, 2))
+        if hit is not None or depth <= 0:
+            return hit
+        defender = 3 - attacker
+        if self.bb.threat_masks(defender)["five"]:
+            return None
+        tm = self.bb.threat_masks(attacker)
+        for x, y in self._cells((tm["open3"] | tm["split3"]) & ~(tm["semi4"] | tm["split4"]), attacker):
+            bb = self.bb
+            bb.set(x, y, attacker)
+            try:
+                if self._refutes_all(attacker, depth):
+                    return (x, y)
+            finally:
+                bb.clear(x, y)
+        return None
+
+    def _after_threat(self, x: int, y: int, attacker: int, depth: int, cont) -> bool:
+        """attacker가 4를 둔 뒤 수비가 유일한 막기를 강제당해도 cont로 이어 이기는지"""
+        bb = self.bb
+        defender = 3 - attacker
+        bb.set(x, y, attacker)
+        try:
+            fives = self._wins(attacker)
+            if len(fives) >= 2:
+                return True
+            if len(fives) != 1:
+                return False
+            bx, by = fives[0]
+            if not self._legal(bx, by, defender):
+                return True  # 막을 자리가 수비 쪽 금수
+            bb.set(bx, by, defender)
+            try:
+                return cont(attacker, depth - 1) is not None
+            finally:
+                bb.clear(bx, by)
+        finally:
+            bb.clear(x, y)
+
+    def _refutes_all(self, attacker: int, depth: int) -> bool:
+        """열린3(또는 4) 위협 뒤, 수비의 모든 방어 후보에 대해 공격이 계속 이기는지"""
+        bb = self.bb
+        defender = 3 - attacker
+        if self._wins(defender):
+            return False
+        tm = bb.threat_masks(attacker)
+        # 수비 후보: 공격자가 5/열린4/띈4를 만들 수 있는 자리 (띈 3 은 양 끝도 막는 자리) + 수비 자신의 4 (반격)
+        replies = self._cells(tm["five"] | tm["open4"] | tm["split4"], defender)
+        dm = bb.threat_masks(defender)
+        replies += [p for p in self._cells(dm["semi4"] | dm["split4"], defender)
+                    if p not in replies]
+        if not replies:
+            return False
+        for bx, by in replies:
+            bb.set(bx, by, defender)
+            try:
+                if self.vct(attacker, depth - 1) is None:
+                    return False
+            finally:
+                bb.clear(bx, by)
+        return True
+
+    # ---------------- alpha-beta ----------------
+
+    def _negamax(self, depth: int, alpha: int, beta: int, side: int, ply: int) -> int:
+        self._tick()
+        if self._wins(side):
+            return WIN - ply
+        if depth <= 0:
+            return self._evaluate(side)
+
+        key = self.key(side)
+        e = self.tt.get(key)
+        tt_move = None
+        if e is not None:
+            tt_move = e.move
+            if e.depth >= depth:
+                v = _from_tt(e.value, ply)
+                if e.flag == EXACT:
+                    return v
+                if e.flag == LOWER and v >= beta:
+                    return v
+                if e.flag == UPPER and v <= alpha:
+                    return v
+
+        blocks = self._wins(3 - side)
+        moves = self._cells(self.bb.threat_masks(3 - side)["five"], side) if blocks else self._ordered_moves(side)
+        if not moves:
+            return -WIN + ply if blocks else 0
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        alpha0 = alpha
+        best, best_move = -INF, None
+        for x, y in moves:
+            self.bb.set(x, y, side)
+            try:
+                v = -self._negamax(depth - 1, -beta, -alpha, 3 - side, ply + 1)
+            finally:
+                self.bb.clear(x, y)
+            if v > best:
+                best, best_move = v, (x, y)
+            if v > alpha:
+                alpha = v
+            if alpha >= beta:
+                break
+
+        flag = UPPER if best <= alpha0 else (LOWER if best >= beta else EXACT)
+        self.tt.put(key, depth, _to_tt(best, ply), flag, best_move)
+        return best
+
+    def root(self, depth: int, me: int, moves: List[Tuple[int, int]]) -> Tuple[Tuple[int, int], int]:
+        alpha, best, best_v = -INF, moves[0], -INF
+        for x, y in moves:
+            self.bb.set(x, y, me)
+            try:
+                v = -self._negamax(depth - 1, -INF, -alpha, 3 - me, 1)
+            finally:
+                self.bb.clear(x, y)
+            if v > best_v:
+                best, best_v = (x, y), v
+            alpha = max(alpha, v)
+        self.tt.put(self.key(me), depth, _to_tt(best_v, 0), EXACT, best)
+        return best, best_v
+
+
+def search_move(board: BitBoard, me: int = 2, time_budget: float = 1.0, max_depth: int = 6,
+                width: int = 10, near_radius: int = 2, renju_player: Optional[int] = 1,
+                vcf_depth: int = 8, vct_depth: int = 3,
+                tt: Optional[TranspositionTable] = None) -> Optional[Dict[str, int]]:
+    """
+    me 차례의 최선 수 {"x","y"} (시간 안에 아무 깊이도 못 끝내면 None)
+    renju_player: 금수 제한을 받는 색 (흑/백을 뒤집은 보드면 2, 없으면 None)
+    tt: 치환표 (생략 시 프로세스 공유 테이블)
+    """
+    t0 = time.perf_counter()
+    s = _Search(board, t0 + max(0.0, time_budget), renju_player, width, near_radius,
+                tt if tt is not None else shared_table())
+    tag, best = None, None
+    try:
+        # 1) 강제승 — VCF, 그다음 시간 예산의 1/3 안에서 VCT
+        hit = s.vcf(me, vcf_depth)
+        if hit is not None:
+            tag, best = "vcf", hit
+        else:
+            s.deadline = min(s.deadline, t0 + time_budget / 3.0)
+            hit = s.vct(me, vct_depth)
+            if hit is not None:
+                tag, best = "vct", hit
+    except _Timeout:
+        pass
+    s.deadline = t0 + max(0.0, time_budget)
+
+    if best is None:
+        # 2) 반복 심화 alpha-beta — 직전 깊이의 최선 수를 앞에 두고 다시 탐색
+        try:
+            moves = s._ordered_moves(me)
+            if not moves:
+                return None
+            e = s.tt.get(s.key(me))
+            if e is not None and e.move in moves:
+                moves.remove(e.move)
+                moves.insert(0, e.move)
+            for depth in range(1, max_depth + 1):
+                mv, v = s.root(depth, me, moves)
+                best, tag = mv, f"ab{depth}"
+                moves = [mv] + [p for p in moves if p != mv]
+                if abs(v) >= WIN - max_depth:
+                    break  # 승패가 확정됨
+        except _Timeout:
+            pass
+
+    if AI_DEBUG:
+        print(f"[SEARCH] {tag} -> {best} nodes={s.nodes} {(time.perf_counter() - t0) * 1000:.1f}ms "
+              f"tt={s.tt.stats()}")
+    return None if best is None else {"x": best[0], "y": best[1]}
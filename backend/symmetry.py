@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# backend/symmetry.py
+"""
+보드 대칭(회전 4 × 반사 2 = 8가지) 정규화
+- canonical(): 8가지 변환 중 Zobrist 해시가 가장 작은 것을 대표로 삼아 (키, 변환 번호) 반환
+- 오프닝북/LLM 응답 캐시가 대칭인 국면을 한 항목으로 공유할 때 사용
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+from bitboard import BitBoard, geometry
+
+# (x, y) → 변환 좌표. k=0 은 항등
+_TRANSFORMS = (
+    lambda x, y, m: (x, y),
+    lambda x, y, m: (m - y, x),
+    lambda x, y, m: (m - x, m - y),
+    lambda x, y, m: (y, m - x),
+    lambda x, y, m: (m - x, y),
+    lambda x, y, m: (x, m - y),
+    lambda x, y, m: (y, x),
+    lambda x, y, m: (m - y, m - x),
+)
+
+
+@lru_cache(maxsize=None)
+def _maps(n: int) -> Tuple[List[List[int]], List[List[int]]]:
+    """(정방향, 역방향) 셀 인덱스 변환표 8개씩"""
+    fwd, inv = [], []
+    for t in _TRANSFORMS:
+        f = [0] * (n * n)
+        b = [0] * (n * n)
+        for y in range(n):
+            for x in range(n):
+                tx, ty = t(x, y, n - 1)
+                f[y * n + x] = ty * n + tx
+                b[ty * n + tx] = y * n + x
+        fwd.append(f)
+        inv.append(b)
+    return fwd, inv
+
+
+def stones_of(board) -> List[Tuple[int, int, int]]:
+    """List[List[int]] 또는 BitBoard → [(x, y, color)]"""
+    if isinstance(board, BitBoard):
+        return [(x, y, board.rows[y][x]) for x, y in board.iter_mask(board.occupancy())]
+    return [(x, y, v) for y, row in enumerate(board) for x, v in enumerate(row) if v]
+
+
+def canonical(stones: Iterable[Tuple[int, int, int]], n: int) -> Tuple[int, int]:
+    """대칭 정규화 키 (가장 작은 변환 해시, 그 변환 번호)"""
+    z = geometry(n).zobrist
+    fwd, _ = _maps(n)
+    cells = [(y * n + x, c) for x, y, c in stones]
+    best_h, best_k = None, 0
+    for k in range(8):
+        f = fwd[k]
+        h = 0
+        for cell, c in cells:
+            h ^= z[c][f[cell]]
+        if best_h is None or h < best_h:
+            best_h, best_k = h, k
+    return best_h or 0, best_k
+
+
+def to_canonical(x: int, y: int, n: int, k: int) -> Tuple[int, int]:
+    c = _maps(n)[0][k][y * n + x]
+    return c % n, c // n
+
+
+def from_canonical(x: int, y: int, n: int, k: int) -> Tuple[int, int]:
+    c = _maps(n)[1][k][y * n + x]
+    return c % n, c // n
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# backend/ttable.py
+"""
+Zobrist 해시 기반 치환표(transposition table)
+- 항목: (깊이, 값, 경계 종류, 최선 수)
+- 교체 정책: 같은 키는 더 깊거나 같은 깊이의 결과만 덮어씀(EXACT는 얕아도 같은 깊이의 경계값보다 우선)
+- 용량 초과 시 가장 오래 안 쓴 항목부터 제거(LRU), 상한은 config.OMOK_TT_MAX_MB
+- shared_table(): 워커 프로세스 하나에서 모든 게임이 공유 → 반복되는 오프닝은 캐시에서 바로 답함
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Optional, Tuple
+
+from config import OMOK_TT_MAX_MB
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# OrderedDict 노드 + 키 int + 항목 튜플을 합친 대략적 바이트 수 (용량 → 항목 수 환산용)
+ENTRY_BYTES = 240
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    value: int
+    flag: int
+    move: Optional[Tuple[int, int]]
+
+
+class TranspositionTable:
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[int, TTEntry]" = OrderedDict()
+        self._lock = Lock()  # 스레드 풀에서 여러 탐색이 동시에 쓸 수 있음
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_megabytes(cls, mb: float) -> "TranspositionTable":
+        return cls(int(mb * 1024 * 1024) // ENTRY_BYTES)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: int) -> Optional[TTEntry]:
+        with self._lock:
+            e = self._data.get(key)
+            if e is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return e
+
+    def put(self, key: int, depth: int, value: int, flag: int, move: Optional[Tuple[int, int]]) -> None:
+        with self._lock:
+            old = self._data.get(key)
+            if old is not None:
+                if old.depth > depth or (old.depth == depth and old.flag == EXACT and flag != EXACT):
+                    self._data.move_to_end(key)
+                    return
+            self._data[key] = TTEntry(depth, value, flag, move)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_shared: Optional[TranspositionTable] = None
+
+
+def shared_table() -> TranspositionTable:
+    """프로세스 전역 치환표 (처음 쓸 때 생성)"""
+    global _shared
+    if _shared is None:
+        _shared = TranspositionTable.from_megabytes(OMOK_TT_MAX_MB)
+    return _shared
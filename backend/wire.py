@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# backend/wire.py
+"""
+WebSocket 델타 프로토콜 (ws://…/ws/{id}?proto=delta 로 접속한 클라이언트)
+- 수마다 보드 전체 대신 {"type": "move", "payload": {seq, x, y, player, winner, next_turn, game_over}} 만 보낸다
+  seq = 그 판의 수 번호(1부터, len(g.moves)) — 워커가 달라도 같은 값
+- 클라이언트가 seq 가 이어지지 않은 걸 보면 {"type": "resync_request"} → 서버가 "resync" 로 보드 전체를 보냄
+- resync 의 board 는 칸당 2비트(0=빈칸, 1=흑, 2=백)를 행 우선으로 4칸씩 한 바이트에 담아 base64
+  (바이트 안에서는 앞 칸이 하위 비트) — 15×15 는 76자, 19×19 는 124자
+"""
+from __future__ import annotations
+import base64
+from typing import List
+
+ENCODING = "2bit-b64"
+
+
+def pack_board(rows: List[List[int]]) -> str:
+    cells = [v for row in rows for v in row]
+    cells += [0] * (-len(cells) % 4)
+    out = bytearray(len(cells) // 4)
+    for i in range(0, len(cells), 4):
+        out[i >> 2] = cells[i] | cells[i + 1] << 2 | cells[i + 2] << 4 | cells[i + 3] << 6
+    return base64.b64encode(bytes(out)).decode("ascii")
+
+
+def unpack_board(data: str, n: int) -> List[List[int]]:
+    raw = base64.b64decode(data)
+    cells = [(b >> s) & 3 for b in raw for s in (0, 2, 4, 6)]
+    return [cells[y * n:(y + 1) * n] for y in range(n)]
+
+
+def move_message(game_id: str, seq: int, x: int, y: int, player: int, winner, next_turn: int) -> dict:
+    """seq 번째 수 (x, y, player) 를 둔 직후의 델타 (소켓이 게임마다 하나라 game_id 는 싣지 않는다)"""
+    return {"type": "move", "payload": {
+        "seq": seq,
+        "x": x,
+        "y": y,
+        "player": player,
+        "winner": winner,
+        "next_turn": next_turn,
+        "game_over": winner is not None,
+    }}
+
+
+def resync_message(game_id: str, g) -> dict:
+    return {"type": "resync", "payload": {
+        "game_id": game_id,
+        "seq": len(g.moves),
+        "size": g.board_size,
+        "encoding": ENCODING,
+        "board": pack_board(g.board),
+        "current_turn": g.current_turn,
+        "winner": g.winner,
+        "game_over": g.winner is not None,
+    }}
@@ -7,6 +7,18 @@ import Board from "./Board";
 const API_URL = "http://4.217.179.111:8000/api";
 const WS_URL  = "ws://4.217.179.111:8000/ws";
 
+// 델타 WS 의 압축 보드(칸당 2비트, 행 우선, 바이트 안에서 앞 칸이 하위 비트, base64) → 2차원 배열
+// (backend/wire.py 의 pack_board 와 같은 배치)
+function unpackBoard(b64, n) {
+  const raw = atob(b64);
+  const cells = [];
+  for (let i = 0; i < raw.length; i++) {
+    const b = raw.charCodeAt(i);
+    cells.push(b & 3, (b >> 2) & 3, (b >> 4) & 3, (b >> 6) & 3);
+  }
+  return Array.from({ length: n }, (_, y) => cells.slice(y * n, (y + 1) * n));
+}
+
 function Game({ settings, onGoBack }) {
   const gameMode = settings?.gameMode ?? "pvai";      // "pvai" | "pvp"
   const rawDiff  = settings?.aiDifficulty ?? settings?.difficulty ?? "초급";
@@ -56,6 +68,7 @@ function Game({ settings, onGoBack }) {
   const [chatMessages, setChatMessages] = useState([]);
   const [chatInput, setChatInput]       = useState("");
   const bottomRef = useRef(null);
+  const lastSeqRef = useRef(null); // 델타 WS 로 마지막에 반영한 수 번호
 
   // 고스트(미확정) 수
   const [pending, setPending] = useState(null);                                                                              // 최종수정:고스트돌 추가
@@ -150,8 +163,10 @@ function Game({ settings, onGoBack }) {
   useEffect(() => {
     if (gameMode !== "pvp" || !gameId) return;
 
-    const ws = new WebSocket(`${WS_URL}/${gameId}`);
+    // proto=delta: 수마다 보드 전체 대신 델타(move) + 빈틈이 보이면 resync 요청
+    const ws = new WebSocket(`${WS_URL}/${gameId}?proto=delta`);
     setSocket(ws);
+    lastSeqRef.current = null;
 
     ws.onopen = () => {
       console.log("WebSocket 연결됨");
@@ -167,6 +182,32 @@ function Game({ settings, onGoBack }) {
           if (data.payload.message) {
             setMessage(normalizeServerMessage(data.payload.message));
           }
+        } else if (data.type === "resync") {
+          const p = data.payload;
+          lastSeqRef.current = p.seq;
+          setGameState(prev => ({
+            ...(prev || {}),
+            game_id: p.game_id,
+            board: unpackBoard(p.board, p.size),
+            current_turn: p.current_turn,
+            winner: p.winner,
+            game_over: p.game_over,
+          }));
+        } else if (data.type === "move") {
+          const p = data.payload;
+          const last = lastSeqRef.current;
+          if (last !== null && p.seq <= last) return; // 이미 반영한 수
+          if (last === null || p.seq !== last + 1) {
+            ws.send(JSON.stringify({ type: "resync_request" })); // 놓친 수가 있음
+            return;
+          }
+          lastSeqRef.current = p.seq;
+          setGameState(prev => {
+            if (!prev?.board) return prev;
+            const board = prev.board.map(row => row.slice());
+            board[p.y][p.x] = p.player;
+            return { ...prev, board, current_turn: p.next_turn, winner: p.winner, game_over: p.game_over };
+          });
         } else if (data.type === "chat_message") {
           setChatMessages(prev => [...prev, data.payload]);
         } else if (data.type === "system") {